@@ -1,15 +1,37 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import json
+import csv
+import hashlib
 from pathlib import Path
 import itertools
 import math
 import statistics
+import heapq
+import queue
+import threading
 from collections import defaultdict
 import numpy as np
 from maps import maps
-from multiprocessing import Pool, cpu_count, Manager
-from functools import partial
+import elo_kernel
+from multiprocessing import Pool, cpu_count, shared_memory
+
+# Largest number of settings combinations evaluated together in one batched replay
+BATCH_CHUNK_SIZE = 1000
+
+# Only the best results by composite score are kept in the results table
+TOP_K_RESULTS = 500
+
+# How often (ms) the UI drains results posted by the analysis thread
+RESULT_POLL_MS = 100
+
+# Columns of the prediction results returned by calculate_elo_for_season
+PREDICTION_FIELDS = ("expected", "actual", "week", "round")
+PREDICTION_EXPECTED = PREDICTION_FIELDS.index("expected")
+PREDICTION_ACTUAL = PREDICTION_FIELDS.index("actual")
+
+# Metric columns written to the results file, after the settings key and the settings themselves
+RESULT_METRICS = ("brier", "accuracy", "rmse", "drift", "r_squared")
 
 # --- Elo Calculation Logic (adapted from tracker.py) ---
 
@@ -37,59 +59,34 @@ def get_unit_average_player_count(unit_name: str, week_idx: int, season_data: li
     except (ValueError, TypeError):
         return 0
 
-def run_single_simulation(args, season_data, global_unit_counts):
-    i, settings = args
-    final_elos, predictions, history = calculate_elo_for_season(season_data, settings, global_unit_counts)
-    
-    metrics = {
-        'brier': calculate_brier_score(predictions),
-        'accuracy': calculate_accuracy(predictions),
-        'rmse': calculate_elo_volatility(history),
-        'drift': calculate_mean_abs_drift(history),
-        'r_squared': calculate_r_squared(predictions),
-    }
-    return (i, settings, metrics)
+def evaluate_settings(units, rounds, num_weeks, settings):
+    """Replays the compiled season with one settings combination and returns its metrics."""
+    final_elos, predictions, history = replay_season(units, rounds, num_weeks, settings)
 
-def calculate_elo_for_season(season_data, settings, global_unit_counts):
+    # One vectorized pass, as a batch of a single settings combination
+    metrics = calculate_batch_metrics(predictions[:, PREDICTION_EXPECTED, None], predictions[:, PREDICTION_ACTUAL], history[:, None])
+    return {name: values[0] for name, values in metrics.items()}
+
+def compile_season_rounds(season_data, global_unit_counts):
     """
-    Runs a full Elo calculation for a season with a given set of settings.
-    Returns the Elo ratings after each week and a list of prediction results for analysis.
+    Compiles a season into the Elo kernel's round arrays.
+    Returns the sorted unit list and the rounds; rounds where either team has no players are dropped.
     """
-    initial_rating = settings["initial_elo"]
-    k_factor_standard = settings["k_factor_standard"]
-    k_factor_provisional = settings["k_factor_provisional"]
-    provisional_rounds = settings["provisional_rounds"]
-    sweep_bonus_multiplier = settings["sweep_bonus_multiplier"]
-    lead_multiplier = settings["lead_multiplier"]
-    size_influence = settings["size_influence"]
-    playoff_multiplier = settings["playoff_multiplier"]
-    bias_light_att = settings["bias_light_att"]
-    bias_heavy_att = settings["bias_heavy_att"]
-    bias_light_def = settings["bias_light_def"]
-    bias_heavy_def = settings["bias_heavy_def"]
-
     all_units = set()
     for week in season_data:
         all_units.update(week.get("A", []))
         all_units.update(week.get("B", []))
+    units = sorted(all_units)
+    unit_index = {unit: i for i, unit in enumerate(units)}
 
-    elo_ratings = defaultdict(lambda: initial_rating)
-    for unit in all_units:
-        _ = elo_ratings[unit]
-        
-    rounds_played = defaultdict(int)
-    elo_history_by_week = [elo_ratings.copy()]
-    prediction_results = [] # Store tuples of (expected, actual) for Brier score
+    usa_attack_maps = set(itertools.chain.from_iterable(maps.values())) # Crude but works for now
+    rounds = []
 
     for week_idx, week_data in enumerate(season_data):
-        last_week_elos = elo_history_by_week[-1]
-        current_week_elos = last_week_elos.copy()
-
         team_A_units = week_data.get("A", set())
         team_B_units = week_data.get("B", set())
 
         if not team_A_units or not team_B_units:
-            elo_history_by_week.append(current_week_elos)
             continue
 
         is_playoffs = week_data.get("playoffs", False)
@@ -97,22 +94,26 @@ def calculate_elo_for_season(season_data, settings, global_unit_counts):
         round1_winner = week_data.get("round1_winner")
         round2_winner = week_data.get("round2_winner")
 
-        sweep_bonus_A = sweep_bonus_multiplier if (round1_winner == "A" and round2_winner == "A") else 1.0
-        sweep_bonus_B = sweep_bonus_multiplier if (round1_winner == "B" and round2_winner == "B") else 1.0
+        sweep_A = round1_winner == "A" and round2_winner == "A"
+        sweep_B = round1_winner == "B" and round2_winner == "B"
+
+        player_counts = {
+            u: get_unit_average_player_count(u, week_idx, season_data, global_unit_counts)
+            for u in itertools.chain(team_A_units, team_B_units)
+        }
+        total_players_A = sum(player_counts[u] for u in team_A_units)
+        total_players_B = sum(player_counts[u] for u in team_B_units)
+        if total_players_A == 0 or total_players_B == 0: continue
+
+        players = np.zeros(len(units))
+        for u, count in player_counts.items():
+            players[unit_index[u]] = count
 
         for r in [1, 2]:
             winner = week_data.get(f"round{r}_winner")
             if not winner:
                 continue
 
-            total_players_A = sum(get_unit_average_player_count(u, week_idx, season_data, global_unit_counts) for u in team_A_units)
-            total_players_B = sum(get_unit_average_player_count(u, week_idx, season_data, global_unit_counts) for u in team_B_units)
-            
-            if total_players_A == 0 or total_players_B == 0: continue
-
-            avg_elo_A = sum(current_week_elos[u] * get_unit_average_player_count(u, week_idx, season_data, global_unit_counts) for u in team_A_units) / total_players_A
-            avg_elo_B = sum(current_week_elos[u] * get_unit_average_player_count(u, week_idx, season_data, global_unit_counts) for u in team_B_units) / total_players_B
-            
             if is_playoffs:
                 lead_A, lead_B = week_data.get(f"lead_A_r{r}"), week_data.get(f"lead_B_r{r}")
             else:
@@ -128,122 +129,358 @@ def calculate_elo_for_season(season_data, settings, global_unit_counts):
             elif map_name in maps.get("Heavily_Defender_Biased", []): map_bias_level = 2.5
             elif map_name in maps.get("Lightly_Defender_Biased", []): map_bias_level = 2.0
             
-            # Instead of Elo offsets, define percentage multipliers from settings
-            bias_percent_map = {
-               0: 1.00,
-               1: 1.0 + (bias_light_att / 100.0),
-               1.5: 1.0 + (bias_heavy_att / 100.0),
-               2: 1.0 - (bias_light_def / 100.0),
-               2.5: 1.0 - (bias_heavy_def / 100.0)
-            }
-            bias_multiplier = bias_percent_map.get(map_bias_level, 1.00)
-            
             # Determine which team is the attacker
-            usa_attack_maps = set(itertools.chain.from_iterable(maps.values())) # Crude but works for now
             is_usa_attack = any(base_map in map_name for base_map in usa_attack_maps if base_map in map_name) if map_name else False
             flipped = week_data.get(f"round{r}_flipped", False)
             usa_side = "A" if not flipped else "B"
             attacker_side = usa_side if is_usa_attack else ("B" if usa_side == "A" else "A")
 
-            # Compute expected outcome first
-            expected_A = 1 / (1 + 10 ** ((avg_elo_B - avg_elo_A) / 400))
+            rounds.append({
+                "week": week_idx,
+                "round_num": r,
+                "team_a": [unit_index[u] for u in team_A_units],
+                "team_b": [unit_index[u] for u in team_B_units],
+                "players": players,
+                "lead_a": unit_index[lead_A] if lead_A in team_A_units else -1,
+                "lead_b": unit_index[lead_B] if lead_B in team_B_units else -1,
+                "score_a": 1 if winner == "A" else 0,
+                "bias_code": elo_kernel.bias_level_code(map_bias_level),
+                "attacker_a": attacker_side == "A",
+                "clamp": (0.01, 0.99), # Clamp to avoid extremes
+                "sweep_a": sweep_A,
+                "sweep_b": sweep_B,
+                "playoffs": is_playoffs,
+            })
+
+    return units, elo_kernel.build_round_arrays(rounds, len(units))
+
+def evaluate_settings_batch(units, rounds, num_weeks, settings_batch):
+    """Replays the compiled season for a batch of settings (dict of equal-length arrays) and returns per-combination metric arrays."""
+    replay = elo_kernel.replay_elo(rounds, settings_batch, len(units), 0, num_weeks)
+
+    initial_ratings = np.repeat(np.asarray(settings_batch["initial_elo"], dtype=float)[:, None], len(units), axis=1)
+    history = np.concatenate([initial_ratings[None], replay["ratings"]])
+    return calculate_batch_metrics(replay["expected"], rounds["score_a"][replay["round_index"]], history)
 
-            # Apply percent bias to expected probability
-            if attacker_side == "A":
-                expected_A *= bias_multiplier
-            else:
-                expected_A /= bias_multiplier # Defender bias reduces attacker's chance
+def calculate_elo_for_season(season_data, settings, global_unit_counts):
+    """
+    Runs a full Elo calculation for a season with a given set of settings.
+    Returns the final Elo ratings by unit, the prediction results (rounds x PREDICTION_FIELDS) and the
+    Elo ratings after each week (weeks + 1 x units, initial ratings first, units in compile_season_rounds order).
+    """
+    units, rounds = compile_season_rounds(season_data, global_unit_counts)
+    return replay_season(units, rounds, len(season_data), settings)
 
-            expected_A = max(0.01, min(0.99, expected_A)) # Clamp to avoid extremes
+def replay_season(units, rounds, num_weeks, settings):
+    """Replays an already compiled season; returns the same values as calculate_elo_for_season."""
+    replay = elo_kernel.replay_elo(rounds, settings, len(units), 0, num_weeks)
 
-            score_A = 1 if winner == "A" else 0
-            
-            prediction_results.append({"expected": expected_A, "actual": score_A, "week": week_idx, "round": r})
-            base_change = score_A - expected_A
-
-            def apply_elo_changes(team_units, lead_unit, sign, sweep_bonus):
-                if not team_units: return
-
-                weights = {
-                    u: (math.log(1 + get_unit_average_player_count(u, week_idx, season_data, global_unit_counts)) ** size_influence)
-                    * (lead_multiplier if u == lead_unit else 1)
-                    for u in team_units
-                }
-                total_weight = sum(weights.values())
-                if total_weight == 0: return
-
-                for u in weights:
-                    weights[u] /= total_weight
-
-                team_avg_elo = sum(current_week_elos[u] for u in team_units) / len(team_units)
-                
-                for u, w in weights.items():
-                    k = k_factor_provisional if rounds_played[u] < provisional_rounds else k_factor_standard
-                    round_multiplier = playoff_multiplier if is_playoffs else 1.0
-                    relative_factor = max(0.8, min(1.2, (team_avg_elo / current_week_elos[u]) ** 0.5)) if current_week_elos[u] > 0 else 1.0
-                    delta = k * base_change * w * sign * round_multiplier * sweep_bonus * relative_factor
-                    current_week_elos[u] += delta
-
-            apply_elo_changes(team_A_units, lead_A, 1, sweep_bonus_A)
-            apply_elo_changes(team_B_units, lead_B, -1, sweep_bonus_B)
-            
-            for unit in set(team_A_units) | set(team_B_units):
-                rounds_played[unit] += 1
-        
-        elo_history_by_week.append(current_week_elos)
+    elo_history_by_week = np.empty((num_weeks + 1, len(units)))
+    elo_history_by_week[0] = settings["initial_elo"]
+    elo_history_by_week[1:] = replay["ratings"]
+
+    round_index = replay["round_index"]
+    prediction_results = np.empty((len(round_index), len(PREDICTION_FIELDS)))
+    prediction_results[:, PREDICTION_EXPECTED] = replay["expected"]
+    prediction_results[:, PREDICTION_ACTUAL] = rounds["score_a"][round_index]
+    prediction_results[:, PREDICTION_FIELDS.index("week")] = rounds["week"][round_index]
+    prediction_results[:, PREDICTION_FIELDS.index("round")] = rounds["round_num"][round_index]
 
-    final_elos = elo_history_by_week[-1]
+    final_elos = dict(zip(units, elo_history_by_week[-1].tolist()))
     return final_elos, prediction_results, elo_history_by_week
 
+# --- Pool Workers ---
+# The compiled season is placed in shared memory once; tasks only carry indices into the settings grid.
+
+_worker_season = {} # Filled in each pool process by init_worker
+
+def share_compiled_rounds(rounds):
+    """Copies compiled round arrays into shared memory. Returns the blocks (caller unlinks them) and their specs."""
+    blocks, specs = [], {}
+    for key, array in rounds.items():
+        shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+        blocks.append(shm)
+        specs[key] = (shm.name, array.shape, array.dtype.str)
+    return blocks, specs
+
+def init_worker(shared_specs, units, num_weeks, param_ranges):
+    """Pool initializer: attaches the shared compiled season once per process."""
+    blocks, rounds = [], {}
+    for key, (name, shape, dtype) in shared_specs.items():
+        shm = shared_memory.SharedMemory(name=name)
+        blocks.append(shm) # Keep the mapping alive for the worker's lifetime
+        rounds[key] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    _worker_season.update(blocks=blocks, rounds=rounds, units=units, num_weeks=num_weeks, param_ranges=param_ranges)
+
+def settings_for_positions(positions, param_ranges):
+    """Settings arrays for rows of per-parameter value positions (N x parameters)."""
+    positions = np.asarray(positions).reshape(-1, len(param_ranges))
+    return {name: np.asarray(values, dtype=float)[positions[:, i]] for i, (name, values) in enumerate(param_ranges.items())}
+
+def settings_for_indices(indices, param_ranges):
+    """Settings arrays for flat grid indices, numbered in itertools.product order over param_ranges."""
+    positions = np.unravel_index(np.asarray(indices), [len(values) for values in param_ranges.values()])
+    return settings_for_positions(np.stack(positions, axis=-1), param_ranges)
+
+def run_indexed_simulation(index):
+    """Pool task: evaluates the grid combination at a flat index."""
+    season = _worker_season
+    settings = {name: values.item() for name, values in settings_for_indices(index, season["param_ranges"]).items()}
+    return (index, settings, evaluate_settings(season["units"], season["rounds"], season["num_weeks"], settings))
+
+def run_indexed_batch(indices):
+    """Pool task: evaluates the grid combinations at an array of flat indices in one batched replay."""
+    settings_batch = settings_for_indices(indices, _worker_season["param_ranges"])
+    return _evaluate_rows(indices.tolist(), settings_batch, None)
+
+def run_position_batch(task):
+    """
+    Pool task for the search strategies: (ids, positions, num_weeks).
+    Rows are numbered by ids; num_weeks limits the replay to a season prefix (None for the full season).
+    """
+    ids, positions, num_weeks = task
+    settings_batch = settings_for_positions(positions, _worker_season["param_ranges"])
+    return _evaluate_rows(ids, settings_batch, num_weeks)
+
+def split_settings_batch(settings_batch):
+    """Settings arrays as one plain {name: float} dict per combination."""
+    return [dict(zip(settings_batch, row)) for row in zip(*(values.tolist() for values in settings_batch.values()))]
+
+def _evaluate_rows(ids, settings_batch, num_weeks):
+    """Runs one batched replay in a worker and splits the metrics into (id, settings, metrics) rows."""
+    season = _worker_season
+    num_weeks = season["num_weeks"] if num_weeks is None else num_weeks
+    metrics = evaluate_settings_batch(season["units"], season["rounds"], num_weeks, settings_batch)
+
+    return [
+        (row_id, settings, {name: values[j] for name, values in metrics.items()})
+        for j, (row_id, settings) in enumerate(zip(ids, split_settings_batch(settings_batch)))
+    ]
+
+# --- Results File ---
+# Results are appended to a CSV file as they arrive, one line per settings combination, so an interrupted
+# sweep can be resumed. Files from several machines (see the shard setting) can simply be concatenated.
+# Each line records the season it was computed on (see season_fingerprint); lines from another version of
+# the season are not reused.
+
+def settings_key(settings):
+    """Stable hash of a settings combination, used to recognise results already in the results file."""
+    canonical = json.dumps({name: float(value) for name, value in settings.items()}, sort_keys=True)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:16]
+
+def season_fingerprint(units, rounds, num_weeks):
+    """Stable hash of a compiled season (see compile_season_rounds), so results are only reused for the same season data."""
+    digest = hashlib.sha1(json.dumps({"units": units, "num_weeks": num_weeks}).encode("utf-8"))
+    for key in sorted(rounds):
+        array = np.ascontiguousarray(rounds[key])
+        digest.update(f"{key}:{array.dtype.str}:{array.shape}".encode("utf-8"))
+        digest.update(array.tobytes())
+    return digest.hexdigest()[:16]
+
+def load_results_file(path, fingerprint):
+    """
+    Reads a results file into {settings key: (settings, metrics)}, keeping only lines computed on the season with
+    the given fingerprint. A missing file is empty; unreadable lines are skipped.
+    """
+    results = {}
+    path = Path(path)
+    if not path.exists():
+        return results
+
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        settings_names = [name for name in (reader.fieldnames or []) if name not in ("key", "season") and name not in RESULT_METRICS]
+        for row in reader:
+            if row.get("season") != fingerprint:
+                continue # Computed on another version of the season (or by a tuner that did not record it)
+            try:
+                settings = {name: float(row[name]) for name in settings_names}
+                metrics = {name: float(row[name]) for name in RESULT_METRICS}
+            except (TypeError, ValueError, KeyError):
+                continue # e.g. a line cut short when the tuner was closed mid-write
+            results[settings_key(settings)] = (settings, metrics)
+    return results
+
+def append_results_file(path, rows, fingerprint):
+    """
+    Appends (id, settings, metrics) rows computed on the season with the given fingerprint to a results file,
+    writing the header first if the file is new. Raises ValueError if an existing file has other columns.
+    """
+    if not rows:
+        return
+    path = Path(path)
+    fieldnames = ["key", "season", *rows[0][1], *RESULT_METRICS]
+    is_new = not path.exists() or path.stat().st_size == 0
+    if not is_new:
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            header = next(csv.reader(f), [])
+        if header != fieldnames:
+            raise ValueError(f"'{path.name}' has different columns (another settings space or an older tuner). Please choose another results file.")
+
+        # Start on a fresh line if the last write was interrupted
+        with open(path, "rb") as f:
+            f.seek(-1, 2)
+            needs_newline = f.read(1) != b"\n"
+
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        if not is_new and needs_newline:
+            f.write("\n")
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        if is_new:
+            writer.writeheader()
+        for _, settings, metrics in rows:
+            writer.writerow({"key": settings_key(settings), "season": fingerprint, **settings, **{name: float(metrics[name]) for name in RESULT_METRICS}})
+
+# --- Search Strategies ---
+# Each strategy is a generator over per-parameter value positions. It yields (positions, num_weeks) batches
+# to evaluate and is sent back the (id, settings, metrics) rows for that batch in the same order.
+
+SEARCH_STRATEGIES = ("Full Grid", "Latin Hypercube", "Coordinate Descent", "Successive Halving")
+
+# Brier improvements smaller than this do not reset early stopping
+SEARCH_TOLERANCE = 1e-6
+
+def latin_hypercube_positions(grid_shape, num_samples, rng):
+    """Distinct value positions spread over every parameter by Latin hypercube sampling."""
+    num_samples = min(num_samples, math.prod(grid_shape))
+    columns = []
+    for size in grid_shape:
+        strata = (rng.permutation(num_samples) + rng.random(num_samples)) / num_samples
+        columns.append(np.minimum((strata * size).astype(int), size - 1))
+    positions = np.stack(columns, axis=1) if columns else np.zeros((num_samples, 0), dtype=int)
+
+    # Coarse parameters make repeats likely; keep first occurrences and top up with random picks
+    _, first = np.unique(positions, axis=0, return_index=True)
+    positions = positions[np.sort(first)]
+    seen = set(map(tuple, positions.tolist()))
+    extra = []
+    while len(seen) < num_samples:
+        candidate = tuple(int(rng.integers(size)) for size in grid_shape)
+        if candidate not in seen:
+            seen.add(candidate)
+            extra.append(candidate)
+    if extra:
+        positions = np.vstack([positions, np.array(extra, dtype=int)])
+    return positions
+
+def latin_hypercube_search(grid_shape, budget, patience, batch_size, rng):
+    """Evaluates Latin hypercube samples in batches; stops once `patience` batches pass without a better Brier score."""
+    samples = latin_hypercube_positions(grid_shape, budget, rng)
+    best_brier = math.inf
+    stale_batches = 0
+    for start in range(0, len(samples), batch_size):
+        results = yield samples[start:start + batch_size], None
+        batch_best = min(metrics['brier'] for _, _, metrics in results)
+        if batch_best < best_brier - SEARCH_TOLERANCE:
+            best_brier = batch_best
+            stale_batches = 0
+        else:
+            stale_batches += 1
+            if patience and stale_batches >= patience:
+                return
+
+def coordinate_descent_search(grid_shape, budget):
+    """
+    Starts from the middle of every range and moves one parameter at a time to its best value by Brier score.
+    Stops early once a full sweep over the parameters no longer improves it, or when the budget is spent.
+    """
+    current = tuple(size // 2 for size in grid_shape)
+    scores = {}
+    results = yield np.array([current]), None
+    scores[current] = results[0][2]['brier']
+    evaluations = 1
+
+    improved = True
+    while improved and evaluations < budget:
+        improved = False
+        for axis, size in enumerate(grid_shape):
+            candidates = [current[:axis] + (value,) + current[axis + 1:] for value in range(size)]
+            candidates = [c for c in candidates if c not in scores][:budget - evaluations]
+            if candidates:
+                results = yield np.array(candidates), None
+                for candidate, (_, _, metrics) in zip(candidates, results):
+                    scores[candidate] = metrics['brier']
+                evaluations += len(candidates)
+
+            best = min((c for c in scores if c[:axis] + c[axis + 1:] == current[:axis] + current[axis + 1:]), key=scores.get)
+            if scores[best] < scores[current] - SEARCH_TOLERANCE:
+                current = best
+                improved = True
+            if evaluations >= budget:
+                return
+
+def successive_halving_search(grid_shape, num_weeks, budget, rng, eta=3):
+    """
+    Samples configurations by Latin hypercube and scores them on a short season prefix, keeping the best
+    1/eta by Brier score for each longer prefix until the survivors are replayed on the full season.
+    """
+    num_configs = max(1, budget * (eta - 1) // eta)
+    positions = latin_hypercube_positions(grid_shape, num_configs, rng)
+    # One rung per whole power of eta that fits both the configurations and the season. Counted in integers,
+    # since math.log rounds exact powers down (log(243, 3) < 5)
+    num_rungs = 1
+    while eta ** num_rungs <= min(len(positions), num_weeks):
+        num_rungs += 1
+
+    for rung in range(num_rungs):
+        is_last = rung == num_rungs - 1
+        prefix_weeks = None if is_last else max(1, math.ceil(num_weeks / eta ** (num_rungs - 1 - rung)))
+        results = yield positions, prefix_weeks
+        if not is_last:
+            order = np.argsort([metrics['brier'] for _, _, metrics in results], kind="stable")
+            positions = positions[order[:max(1, len(positions) // eta)]]
+
 # --- Analysis Metrics ---
 
-def calculate_brier_score(predictions):
-    if not predictions: return 0
-    return np.mean([(p['expected'] - p['actual'])**2 for p in predictions])
+def calculate_batch_metrics(expected, actual, history):
+    """
+    Computes every metric (Brier score, accuracy, Elo volatility RMSE, mean absolute drift of the average
+    Elo, R^2 of expected vs actual) for a batch of settings combinations in one pass.
+    expected is (rounds x N), actual (rounds,) and history (weeks + 1 x N x units), initial ratings first.
+    Returns a dict of (N,) arrays keyed like run_indexed_simulation's metrics.
+    """
+    num_rounds, num_settings = expected.shape
+    zeros = np.zeros(num_settings)
+    actual = actual[:, None]
 
-def calculate_accuracy(predictions):
-    if not predictions: return 0
-    correct = sum(1 for p in predictions if (p['expected'] > 0.5 and p['actual'] == 1) or (p['expected'] < 0.5 and p['actual'] == 0))
-    return correct / len(predictions)
+    brier = ((expected - actual) ** 2).mean(axis=0) if num_rounds else zeros
+    correct = ((expected > 0.5) & (actual == 1)) | ((expected < 0.5) & (actual == 0))
+    accuracy = correct.sum(axis=0) / num_rounds if num_rounds else zeros
 
-def calculate_elo_volatility(elo_history):
-    if len(elo_history) < 2: return 0
-    
-    total_squared_change = 0
-    num_changes = 0
-    all_units = set(elo_history[0].keys())
-    
-    for i in range(1, len(elo_history)):
-        prev_week = elo_history[i-1]
-        curr_week = elo_history[i]
-        for unit in all_units:
-            change = curr_week.get(unit, 1500) - prev_week.get(unit, 1500)
-            if abs(change) > 1e-9: # Only count if there was a change
-                total_squared_change += change**2
-                num_changes += 1
-
-    return np.sqrt(total_squared_change / num_changes) if num_changes > 0 else 0
-
-
-def calculate_mean_abs_drift(elo_history):
-    if len(elo_history) < 2: return 0
-    drifts = []
-    for i in range(1, len(elo_history)):
-        avg_before = np.mean(list(elo_history[i-1].values()))
-        avg_after = np.mean(list(elo_history[i].values()))
-        drifts.append(abs(avg_after - avg_before))
-    return np.mean(drifts)
-
-def calculate_r_squared(predictions):
-    if len(predictions) < 2: return 0
-    
-    actuals = np.array([p['actual'] for p in predictions])
-    expecteds = np.array([p['expected'] for p in predictions])
+    if len(history) < 2:
+        rmse, drift = zeros, zeros
+    else:
+        # Only count a unit's weekly change if there was one
+        changes = np.diff(history, axis=0)
+        changed = np.abs(changes) > 1e-9
+        num_changes = changed.sum(axis=(0, 2))
+        total_squared_change = np.where(changed, changes ** 2, 0.0).sum(axis=(0, 2))
+        rmse = np.where(num_changes > 0, np.sqrt(total_squared_change / np.maximum(num_changes, 1)), 0.0)
+        drift = np.abs(np.diff(history.mean(axis=2), axis=0)).mean(axis=0)
+
+    if num_rounds < 2:
+        r_squared = zeros
+    else:
+        actual_centered = actual - actual.mean()
+        expected_centered = expected - expected.mean(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            correlation_xy = (actual_centered * expected_centered).sum(axis=0) / np.sqrt(
+                (actual_centered ** 2).sum() * (expected_centered ** 2).sum(axis=0))
+        r_squared = correlation_xy ** 2
+
+    return {'brier': brier, 'accuracy': accuracy, 'rmse': rmse, 'drift': drift, 'r_squared': r_squared}
+
+def calculate_composite_score(metrics):
+    """Combines all metrics into one 0-100 score where higher is better."""
+    # Normalize scores for composite calculation
+    # Lower is better for Brier, RMSE, Drift. Higher is better for Acc, R^2
+    # We'll invert the "lower is better" metrics so higher is always better for the composite
+    brier_norm = 1 - metrics['brier']
+    rmse_norm = 1 - (metrics['rmse'] / 100) # Normalize assuming max RMSE around 100
+    drift_norm = 1 - (metrics['drift'] / 10) # Normalize assuming max drift around 10
     
-    correlation_matrix = np.corrcoef(actuals, expecteds)
-    correlation_xy = correlation_matrix[0,1]
-    r_squared = correlation_xy**2
-    return r_squared
+    return np.average([brier_norm, metrics['accuracy'], rmse_norm, drift_norm, metrics['r_squared']]) * 100
 
 class EloSettingsTuner(tk.Tk):
     def __init__(self):
@@ -253,6 +490,12 @@ class EloSettingsTuner(tk.Tk):
         
         self.season_data = None
         self.global_unit_counts = {}
+        self.results_path = None
+
+        # Results posted by the analysis thread, and the top-K rows currently shown
+        self.result_queue = queue.Queue()
+        self.top_results = [] # min-heap of (score, -settings_id, settings_id)
+        self.result_items = {} # settings_id -> treeview item
 
         self._build_ui()
 
@@ -265,14 +508,19 @@ class EloSettingsTuner(tk.Tk):
         top_frame = ttk.Frame(main_frame)
         top_frame.pack(fill=tk.X, pady=(0, 10))
         
-        load_btn = ttk.Button(top_frame, text="Load Season Data (.json)", command=self.load_data)
-        load_btn.pack(side=tk.LEFT)
+        self.load_btn = ttk.Button(top_frame, text="Load Season Data (.json)", command=self.load_data)
+        self.load_btn.pack(side=tk.LEFT)
         
         self.file_label = ttk.Label(top_frame, text="No file loaded.")
         self.file_label.pack(side=tk.LEFT, padx=10)
         
-        run_btn = ttk.Button(top_frame, text="Run Analysis", command=self.run_analysis)
-        run_btn.pack(side=tk.RIGHT)
+        self.run_btn = ttk.Button(top_frame, text="Run Analysis", command=self.run_analysis)
+        self.run_btn.pack(side=tk.RIGHT)
+
+        # Batched mode replays many settings combinations at once per process
+        self.batched_var = tk.BooleanVar(value=True)
+        batched_check = ttk.Checkbutton(top_frame, text="Batched evaluation", variable=self.batched_var)
+        batched_check.pack(side=tk.RIGHT, padx=10)
         
         # --- Parameter Configuration ---
         params_frame = ttk.LabelFrame(main_frame, text="Hyperparameter Search Space", padding="10")
@@ -314,6 +562,43 @@ class EloSettingsTuner(tk.Tk):
             help_label = ttk.Label(row_frame, text=" (e.g., '1500' or '1400,1500,1600' or 'range(80,110,8)')", foreground="grey")
             help_label.pack(side=tk.LEFT, padx=(5,0))
 
+        # --- Search Strategy ---
+        search_frame = ttk.LabelFrame(main_frame, text="Search Strategy", padding="10")
+        search_frame.pack(fill=tk.X, pady=(0, 10))
+
+        ttk.Label(search_frame, text="Strategy:").pack(side=tk.LEFT, padx=(0, 5))
+        self.strategy_var = tk.StringVar(value=SEARCH_STRATEGIES[0])
+        strategy_combo = ttk.Combobox(search_frame, textvariable=self.strategy_var, values=SEARCH_STRATEGIES, state="readonly", width=20)
+        strategy_combo.pack(side=tk.LEFT, padx=(0, 15))
+
+        ttk.Label(search_frame, text="Budget (replays):").pack(side=tk.LEFT, padx=(0, 5))
+        self.budget_entry = ttk.Entry(search_frame, width=8)
+        self.budget_entry.pack(side=tk.LEFT, padx=(0, 15))
+        self.budget_entry.insert(0, "500")
+
+        ttk.Label(search_frame, text="Patience (batches):").pack(side=tk.LEFT, padx=(0, 5))
+        self.patience_entry = ttk.Entry(search_frame, width=6)
+        self.patience_entry.pack(side=tk.LEFT)
+        self.patience_entry.insert(0, "5")
+
+        ttk.Label(search_frame, text=" Budget applies to every strategy except Full Grid; patience only to Latin Hypercube.", foreground="grey").pack(side=tk.LEFT, padx=(5, 0))
+
+        # --- Results File ---
+        store_frame = ttk.LabelFrame(main_frame, text="Results File", padding="10")
+        store_frame.pack(fill=tk.X, pady=(0, 10))
+
+        self.choose_btn = ttk.Button(store_frame, text="Choose...", command=self.choose_results_file)
+        self.choose_btn.pack(side=tk.LEFT)
+
+        self.results_label = ttk.Label(store_frame, text="No results file.")
+        self.results_label.pack(side=tk.LEFT, padx=10)
+
+        ttk.Label(store_frame, text=" Settings already in the file are skipped.", foreground="grey").pack(side=tk.RIGHT, padx=(5, 0))
+        self.shard_entry = ttk.Entry(store_frame, width=6)
+        self.shard_entry.pack(side=tk.RIGHT)
+        self.shard_entry.insert(0, "1/1")
+        ttk.Label(store_frame, text="Grid shard (i/n):").pack(side=tk.RIGHT, padx=(0, 5))
+
 
         # --- Progress Bar ---
         progress_frame = ttk.Frame(main_frame)
@@ -390,6 +675,9 @@ class EloSettingsTuner(tk.Tk):
             self.global_unit_counts.update(data.get("unit_player_counts", {}))
 
             self.file_label.config(text=f"Loaded: {Path(file_path).name}")
+
+            # Results for this season go next to it unless another file is chosen
+            self.set_results_file(Path(file_path).with_name(f"{Path(file_path).stem} - Tuner Results.csv"))
             messagebox.showinfo("Success", f"Successfully loaded {len(self.season_data)} weeks of data.")
 
         except Exception as e:
@@ -397,8 +685,34 @@ class EloSettingsTuner(tk.Tk):
             self.season_data = None
             self.file_label.config(text="Failed to load file.")
 
-    def get_settings_combinations(self):
-        """Parses parameter ranges from UI and returns an iterator of all combinations."""
+    def choose_results_file(self):
+        file_path = filedialog.asksaveasfilename(
+            title="Select Results File",
+            defaultextension=".csv",
+            confirmoverwrite=False,
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        if file_path:
+            self.set_results_file(Path(file_path))
+
+    def set_results_file(self, path):
+        self.results_path = path
+        self.results_label.config(text=f"Appending to: {path.name}")
+
+    def get_shard(self):
+        """Parses the 'i/n' shard entry into a zero-based (index, count), or None if it is invalid."""
+        shard_str = self.shard_entry.get().strip()
+        try:
+            index, count = (int(part) for part in shard_str.split("/"))
+            if not 1 <= index <= count:
+                raise ValueError("shard must be between 1 and the shard count")
+        except ValueError as e:
+            messagebox.showerror("Invalid Shard", f"Shard must look like '1/4': {e}\nValue: '{shard_str}'")
+            return None
+        return index - 1, count
+
+    def get_param_ranges(self):
+        """Parses parameter ranges from UI. Returns a dict of value lists, or None if an entry is invalid."""
         param_ranges = {}
         for name, entry in self.param_entries.items():
             val_str = entry.get().strip()
@@ -418,21 +732,27 @@ class EloSettingsTuner(tk.Tk):
                 messagebox.showerror("Invalid Parameter", f"Error parsing '{name}': {e}\nValue: '{val_str}'")
                 return None
 
-        # Create all combinations using itertools.product
-        keys, values = zip(*param_ranges.items())
-        for v in itertools.product(*values):
-            yield dict(zip(keys, v))
+        return param_ranges
             
-    def add_result_to_table(self, settings_id, settings, metrics):
-        """Adds a single result row to the results treeview."""
-        # Normalize scores for composite calculation
-        # Lower is better for Brier, RMSE, Drift. Higher is better for Acc, R^2
-        # We'll invert the "lower is better" metrics so higher is always better for the composite
-        brier_norm = 1 - metrics['brier']
-        rmse_norm = 1 - (metrics['rmse'] / 100) # Normalize assuming max RMSE around 100
-        drift_norm = 1 - (metrics['drift'] / 10) # Normalize assuming max drift around 10
-        
-        composite = np.average([brier_norm, metrics['accuracy'], rmse_norm, drift_norm, metrics['r_squared']]) * 100
+    def offer_result(self, settings_id, settings, metrics):
+        """Keeps a result in the table if it is among the TOP_K_RESULTS best by composite score."""
+        composite = calculate_composite_score(metrics)
+        score = composite if not math.isnan(composite) else -math.inf
+        entry = (score, -settings_id, settings_id)
+
+        if len(self.top_results) < TOP_K_RESULTS:
+            heapq.heappush(self.top_results, entry)
+        elif entry > self.top_results[0]:
+            _, _, dropped_id = heapq.heapreplace(self.top_results, entry)
+            self.results_tree.delete(self.result_items.pop(dropped_id))
+        else:
+            return
+        self.result_items[settings_id] = self.add_result_to_table(settings_id, settings, metrics, composite)
+
+    def add_result_to_table(self, settings_id, settings, metrics, composite=None):
+        """Adds a single result row to the results treeview and returns its item id."""
+        if composite is None:
+            composite = calculate_composite_score(metrics)
 
         values = (
             settings_id,
@@ -455,47 +775,225 @@ class EloSettingsTuner(tk.Tk):
             settings["bias_light_def"],
             settings["bias_heavy_def"],
         )
-        self.results_tree.insert("", "end", values=values)
-        self.update_idletasks() # Force UI update
+        return self.results_tree.insert("", "end", values=values)
 
     def run_analysis(self):
         if not self.season_data:
             messagebox.showwarning("No Data", "Please load a season data file before running analysis.")
             return
             
-        settings_combinations = list(self.get_settings_combinations())
-        if settings_combinations is None:
+        param_ranges = self.get_param_ranges()
+        if param_ranges is None:
             return
 
-        if not messagebox.askyesno("Confirm Analysis", f"This will run {len(settings_combinations)} simulations. This might take a while. Continue?"):
+        shard = self.get_shard()
+        if shard is None:
             return
+
+        strategy = self.strategy_var.get()
+        if strategy == "Full Grid":
+            # This shard's share of the grid (see resume_grid)
+            shard_index, shard_count = shard
+            grid_size = math.prod(len(values) for values in param_ranges.values())
+            total_simulations = len(range(shard_index, grid_size, shard_count))
+            if shard_count > 1:
+                run_text = f"{total_simulations} of {grid_size} simulations (shard {shard_index + 1}/{shard_count})"
+            else:
+                run_text = f"{total_simulations} simulations"
+            if not messagebox.askyesno("Confirm Analysis", f"This will run {run_text}. This might take a while. Continue?"):
+                return
+            budget = patience = None
+        else:
+            try:
+                budget = int(self.budget_entry.get())
+                patience = int(self.patience_entry.get())
+                if budget < 1 or patience < 0:
+                    raise ValueError("budget must be at least 1 and patience at least 0")
+            except ValueError as e:
+                messagebox.showerror("Invalid Search Setting", f"Budget and patience must be whole numbers: {e}")
+                return
             
         # Clear previous results
         for item in self.results_tree.get_children():
             self.results_tree.delete(item)
+        self.top_results.clear()
+        self.result_items.clear()
 
-        total_simulations = len(settings_combinations)
         self.progress_var.set(0)
+        # The season and results file stay fixed until the run ends
+        for button in (self.run_btn, self.load_btn, self.choose_btn):
+            button.config(state=tk.DISABLED)
+
+        # Simulations run on a background thread; the UI picks up their results in batches
+        worker = threading.Thread(
+            target=self.run_pool,
+            args=(param_ranges, strategy, budget, patience, self.batched_var.get(), shard, self.results_path),
+            daemon=True,
+        )
+        worker.start()
+        self.after(RESULT_POLL_MS, self.drain_results)
+
+    def run_pool(self, param_ranges, strategy, budget, patience, batched, shard, results_path):
+        """
+        Analysis thread: runs the simulations on a process pool and posts ("rows", [...]), ("progress", percent)
+        and finally ("done", (run, resumed)) or ("error", message) to the result queue. Never touches Tk directly.
+        New results are appended to `results_path` (if any) as they arrive; settings already in it are not re-run.
+        """
+        try:
+            # Use a process pool to run simulations in parallel
+            num_cores = cpu_count()
 
-        # Use a process pool to run simulations in parallel
-        num_cores = cpu_count()
-        
-        # Prepare a partial function with fixed arguments (season_data, global_unit_counts)
-        worker_func = partial(run_single_simulation, season_data=self.season_data, global_unit_counts=self.global_unit_counts)
-
-        with Pool(processes=num_cores) as pool:
-            # Use imap_unordered for progress updates as results come in
-            results_iterator = pool.imap_unordered(worker_func, enumerate(settings_combinations))
-
-            for i, (sim_id, settings, metrics) in enumerate(results_iterator):
-                self.add_result_to_table(sim_id + 1, settings, metrics)
-                
-                # Update progress bar
-                progress = ((i + 1) / total_simulations) * 100
-                self.progress_var.set(progress)
-        
-        messagebox.showinfo("Analysis Complete", f"Finished {total_simulations} simulations.")
-        self.progress_var.set(0)
+            # Compile the season once and share it; workers attach to it in their initializer
+            units, rounds = compile_season_rounds(self.season_data, self.global_unit_counts)
+            fingerprint = season_fingerprint(units, rounds, len(self.season_data))
+            stored = load_results_file(results_path, fingerprint) if results_path else {}
+            shared_blocks, shared_specs = share_compiled_rounds(rounds)
+            init_args = (shared_specs, units, len(self.season_data), param_ranges)
+
+            try:
+                with Pool(processes=num_cores, initializer=init_worker, initargs=init_args) as pool:
+                    if strategy != "Full Grid":
+                        total_simulations, resumed = self.run_search(pool, strategy, param_ranges, budget, patience, num_cores, stored, results_path, fingerprint)
+                    else:
+                        pending, resumed = self.resume_grid(param_ranges, shard, stored)
+                        total_simulations = len(pending)
+
+                        if batched:
+                            # Hand each process large slices of the grid; every slice is a single batched replay
+                            chunk_size = max(1, min(BATCH_CHUNK_SIZE, math.ceil(total_simulations / num_cores)))
+                            tasks = [pending[start:start + chunk_size] for start in range(0, total_simulations, chunk_size)]
+                            results_iterator = pool.imap_unordered(run_indexed_batch, tasks)
+                        else:
+                            # Use imap_unordered for progress updates as results come in
+                            results_iterator = ([row] for row in pool.imap_unordered(run_indexed_simulation, pending.tolist()))
+
+                        completed = 0
+                        for chunk_results in results_iterator:
+                            rows = [(sim_id + 1, settings, metrics) for sim_id, settings, metrics in chunk_results]
+                            self.record_results(rows, results_path, fingerprint)
+
+                            # Update progress bar
+                            completed += len(rows)
+                            self.result_queue.put(("progress", (completed / total_simulations) * 100))
+            finally:
+                for shm in shared_blocks:
+                    shm.close()
+                    shm.unlink()
+
+            self.result_queue.put(("done", (total_simulations, resumed)))
+        except Exception as e:
+            self.result_queue.put(("error", str(e)))
+
+    def record_results(self, rows, results_path, fingerprint):
+        """Analysis thread: appends freshly evaluated rows to the run's results file (if any) and posts them to the table."""
+        if results_path:
+            append_results_file(results_path, rows, fingerprint)
+        self.result_queue.put(("rows", rows))
+
+    def resume_grid(self, param_ranges, shard, stored):
+        """
+        Analysis thread: picks this shard's flat grid indices, posts the ones already in the results file
+        straight to the table and returns (indices still to run, number resumed).
+        """
+        shard_index, shard_count = shard
+        total = math.prod(len(values) for values in param_ranges.values())
+        indices = np.arange(shard_index, total, shard_count)
+        if not stored:
+            return indices, 0
+
+        is_pending = np.ones(len(indices), dtype=bool)
+        for start in range(0, len(indices), BATCH_CHUNK_SIZE):
+            chunk = indices[start:start + BATCH_CHUNK_SIZE]
+            known_rows = []
+            for j, settings in enumerate(split_settings_batch(settings_for_indices(chunk, param_ranges))):
+                record = stored.get(settings_key(settings))
+                if record is not None:
+                    is_pending[start + j] = False
+                    known_rows.append((int(chunk[j]) + 1, *record))
+            self.result_queue.put(("rows", known_rows))
+        return indices[is_pending], int((~is_pending).sum())
+
+    def drain_results(self):
+        """Moves everything the analysis thread has posted into the table, then polls again until the run ends."""
+        while True:
+            try:
+                kind, payload = self.result_queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if kind == "rows":
+                for settings_id, settings, metrics in payload:
+                    self.offer_result(settings_id, settings, metrics)
+            elif kind == "progress":
+                self.progress_var.set(payload)
+            else:
+                for button in (self.run_btn, self.load_btn, self.choose_btn):
+                    button.config(state=tk.NORMAL)
+                self.progress_var.set(0)
+                if kind == "done":
+                    run, resumed = payload
+                    messagebox.showinfo("Analysis Complete", f"Finished {run} simulations ({resumed} already in the results file).")
+                else:
+                    messagebox.showerror("Analysis Failed", f"The analysis stopped with an error:\n{payload}")
+                return
+
+        self.after(RESULT_POLL_MS, self.drain_results)
+
+    def run_search(self, pool, strategy, param_ranges, budget, patience, num_cores, stored, results_path, fingerprint):
+        """
+        Drives one of the adaptive search strategies on the pool, posting full-season results to the queue.
+        Full-season settings already in `stored` (see load_results_file) are reused instead of replayed;
+        new ones are recorded in `results_path` under the season's fingerprint.
+        Runs on the analysis thread. Returns (season replays run, results reused).
+        """
+        grid_shape = tuple(len(values) for values in param_ranges.values())
+        num_weeks = len(self.season_data)
+        rng = np.random.default_rng()
+
+        if strategy == "Latin Hypercube":
+            batch_size = max(num_cores, budget // 10)
+            search = latin_hypercube_search(grid_shape, budget, patience, batch_size, rng)
+        elif strategy == "Coordinate Descent":
+            search = coordinate_descent_search(grid_shape, budget)
+        else:
+            search = successive_halving_search(grid_shape, num_weeks, budget, rng)
+
+        replays = 0
+        resumed = 0
+        next_id = 1
+        try:
+            positions, prefix_weeks = next(search)
+            while True:
+                positions = np.asarray(positions).reshape(-1, len(grid_shape))
+                ids = np.arange(next_id, next_id + len(positions))
+                known_rows = []
+                if prefix_weeks is None and stored:
+                    is_pending = np.ones(len(positions), dtype=bool)
+                    for j, settings in enumerate(split_settings_batch(settings_for_positions(positions, param_ranges))):
+                        record = stored.get(settings_key(settings))
+                        if record is not None:
+                            is_pending[j] = False
+                            known_rows.append((int(ids[j]), *record))
+                    ids, positions = ids[is_pending], positions[is_pending]
+
+                # Split the rest of the batch across the pool
+                chunk_size = max(1, min(BATCH_CHUNK_SIZE, math.ceil(len(positions) / num_cores)))
+                tasks = [(ids[start:start + chunk_size].tolist(), positions[start:start + chunk_size], prefix_weeks) for start in range(0, len(positions), chunk_size)]
+                new_rows = [row for chunk in pool.imap_unordered(run_position_batch, tasks) for row in chunk]
+
+                if prefix_weeks is None:
+                    self.result_queue.put(("rows", known_rows))
+                    self.record_results(new_rows, results_path, fingerprint)
+                results = sorted(known_rows + new_rows, key=lambda row: row[0])
+                next_id += len(results)
+                replays += len(new_rows)
+                resumed += len(known_rows)
+                self.result_queue.put(("progress", min(100, ((replays + resumed) / budget) * 100)))
+
+                positions, prefix_weeks = search.send(results)
+        except StopIteration:
+            pass
+        return replays, resumed
 
 
 if __name__ == "__main__":
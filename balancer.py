@@ -0,0 +1,674 @@
+"""
+Team balancing search for the Season Tracker's balancer.
+
+Units are identified by their index into the caller's unit list. A split of the units into team A and
+team B is scored by the tuple (gap, min_diff, teammate_score, avg_diff), compared lexicographically,
+lower is better:
+  - gap: how far apart the two teams' [min, max] player ranges are (0 if they overlap)
+  - min_diff: difference between the teams' minimum player totals
+  - teammate_score: summed pair costs of units sharing a team (how often they have played together)
+  - avg_diff: difference between the teams' average (min + max) / 2 player totals
+Among equally scored splits the first one in the original exhaustive order wins: fewer free units on
+team A first, then the lexicographically smallest choice of free units.
+
+The score does not change when the teams are swapped, so when no unit is forced onto a side every split
+is only searched once, with the first free unit on team A; its mirror image is considered for the tie-break.
+
+Teammate costs come from a dense symmetric matrix (see compile_heat_matrix) and teams are kept as 0/1
+membership vectors, so a unit's cost against a whole team is a single row-vector product.
+"""
+
+import heapq
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+WORST_SCORE = (float('inf'), float('inf'), float('inf'), float('inf'))
+
+# A higher multiplier means a stronger penalty for going over the threshold.
+OVER_TEAMING_PENALTY_MULTIPLIER = 10
+
+
+def compile_heat_matrix(teammate_counts):
+    """
+    Compiles the teammate "heat" of every pair of units into a dense symmetric matrix, in the order of
+    `teammate_counts` (units x units times each pair were teammates, as from the tracker's compute_stats).
+    Lower is better, as it means units have played together less. A pair's cost is its teammate count,
+    plus OVER_TEAMING_PENALTY_MULTIPLIER for every time above the league's average pair count.
+    Returns (matrix, average_teammate_count, over_teaming_threshold).
+    """
+    counts = np.array(teammate_counts, dtype=float).reshape(len(teammate_counts), len(teammate_counts))
+    np.fill_diagonal(counts, 0)
+
+    # --- Calculate average teammate count for penalty ---
+    # Over every pair that played together at least once, from the upper triangle
+    pair_counts = counts[np.triu_indices(len(counts), k=1)]
+    pair_counts = pair_counts[pair_counts > 0]
+    average_teammate_count = float(pair_counts.mean()) if pair_counts.size else 0
+    over_teaming_threshold = round(average_teammate_count)
+
+    matrix = counts.copy()
+    if average_teammate_count > 0:
+        over = counts > over_teaming_threshold
+        matrix[over] += (counts[over] - over_teaming_threshold) * OVER_TEAMING_PENALTY_MULTIPLIER
+    return matrix, average_teammate_count, over_teaming_threshold
+
+
+def contract_groups(forced_A, forced_B, free, mins, maxs, pair_costs, groups):
+    """
+    Merges units that must play on the same team into single units before a search, so the solver only
+    decides where each whole group goes: every group of k units removes k - 1 units from the search.
+    groups are lists of unit indices; overlapping groups are joined (union-find).
+
+    A merged unit has the summed min/max player counts of its members, and its pair cost against
+    another unit is the sum over their members. Pairs inside a group share a team in every split, so
+    their cost is left out of the teammate score.
+    Returns (problem, members): the solver arguments over the merged units (forced_A, forced_B, free, mins,
+    maxs, pair_costs) and members[i], the original units in merged unit i (ordered by their first unit).
+    Raises ValueError if a group joins units forced onto opposite teams.
+    """
+    parent = list(range(len(mins)))
+
+    def find(unit):
+        while parent[unit] != unit:
+            parent[unit] = parent[parent[unit]]
+            unit = parent[unit]
+        return unit
+
+    for group in groups:
+        for unit in group[1:]:
+            parent[find(unit)] = find(group[0])
+
+    units = sorted(set(forced_A) | set(forced_B) | set(free))
+    by_root = {}
+    for unit in units:
+        by_root.setdefault(find(unit), []).append(unit)
+    members = sorted(by_root.values())
+
+    # membership[u, i] is 1 if original unit u is in merged unit i
+    membership = np.zeros((len(mins), len(members)), dtype=int)
+    for i, group in enumerate(members):
+        membership[group, i] = 1
+    merged_costs = membership.T @ np.asarray(pair_costs, dtype=float) @ membership
+    np.fill_diagonal(merged_costs, 0)
+
+    on_A = membership[list(forced_A)].sum(axis=0) > 0
+    on_B = membership[list(forced_B)].sum(axis=0) > 0
+    if np.any(on_A & on_B):
+        raise ValueError("Units that must be on the same team are also forced onto opposite teams.")
+
+    problem = {
+        "forced_A": np.flatnonzero(on_A).tolist(),
+        "forced_B": np.flatnonzero(on_B).tolist(),
+        "free": np.flatnonzero(~on_A & ~on_B).tolist(),
+        "mins": (np.asarray(mins, dtype=int) @ membership).tolist(),
+        "maxs": (np.asarray(maxs, dtype=int) @ membership).tolist(),
+        "pair_costs": merged_costs,
+    }
+    return problem, members
+
+
+def team_heat(pair_costs, members):
+    """Summed pair costs of every pair within a team, given as a boolean membership mask."""
+    return pair_costs[np.ix_(members, members)].sum() / 2
+
+
+def score_partition(min_A, max_A, min_B, max_B, teammate_score):
+    """The (gap, min_diff, teammate_score, avg_diff) score of a split with the given player totals."""
+    gap = 0
+    if max_A < min_B:
+        gap = min_B - max_A
+    elif max_B < min_A:
+        gap = min_A - max_B
+
+    min_diff = abs(min_A - min_B)
+    avg_diff = abs((min_A + max_A) / 2 - (min_B + max_B) / 2)
+    return (gap, min_diff, teammate_score, avg_diff)
+
+
+def lower_bound(min_A, max_A, min_B, max_B, teammate_score, remaining_min, remaining_max):
+    """
+    Component-wise lower bound on the score of any split that still has to place units worth
+    remaining_min / remaining_max players. Pair costs are never negative, so teammate_score only grows.
+    """
+    # With t = min + max of the units still going to A (0 <= t <= remaining_min + remaining_max), the two
+    # range gaps are (min_B + remaining_min - max_A) - t and (min_A - max_B - remaining_max) + t.
+    gap_B_over_A = min_B + remaining_min - max_A
+    gap_A_over_B = min_A - max_B - remaining_max
+    t = min(max((gap_B_over_A - gap_A_over_B) / 2, 0), remaining_min + remaining_max)
+    gap = max(0, gap_B_over_A - t, gap_A_over_B + t)
+
+    min_diff = max(0, abs(min_A - min_B) - remaining_min)
+    avg_diff = max(0, abs((min_A + max_A) / 2 - (min_B + max_B) / 2) - (remaining_min + remaining_max) / 2)
+    return (gap, min_diff, teammate_score, avg_diff)
+
+
+def split_teams(on_A, on_B, swap):
+    """Team member lists from membership vectors, exchanged if the mirrored split is the one reported."""
+    teams = (np.flatnonzero(on_A).tolist(), np.flatnonzero(on_B).tolist())
+    return (teams[1], teams[0]) if swap else teams
+
+
+def tie_key(positions_A, num_free, symmetric):
+    """
+    Where a split comes in the original exhaustive order, given the positions in `free` on team A.
+    Returns (key, swap): swap is True if the split is symmetric and its mirror (teams exchanged) comes first.
+    """
+    key = (len(positions_A), sorted(positions_A))
+    if not symmetric:
+        return key, False
+    taken = set(positions_A)
+    mirrored = (num_free - len(positions_A), [p for p in range(num_free) if p not in taken])
+    return (mirrored, True) if mirrored < key else (key, False)
+
+
+def placement_order(free, mins, maxs, fixed):
+    """Positions in `free` in the order branch_and_bound() places them: fixed ones first, then largest first."""
+    rest = sorted((p for p in range(len(free)) if p not in fixed), key=lambda p: -(mins[free[p]] + maxs[free[p]]))
+    return sorted(fixed) + rest
+
+
+class TopSplits:
+    """
+    The top_k best splits offered so far, ranked by (score, tie-break key), in a bounded heap with the
+    worst kept split on top. Splits scoring worse than `incumbent` are never kept.
+    """
+
+    def __init__(self, top_k, incumbent):
+        self.top_k = top_k
+        self.incumbent = incumbent
+        self.heap = [] # (negated score, negated key, result); all score parts and key positions are numbers
+
+    def threshold(self):
+        """The score a split has to match or beat to still be kept; branches bounded above it can be dropped."""
+        if len(self.heap) < self.top_k:
+            return self.incumbent
+        return tuple(-part for part in self.heap[0][0])
+
+    def offer(self, score, key, make_teams):
+        """Keeps a split if it ranks among the top_k; make_teams() -> (team_A, team_B) is only called then."""
+        negated = (tuple(-part for part in score), (-key[0], [-p for p in key[1]]))
+        if len(self.heap) == self.top_k and negated <= self.heap[0][:2]:
+            return
+        team_A, team_B = make_teams()
+        entry = (*negated, {"score": score, "key": key, "team_A": team_A, "team_B": team_B})
+        if len(self.heap) < self.top_k:
+            heapq.heappush(self.heap, entry)
+        else:
+            heapq.heapreplace(self.heap, entry)
+
+    def results(self):
+        """The kept splits, best first."""
+        return [entry[2] for entry in sorted(self.heap, key=lambda entry: entry[:2], reverse=True)]
+
+
+def _start_search(forced_A, forced_B, free, mins, maxs, fixed, incumbent, top_k):
+    """Shared setup: whether the split is symmetric, the fixed sides (anchoring one unit if symmetric) and an empty top list."""
+    symmetric = not forced_A and not forced_B and len(free) > 0
+    if fixed is None:
+        # Without forced units the first placed unit only goes to A; the other half of the splits are mirror images
+        fixed = {placement_order(free, mins, maxs, {})[0]: True} if symmetric else {}
+    return symmetric, fixed, TopSplits(top_k, incumbent)
+
+
+def branch_and_bound(forced_A, forced_B, free, mins, maxs, pair_costs, fixed=None, incumbent=WORST_SCORE, top_k=1):
+    """
+    Finds the top_k best-scoring distinct splits of the free units, with forced_A and forced_B fixed to
+    their teams. mins / maxs hold each unit's player counts and pair_costs[u, v] the cost of u and v
+    sharing a team. `fixed` ({position in free: True for team A}) restricts the search to one shard
+    (see shard_splits), and only splits scoring no worse than `incumbent` are returned.
+
+    Units are placed one at a time, largest first, keeping running min/max totals and teammate score.
+    A branch is dropped as soon as its lower_bound() is worse than the top_k-th best complete split found.
+    Returns a best-first list of {"score", "key", "team_A", "team_B"} with teams as lists of unit indices
+    and `key` the split's place in the tie-break order (empty if nothing scored within the incumbent).
+    """
+    symmetric, fixed, top = _start_search(forced_A, forced_B, free, mins, maxs, fixed, incumbent, top_k)
+
+    # Place the units with the most players first; they move the totals the most
+    order = placement_order(free, mins, maxs, fixed)
+    remaining_min = [0] * (len(order) + 1)
+    remaining_max = [0] * (len(order) + 1)
+    for depth in range(len(order) - 1, -1, -1):
+        unit = free[order[depth]]
+        remaining_min[depth] = remaining_min[depth + 1] + mins[unit]
+        remaining_max[depth] = remaining_max[depth + 1] + maxs[unit]
+
+    pair_costs = np.asarray(pair_costs, dtype=float)
+    on_A = np.zeros(len(mins))
+    on_B = np.zeros(len(mins))
+    on_A[list(forced_A)] = 1
+    on_B[list(forced_B)] = 1
+    chosen = [] # positions in `free` placed on team A
+
+    def visit(depth, min_A, max_A, min_B, max_B, teammate_score):
+        if depth == len(order):
+            score = score_partition(min_A, max_A, min_B, max_B, teammate_score)
+            if score > top.threshold():
+                return
+            key, swap = tie_key(chosen, len(free), symmetric)
+            top.offer(score, key, lambda: split_teams(on_A, on_B, swap))
+            return
+
+        # Ties with the threshold score are still explored, so the original tie-break is kept
+        bound = lower_bound(min_A, max_A, min_B, max_B, teammate_score, remaining_min[depth], remaining_max[depth])
+        if bound > top.threshold():
+            return
+
+        position = order[depth]
+        unit = free[position]
+        costs = pair_costs[unit]
+        cost_A = float(costs @ on_A)
+        cost_B = float(costs @ on_B)
+
+        # Try the side with fewer players first to reach a good split early
+        if position in fixed:
+            sides = ("A",) if fixed[position] else ("B",)
+        else:
+            sides = ("A", "B") if min_A + max_A <= min_B + max_B else ("B", "A")
+        for side in sides:
+            if side == "A":
+                on_A[unit] = 1
+                chosen.append(position)
+                visit(depth + 1, min_A + mins[unit], max_A + maxs[unit], min_B, max_B, teammate_score + cost_A)
+                chosen.pop()
+                on_A[unit] = 0
+            else:
+                on_B[unit] = 1
+                visit(depth + 1, min_A, max_A, min_B + mins[unit], max_B + maxs[unit], teammate_score + cost_B)
+                on_B[unit] = 0
+
+    # Pairs among the forced units are shared by every split
+    teammate_score = team_heat(pair_costs, on_A > 0) + team_heat(pair_costs, on_B > 0)
+
+    visit(
+        0,
+        sum(mins[u] for u in forced_A), sum(maxs[u] for u in forced_A),
+        sum(mins[u] for u in forced_B), sum(maxs[u] for u in forced_B),
+        teammate_score,
+    )
+    return top.results()
+
+
+def gray_code_search(forced_A, forced_B, free, mins, maxs, pair_costs, fixed=None, incumbent=WORST_SCORE, top_k=1):
+    """
+    Exhaustive search over every split of the free units; same arguments and result as branch_and_bound().
+
+    Splits are visited in Gray-code order, so exactly one unit changes team between consecutive
+    candidates and the player totals and teammate score are updated in O(n) per split instead of
+    being recomputed.
+    """
+    symmetric, fixed, top = _start_search(forced_A, forced_B, free, mins, maxs, fixed, incumbent, top_k)
+    num_free = len(free)
+    walked = [p for p in range(num_free) if p not in fixed]
+
+    # Start with the fixed units on their sides and the walked units on team B
+    pair_costs = np.asarray(pair_costs, dtype=float)
+    on_A = np.zeros(len(mins), dtype=bool)
+    on_B = np.zeros(len(mins), dtype=bool)
+    on_A[list(forced_A)] = True
+    on_B[[*forced_B, *free]] = True
+    positions_A = {p for p, on_team_A in fixed.items() if on_team_A}
+    for p in positions_A:
+        on_A[free[p]], on_B[free[p]] = True, False
+
+    # cost_to[True] / cost_to[False]: every unit's summed pair costs with the units currently on team A / B
+    cost_to = {True: pair_costs @ on_A, False: pair_costs @ on_B}
+    teammate_score = team_heat(pair_costs, on_A) + team_heat(pair_costs, on_B)
+    min_A, max_A = sum(mins[u] for u in np.flatnonzero(on_A)), sum(maxs[u] for u in np.flatnonzero(on_A))
+    min_B, max_B = sum(mins[u] for u in np.flatnonzero(on_B)), sum(maxs[u] for u in np.flatnonzero(on_B))
+
+    for step in range(2 ** len(walked)):
+        if step:
+            # Gray code: the bit that flips between step - 1 and step is the lowest set bit of step
+            position = walked[(step & -step).bit_length() - 1]
+            unit = free[position]
+            joining_A = not on_A[unit]
+            teammate_score += cost_to[joining_A][unit] - cost_to[not joining_A][unit]
+            sign = 1 if joining_A else -1
+            min_A += sign * mins[unit]
+            max_A += sign * maxs[unit]
+            min_B -= sign * mins[unit]
+            max_B -= sign * maxs[unit]
+            cost_to[joining_A] += pair_costs[unit]
+            cost_to[not joining_A] -= pair_costs[unit]
+            on_A[unit], on_B[unit] = joining_A, not joining_A
+            if joining_A:
+                positions_A.add(position)
+            else:
+                positions_A.discard(position)
+
+        score = score_partition(min_A, max_A, min_B, max_B, teammate_score)
+        if score > top.threshold():
+            continue
+        key, swap = tie_key(positions_A, num_free, symmetric)
+        top.offer(score, key, lambda: split_teams(on_A, on_B, swap))
+
+    return top.results()
+
+
+# --- Heuristic Search ---
+# Exact searches double in time with every unit, which is too slow for pools of 30+ units. The heuristic
+# starts from a greedy split and improves it with single-unit moves and pair swaps until its time budget
+# is spent; it reports the best splits it has seen, without proving that nothing better exists.
+
+# Seconds a heuristic search runs when no budget is given
+HEURISTIC_TIME_BUDGET = 10.0
+
+# The heuristic stops early after this many restarts in a row find no new split worth keeping
+HEURISTIC_STALL_LIMIT = 200
+
+# Fraction of the movable units moved at random by the first restart; later restarts move fewer
+HEURISTIC_PERTURBATION = 0.3
+
+
+def _scores(min_A, max_A, min_B, max_B, teammate_score):
+    """score_partition() over arrays of candidate totals, as separate (gap, min_diff, teammate_score, avg_diff) arrays."""
+    gap = np.maximum(0, np.maximum(min_B - max_A, min_A - max_B))
+    min_diff = np.abs(min_A - min_B)
+    avg_diff = np.abs((min_A + max_A) / 2 - (min_B + max_B) / 2)
+    return gap, min_diff, teammate_score, avg_diff
+
+
+def heuristic_search(forced_A, forced_B, free, mins, maxs, pair_costs, fixed=None, incumbent=WORST_SCORE, top_k=1,
+                     time_budget=HEURISTIC_TIME_BUDGET, seed=0, start=None):
+    """
+    Anytime search for good splits; same arguments and result as branch_and_bound(), but the splits
+    returned are the best seen within time_budget seconds rather than a proven optimum. seed picks the
+    random restarts, and start (team A's units) continues from an earlier result.
+
+    Without a start the first split is greedy: units are placed largest first, each on the team with fewer players.
+    It is then improved Kernighan-Lin style, taking the best single-unit move or pair swap until none
+    lowers the score. Each restart moves a few random units of the best split found and improves the
+    result again; the number moved shrinks as the budget runs out, like an annealing schedule.
+    """
+    deadline = time.monotonic() + time_budget
+    symmetric, fixed, top = _start_search(forced_A, forced_B, free, mins, maxs, fixed, incumbent, top_k)
+    rng = random.Random(repr((seed, sorted(fixed.items())))) # Same shard and seed, same result
+
+    pair_costs = np.asarray(pair_costs, dtype=float)
+    free_units = np.asarray(free, dtype=int)
+    free_mins = np.asarray(mins)[free_units]
+    free_maxs = np.asarray(maxs)[free_units]
+    movable = [p for p in range(len(free)) if p not in fixed]
+    forced = np.zeros((2, len(mins)), dtype=int)
+    forced[0, list(forced_A)] = 1
+    forced[1, list(forced_B)] = 1
+
+    def evaluate(side):
+        """Totals, membership vectors and per-unit team costs of a split; side[p] is True for team A."""
+        on_A, on_B = forced[0].copy(), forced[1].copy()
+        on_A[free_units[side]] = 1
+        on_B[free_units[~side]] = 1
+        cost_A, cost_B = pair_costs @ on_A, pair_costs @ on_B
+        totals = tuple((np.asarray(counts) @ on_team).item() for on_team in (on_A, on_B) for counts in (mins, maxs))
+        teammate_score = float(on_A @ cost_A + on_B @ cost_B) / 2
+        return totals, teammate_score, on_A, on_B, cost_A[free_units], cost_B[free_units]
+
+    def split_score(side):
+        totals, teammate_score, _, _, _, _ = evaluate(side)
+        return score_partition(*totals, teammate_score)
+
+    def best_change(side, unlocked):
+        """The best-scoring single-unit move or pair swap among the unlocked positions: (positions to flip, score)."""
+        (min_A, max_A, min_B, max_B), teammate_score, _, _, cost_A, cost_B = evaluate(side)
+        on_A = [p for p in unlocked if side[p]]
+        on_B = [p for p in unlocked if not side[p]]
+
+        # Moves: one unit changes team (sign +1 when it leaves team A)
+        moved = np.asarray(unlocked, dtype=int)
+        sign = np.where(side[moved], 1, -1)
+        move_scores = _scores(min_A - sign * free_mins[moved], max_A - sign * free_maxs[moved],
+                              min_B + sign * free_mins[moved], max_B + sign * free_maxs[moved],
+                              teammate_score + sign * (cost_B[moved] - cost_A[moved]))
+
+        # Swaps: a unit from team A (rows) trades places with one from team B (columns)
+        a = np.asarray(on_A, dtype=int)[:, None]
+        b = np.asarray(on_B, dtype=int)[None, :]
+        shift_min = free_mins[b] - free_mins[a]
+        shift_max = free_maxs[b] - free_maxs[a]
+        swap_heat = (cost_B[a] - cost_A[a]) + (cost_A[b] - cost_B[b]) - 2 * pair_costs[free_units[a], free_units[b]]
+        swap_scores = _scores(min_A + shift_min, max_A + shift_max, min_B - shift_min, max_B - shift_max,
+                              teammate_score + swap_heat)
+
+        candidates = [np.concatenate([np.ravel(m), np.ravel(s)]) for m, s in zip(move_scores, swap_scores)]
+        best = np.lexsort(candidates[::-1])[0]
+        score = tuple(c[best].item() for c in candidates)
+        if best < len(moved):
+            return [moved[best]], score
+        row, col = divmod(best - len(moved), len(on_B))
+        return [on_A[row], on_B[col]], score
+
+    seen = set()
+    kept = [0] # splits offered to the top list
+
+    def consider(side, score):
+        """Offers a split to the top list unless it was already seen."""
+        key, swap = tie_key(np.flatnonzero(side).tolist(), len(free), symmetric)
+        seen_key = (key[0], tuple(key[1]))
+        if seen_key in seen:
+            return
+        seen.add(seen_key)
+        if score <= top.threshold():
+            _, _, on_A, on_B, _, _ = evaluate(side)
+            top.offer(score, key, lambda: split_teams(on_A, on_B, swap))
+            kept[0] += 1
+
+    def improve(side, score):
+        """
+        Kernighan-Lin passes: each pass keeps applying the best move or swap of units not yet moved in
+        that pass, even if it makes the split worse, then keeps the best split seen along the way.
+        Passes repeat until one finds nothing better. Every split visited is considered for the top list.
+        Returns the split and its score.
+        """
+        consider(side, score)
+        while True:
+            trial, unlocked = side, list(movable)
+            pass_side, pass_score = side, score
+            while unlocked:
+                flips, trial_score = best_change(trial, unlocked)
+                trial = trial.copy()
+                trial[flips] = ~trial[flips]
+                unlocked = [p for p in unlocked if p not in flips]
+                consider(trial, trial_score)
+                if trial_score < pass_score:
+                    pass_side, pass_score = trial, trial_score
+            if pass_score >= score:
+                return side, score
+            side, score = pass_side, pass_score
+
+    if start is not None:
+        # An earlier result may have been reported with the teams exchanged
+        side = np.isin(free_units, list(start))
+        if any(side[p] != on_team_A for p, on_team_A in fixed.items()):
+            side = ~side
+    else:
+        # Greedy start: largest units first, each onto the side with fewer players so far (fewer teammate costs on ties)
+        side = np.zeros(len(free), dtype=bool)
+        placed = forced.copy()
+        for position in placement_order(free, mins, maxs, fixed):
+            unit = free[position]
+            if position in fixed:
+                to_A = fixed[position]
+            else:
+                players = placed @ (np.asarray(mins) + np.asarray(maxs))
+                costs = placed @ pair_costs[unit]
+                to_A = (players[0], costs[0]) <= (players[1], costs[1])
+            side[position] = to_A
+            placed[0 if to_A else 1, unit] = 1
+
+    best_side, best_score = None, WORST_SCORE
+    stalled = 0
+    while True:
+        kept_before = kept[0]
+        side, score = improve(side, split_score(side))
+        if score < best_score:
+            best_side, best_score = side, score
+
+        remaining = deadline - time.monotonic()
+        stalled = 0 if kept[0] > kept_before else stalled + 1
+        if remaining <= 0 or not movable or stalled >= HEURISTIC_STALL_LIMIT:
+            break
+
+        # Restart from the best split, moving fewer units as time runs out
+        strength = max(1, round(len(movable) * HEURISTIC_PERTURBATION * remaining / time_budget))
+        side = best_side.copy()
+        for position in rng.sample(movable, min(strength, len(movable))):
+            side[position] = not side[position]
+
+    return top.results()
+
+
+# Solvers offered in the balancer window
+SOLVERS = {
+    "Branch and Bound": branch_and_bound,
+    "Exhaustive (Gray Code)": gray_code_search,
+    "Heuristic (Time Budget)": heuristic_search,
+}
+
+# Solvers that run until a time budget is spent instead of until their result is proven the best
+TIMED_SOLVERS = {"Heuristic (Time Budget)"}
+
+# --- Parallel Search ---
+# The splits are divided into shards by the sides of the largest few free units. Every shard is an
+# independent solver call on a process pool; the shard results are merged by (score, tie-break key).
+
+# Aim for this many shards per worker process, so progress moves steadily and cancelling is quick
+SHARDS_PER_WORKER = 4
+
+# Below this many free units a search is quicker than starting worker processes
+PARALLEL_MIN_UNITS = 16
+
+
+def shard_splits(forced_A, forced_B, free, mins, maxs, num_shards):
+    """
+    Fixed-side dicts (see branch_and_bound) that together cover every split exactly once, about
+    num_shards of them. Symmetric splits keep the largest free unit on team A in every shard.
+    """
+    symmetric = not forced_A and not forced_B and len(free) > 0
+    largest = placement_order(free, mins, maxs, {})
+    depth = min(len(free), max(0, (num_shards - 1).bit_length()) + symmetric)
+    anchored = largest[:1] if symmetric else []
+    split_on = largest[len(anchored):depth]
+
+    shards = []
+    for sides in itertools.product((True, False), repeat=len(split_on)):
+        fixed = {position: True for position in anchored}
+        fixed.update(zip(split_on, sides))
+        shards.append(fixed)
+    return shards
+
+
+def _solver_options(solver, options):
+    """The extra arguments a named solver takes (time_budget, seed, start for timed solvers) out of `options`."""
+    if solver not in TIMED_SOLVERS:
+        return {}
+    return {name: value for name, value in options.items() if value is not None}
+
+
+def solve_shard(solver, problem, fixed, incumbent, top_k=1, **options):
+    """Pool task: runs a named solver from SOLVERS on one shard of a problem dict."""
+    return SOLVERS[solver](**problem, fixed=fixed, incumbent=incumbent, top_k=top_k, **_solver_options(solver, options))
+
+
+def merge_results(a, b, top_k):
+    """The top_k best distinct splits of two best-first result lists: lower score, then earlier tie-break key."""
+    distinct = {}
+    for result in a + b:
+        distinct.setdefault((result["key"][0], tuple(result["key"][1])), result)
+    return heapq.nsmallest(top_k, distinct.values(), key=lambda result: (result["score"], result["key"]))
+
+
+class ShardedSearch:
+    """
+    Runs a solver over the shards of a problem on a process pool without blocking the caller.
+    problem holds the solver arguments (forced_A, forced_B, free, mins, maxs, pair_costs).
+    Call poll() periodically (e.g. from Tk's after()) until it reports the search finished, then read
+    `results` (the top_k best splits, best first). New shards are only handed out as others finish,
+    so each one starts from the scores found so far, and cancel() stops handing them out.
+
+    Timed solvers (TIMED_SOLVERS) are not split; their shards are time slices of the whole problem, each
+    with its own seed and continuing from the best split found so far, so the search takes about
+    time_budget seconds and `results` holds the best splits found so far, also after cancel().
+    """
+
+    def __init__(self, solver, problem, max_workers=None, top_k=1, time_budget=None):
+        self.solver = solver
+        self.problem = problem
+        self.top_k = top_k
+        self.results = []
+        self.cancelled = False
+        self.timed = solver in TIMED_SOLVERS
+
+        # Small problems run in the calling process as a single shard; timed searches always use the
+        # pool, so the caller is not blocked for the whole budget
+        in_process = len(problem["free"]) < PARALLEL_MIN_UNITS and not self.timed
+        self.workers = max_workers or os.cpu_count() or 1
+        if self.timed:
+            self.shards = [None] * (self.workers * SHARDS_PER_WORKER)
+        else:
+            self.shards = shard_splits(problem["forced_A"], problem["forced_B"], problem["free"], problem["mins"], problem["maxs"],
+                                       1 if in_process else self.workers * SHARDS_PER_WORKER)
+        self.total = len(self.shards)
+        self.completed = 0
+        self.pending = set()
+        self.executor = None if in_process else ProcessPoolExecutor(max_workers=self.workers)
+
+        # Each worker runs its time slices one after another
+        time_budget = HEURISTIC_TIME_BUDGET if time_budget is None else time_budget
+        self.slice_budget = time_budget * self.workers / self.total if self.timed else None
+
+    def options(self):
+        """Extra solver arguments for the next shard: a timed solver's time slice, seed and starting split."""
+        return {
+            "time_budget": self.slice_budget,
+            "seed": self.total - len(self.shards),
+            "start": self.results[0]["team_A"] if self.results else None,
+        }
+
+    def incumbent(self):
+        return self.results[-1]["score"] if len(self.results) == self.top_k else WORST_SCORE
+
+    def poll(self):
+        """Collects finished shards and hands out new ones. Returns True once the search is over."""
+        if self.executor is None:
+            while self.shards and not self.cancelled:
+                shard_results = solve_shard(self.solver, self.problem, self.shards.pop(0), self.incumbent(), self.top_k, **self.options())
+                self.results = merge_results(self.results, shard_results, self.top_k)
+                self.completed += 1
+            return True
+
+        for future in [f for f in self.pending if f.done()]:
+            self.pending.discard(future)
+            if not future.cancelled():
+                self.results = merge_results(self.results, future.result(), self.top_k)
+                self.completed += 1
+
+        while self.shards and not self.cancelled and len(self.pending) < self.workers:
+            options = self.options()
+            fixed = self.shards.pop(0)
+            self.pending.add(self.executor.submit(solve_shard, self.solver, self.problem, fixed, self.incumbent(), self.top_k, **options))
+
+        if not self.pending:
+            self.executor.shutdown(wait=False)
+            return True
+        return False
+
+    def cancel(self):
+        """Stops handing out shards; shards already running are abandoned."""
+        self.cancelled = True
+        self.shards.clear()
+        if self.executor is not None:
+            for future in self.pending:
+                future.cancel()
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.pending.clear()
+
+
+def solve(solver, problem, top_k=1, time_budget=None):
+    """Runs a named solver over a whole problem in the calling process; returns its best-first results."""
+    return SOLVERS[solver](**problem, top_k=top_k, **_solver_options(solver, {"time_budget": time_budget}))
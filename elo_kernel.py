@@ -0,0 +1,186 @@
+"""
+Shared Elo replay kernel for the Season Tracker and the Elo Settings Tuner.
+
+Callers compile a season into per-round arrays over a fixed unit index (see build_round_arrays),
+then replay_elo() runs each round's team averages, weights and rating updates as array operations.
+Settings use the tuner's key names (initial_elo, k_factor_standard, ..., bias_heavy_def).
+"""
+
+import numpy as np
+
+# Map bias levels as stored in the tracker's Map Biases, in bias code order:
+# balanced, attacker lightly/heavily favored, defender lightly/heavily favored.
+BIAS_LEVELS = (0, 1, 1.5, 2, 2.5)
+
+
+def bias_level_code(level) -> int:
+    """Index of a map bias level in BIAS_LEVELS; unknown levels count as balanced."""
+    return BIAS_LEVELS.index(level) if level in BIAS_LEVELS else 0
+
+
+def build_round_arrays(rounds: list, num_units: int) -> dict:
+    """
+    Packs a list of round dicts into the arrays replay_elo() expects. Rounds must be ordered by week.
+    Each round dict holds: week, round_num, team_a / team_b (unit columns), players (per-unit counts for
+    that week, length num_units), lead_a / lead_b (column or -1), score_a (1 if A won), bias_code,
+    attacker_a, clamp (low, high) for the expected score, sweep_a / sweep_b and playoffs.
+    """
+    num_rounds = len(rounds)
+    arrays = {
+        "week": np.zeros(num_rounds, dtype=int),
+        "round_num": np.zeros(num_rounds, dtype=int),
+        "team_a": np.zeros((num_rounds, num_units), dtype=bool),
+        "team_b": np.zeros((num_rounds, num_units), dtype=bool),
+        "players": np.zeros((num_rounds, num_units), dtype=float),
+        "lead_a": np.full(num_rounds, -1, dtype=int),
+        "lead_b": np.full(num_rounds, -1, dtype=int),
+        "score_a": np.zeros(num_rounds, dtype=float),
+        "bias_code": np.zeros(num_rounds, dtype=int),
+        "attacker_a": np.zeros(num_rounds, dtype=bool),
+        "clamp_low": np.zeros(num_rounds, dtype=float),
+        "clamp_high": np.ones(num_rounds, dtype=float),
+        "sweep_a": np.zeros(num_rounds, dtype=bool),
+        "sweep_b": np.zeros(num_rounds, dtype=bool),
+        "playoffs": np.zeros(num_rounds, dtype=bool),
+    }
+    for i, rnd in enumerate(rounds):
+        arrays["week"][i] = rnd["week"]
+        arrays["round_num"][i] = rnd["round_num"]
+        arrays["team_a"][i, list(rnd["team_a"])] = True
+        arrays["team_b"][i, list(rnd["team_b"])] = True
+        arrays["players"][i] = rnd["players"]
+        arrays["lead_a"][i] = rnd["lead_a"]
+        arrays["lead_b"][i] = rnd["lead_b"]
+        arrays["score_a"][i] = rnd["score_a"]
+        arrays["bias_code"][i] = rnd["bias_code"]
+        arrays["attacker_a"][i] = rnd["attacker_a"]
+        arrays["clamp_low"][i], arrays["clamp_high"][i] = rnd["clamp"]
+        arrays["sweep_a"][i] = rnd["sweep_a"]
+        arrays["sweep_b"][i] = rnd["sweep_b"]
+        arrays["playoffs"][i] = rnd["playoffs"]
+    return arrays
+
+
+def _as_batch(settings: dict) -> dict:
+    """Settings as equal-length float arrays, so one or many combinations share the same code path."""
+    values = np.broadcast_arrays(*(np.atleast_1d(np.asarray(value, dtype=float)) for value in settings.values()))
+    return dict(zip(settings, values))
+
+
+def _column(values):
+    """Per-combination values (or a scalar) shaped to broadcast over unit columns."""
+    return np.reshape(values, (-1, 1))
+
+
+def _bias_multipliers(settings: dict) -> np.ndarray:
+    """Expected-score multipliers for each bias code, one row per settings combination."""
+    return np.stack([
+        np.ones_like(settings["bias_light_att"]),
+        1.0 + (settings["bias_light_att"] / 100.0),
+        1.0 + (settings["bias_heavy_att"] / 100.0),
+        1.0 - (settings["bias_light_def"] / 100.0),
+        1.0 - (settings["bias_heavy_def"] / 100.0),
+    ], axis=1)
+
+
+def _apply_team_changes(ratings, rounds_played, cols, players, lead_col, base_change, sign, round_multiplier, sweep_bonus, settings):
+    """Distributes one team's share of a round result over its units for every settings combination, in place."""
+    # Log-scaled + normalized weights, with the lead unit weighted up
+    weights = np.log(1 + players[cols]) ** _column(settings["size_influence"])
+    weights[:, cols == lead_col] *= _column(settings["lead_multiplier"])
+    total_weight = weights.sum(axis=1, keepdims=True)
+
+    # Relative factor: how far below or above the team average each unit is
+    team_ratings = ratings[:, cols]
+    team_avg_elo = team_ratings.mean(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weights /= total_weight
+        relative_factor = np.clip((team_avg_elo / team_ratings) ** 0.5, 0.8, 1.2)
+    relative_factor = np.where(team_ratings > 0, relative_factor, 1.0)
+
+    k = np.where(rounds_played[cols] < _column(settings["provisional_rounds"]),
+                 _column(settings["k_factor_provisional"]), _column(settings["k_factor_standard"]))
+    delta = k * _column(base_change) * weights * sign * _column(round_multiplier) * _column(sweep_bonus) * relative_factor
+    # A team whose weights sum to zero is left unchanged
+    ratings[:, cols] += np.where(total_weight != 0, delta, 0.0)
+
+
+def replay_elo(rounds: dict, settings: dict, num_units: int, start_week: int, end_week: int,
+               start_ratings=None, start_rounds_played=None) -> dict:
+    """
+    Replays weeks start_week..end_week - 1 of the compiled rounds, starting from the given ratings and
+    rounds played (initial_elo and 0 if omitted).
+    Returns "ratings" and "rounds_played" after each replayed week (weeks x units), plus "expected"
+    (team A's expected score) and "round_index" (row in `rounds`) for every round played.
+
+    Settings may also be equal-length arrays to evaluate N combinations in one pass. Ratings are then
+    kept as an (N x units) array, every round is a broadcast update, and "ratings" becomes
+    (weeks x N x units) and "expected" (rounds x N). Rounds played do not depend on the settings.
+    """
+    batched = any(np.ndim(value) > 0 for value in settings.values())
+    settings = _as_batch(settings)
+    num_settings = len(settings["initial_elo"])
+    initial_rating = settings["initial_elo"]
+
+    if start_ratings is None:
+        ratings = np.repeat(initial_rating[:, None], num_units, axis=1)
+    else:
+        ratings = np.array(np.broadcast_to(np.asarray(start_ratings, dtype=float), (num_settings, num_units)))
+    rounds_played = np.zeros(num_units, dtype=int) if start_rounds_played is None else np.array(start_rounds_played, dtype=int)
+    bias_multipliers = _bias_multipliers(settings)
+
+    num_weeks = max(0, end_week - start_week)
+    ratings_by_week = np.empty((num_weeks, num_settings, num_units))
+    rounds_played_by_week = np.empty((num_weeks, num_units), dtype=int)
+    bounds = np.searchsorted(rounds["week"], np.arange(start_week, start_week + num_weeks + 1))
+    expected = np.empty((bounds[-1] - bounds[0], num_settings))
+
+    for i in range(num_weeks):
+        for r in range(bounds[i], bounds[i + 1]):
+            team_a, team_b = rounds["team_a"][r], rounds["team_b"][r]
+            players = rounds["players"][r]
+
+            # Player-weighted team averages before the round
+            total_players_a = players[team_a].sum()
+            total_players_b = players[team_b].sum()
+            avg_elo_a = (ratings[:, team_a] * players[team_a]).sum(axis=1) / total_players_a if total_players_a > 0 else initial_rating
+            avg_elo_b = (ratings[:, team_b] * players[team_b]).sum(axis=1) / total_players_b if total_players_b > 0 else initial_rating
+
+            # Expected outcome, shifted toward the favored side of the map and clamped
+            expected_a = 1 / (1 + 10 ** ((avg_elo_b - avg_elo_a) / 400))
+            bias_multiplier = bias_multipliers[:, rounds["bias_code"][r]]
+            if rounds["attacker_a"][r]:
+                expected_a *= bias_multiplier
+            else:
+                expected_a /= bias_multiplier
+            expected_a = np.clip(expected_a, rounds["clamp_low"][r], rounds["clamp_high"][r])
+            expected[r - bounds[0]] = expected_a
+
+            base_change = rounds["score_a"][r] - expected_a
+            round_multiplier = settings["playoff_multiplier"] if rounds["playoffs"][r] else 1.0
+            sweep_a = settings["sweep_bonus_multiplier"] if rounds["sweep_a"][r] else 1.0
+            sweep_b = settings["sweep_bonus_multiplier"] if rounds["sweep_b"][r] else 1.0
+
+            if total_players_a > 0:
+                _apply_team_changes(ratings, rounds_played, np.flatnonzero(team_a), players, rounds["lead_a"][r],
+                                    base_change, 1, round_multiplier, sweep_a, settings)
+            if total_players_b > 0:
+                _apply_team_changes(ratings, rounds_played, np.flatnonzero(team_b), players, rounds["lead_b"][r],
+                                    base_change, -1, round_multiplier, sweep_b, settings)
+
+            # Rounds played are counted AFTER the round's Elo changes
+            rounds_played[team_a | team_b] += 1
+
+        ratings_by_week[i] = ratings
+        rounds_played_by_week[i] = rounds_played
+
+    if not batched:
+        ratings_by_week = ratings_by_week[:, 0]
+        expected = expected[:, 0]
+
+    return {
+        "ratings": ratings_by_week,
+        "rounds_played": rounds_played_by_week,
+        "expected": expected,
+        "round_index": np.arange(bounds[0], bounds[-1]),
+    }
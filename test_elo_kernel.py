@@ -0,0 +1,483 @@
+"""
+Parity tests for elo_kernel.replay_elo against the per-round Elo formula it replaced.
+
+Both bundled SSL seasons are replayed through the tuner (which compiles the season and delegates to
+the kernel) and through reference_elo(), a plain-Python copy of the pre-kernel calculation. Final
+ratings, the ratings after every week and the expected score of every round must match, for single
+settings and for the batched (N combinations at once) path.
+
+The tracker compiles its rounds differently (map bias from its Map Biases, clamping only when a map is
+set) and resumes from weekly checkpoints, so every bundled tracker save is also replayed through
+SeasonTrackerGUI.calculate_elo_ratings and checked against reference_tracker_elo(), a copy of the
+tracker's pre-kernel calculation: cold, resumed from checkpoints and after an edit drops them.
+
+Run with: python -m pytest -q test_elo_kernel.py
+"""
+
+import importlib.util
+import itertools
+import json
+import math
+import tkinter as tk
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import elo_kernel
+import tracker
+from maps import maps
+
+HERE = Path(__file__).resolve().parent
+SEASON_FILES = ("SSL Season 2.json", "SSL Season 3.json")
+TRACKER_SEASON_FILES = ("SSL Season 2.json", "SSL Season 3 - Casualty Save.json",
+                        "SSL Season 3 - Optimized Elo Settings WIP.json", "Sunday Night Fights.json")
+
+# Floating-point reordering in the kernel stays far below this
+RTOL, ATOL = 1e-9, 1e-9
+
+SETTINGS_VARIANTS = (
+    {"initial_elo": 1500, "k_factor_standard": 32, "k_factor_provisional": 48, "provisional_rounds": 6,
+     "sweep_bonus_multiplier": 1.2, "lead_multiplier": 1.5, "size_influence": 1.0, "playoff_multiplier": 1.5,
+     "bias_light_att": 5, "bias_heavy_att": 10, "bias_light_def": 5, "bias_heavy_def": 10},
+    {"initial_elo": 1200, "k_factor_standard": 20, "k_factor_provisional": 60, "provisional_rounds": 10,
+     "sweep_bonus_multiplier": 1.0, "lead_multiplier": 1.0, "size_influence": 0.5, "playoff_multiplier": 2.0,
+     "bias_light_att": 0, "bias_heavy_att": 0, "bias_light_def": 0, "bias_heavy_def": 0},
+    {"initial_elo": 1000, "k_factor_standard": 40, "k_factor_provisional": 40, "provisional_rounds": 0,
+     "sweep_bonus_multiplier": 1.5, "lead_multiplier": 2.5, "size_influence": 2.0, "playoff_multiplier": 1.0,
+     "bias_light_att": 15, "bias_heavy_att": 30, "bias_light_def": 15, "bias_heavy_def": 30},
+)
+
+
+def load_tuner():
+    """Imports "Elo Settings Tunder.py" (its file name is not a valid module name)."""
+    spec = importlib.util.spec_from_file_location("elo_settings_tuner", HERE / "Elo Settings Tunder.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+tuner = load_tuner()
+
+
+# Web app (camelCase) week fields -> tracker season fields
+WEB_WEEK_FIELDS = {
+    "teamA": "A", "teamB": "B", "round1Winner": "round1_winner", "round2Winner": "round2_winner",
+    "round1Map": "round1_map", "round2Map": "round2_map", "round1Flipped": "round1_flipped", "round2Flipped": "round2_flipped",
+    "leadA": "lead_A", "leadB": "lead_B", "isPlayoffs": "playoffs", "leadA_r1": "lead_A_r1", "leadB_r1": "lead_B_r1",
+    "leadA_r2": "lead_A_r2", "leadB_r2": "lead_B_r2", "unitPlayerCounts": "unit_player_counts",
+}
+
+
+def load_season(file_name):
+    """Season weeks and global unit counts, as the tuner's Load Season Data reads them (web app exports are converted)."""
+    with open(HERE / file_name, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if "weeks" in data:
+        data = {
+            "season": [{WEB_WEEK_FIELDS[key]: value for key, value in week.items() if key in WEB_WEEK_FIELDS} for week in data["weeks"]],
+            "unit_player_counts": data.get("unitPlayerCounts", {}),
+        }
+    global_unit_counts = defaultdict(tuner.default_unit_counts)
+    global_unit_counts.update(data.get("unit_player_counts", {}))
+    return data["season"], global_unit_counts
+
+
+def reference_elo(season_data, settings, global_unit_counts):
+    """
+    The per-round Elo calculation as it was before elo_kernel, one unit at a time.
+    Returns (units, history, predictions): sorted units, the ratings after each week (weeks + 1 x units,
+    initial ratings first) and one (expected, actual, week, round) tuple per round played.
+    """
+    player_count = tuner.get_unit_average_player_count
+    all_units = set()
+    for week in season_data:
+        all_units.update(week.get("A", []))
+        all_units.update(week.get("B", []))
+    units = sorted(all_units)
+
+    elo_ratings = {unit: settings["initial_elo"] for unit in units}
+    rounds_played = defaultdict(int)
+    history = [dict(elo_ratings)]
+    predictions = []
+
+    bias_percent_map = {
+        0: 1.00,
+        1: 1.0 + (settings["bias_light_att"] / 100.0),
+        1.5: 1.0 + (settings["bias_heavy_att"] / 100.0),
+        2: 1.0 - (settings["bias_light_def"] / 100.0),
+        2.5: 1.0 - (settings["bias_heavy_def"] / 100.0),
+    }
+    usa_attack_maps = set(itertools.chain.from_iterable(maps.values()))
+
+    for week_idx, week_data in enumerate(season_data):
+        current = dict(history[-1])
+        team_A_units = week_data.get("A", set())
+        team_B_units = week_data.get("B", set())
+        if not team_A_units or not team_B_units:
+            history.append(current)
+            continue
+
+        is_playoffs = week_data.get("playoffs", False)
+        round1_winner = week_data.get("round1_winner")
+        round2_winner = week_data.get("round2_winner")
+        sweep_bonus_A = settings["sweep_bonus_multiplier"] if (round1_winner == "A" and round2_winner == "A") else 1.0
+        sweep_bonus_B = settings["sweep_bonus_multiplier"] if (round1_winner == "B" and round2_winner == "B") else 1.0
+
+        for r in [1, 2]:
+            winner = week_data.get(f"round{r}_winner")
+            if not winner:
+                continue
+
+            count = {u: player_count(u, week_idx, season_data, global_unit_counts) for u in itertools.chain(team_A_units, team_B_units)}
+            total_players_A = sum(count[u] for u in team_A_units)
+            total_players_B = sum(count[u] for u in team_B_units)
+            if total_players_A == 0 or total_players_B == 0:
+                continue
+
+            avg_elo_A = sum(current[u] * count[u] for u in team_A_units) / total_players_A
+            avg_elo_B = sum(current[u] * count[u] for u in team_B_units) / total_players_B
+
+            if is_playoffs:
+                lead_A, lead_B = week_data.get(f"lead_A_r{r}"), week_data.get(f"lead_B_r{r}")
+            else:
+                lead_A, lead_B = week_data.get("lead_A"), week_data.get("lead_B")
+
+            map_name = week_data.get(f"round{r}_map")
+            map_bias_level = 0
+            if map_name in maps.get("Heavily_Attacker_Biased", []): map_bias_level = 1.5
+            elif map_name in maps.get("Lightly_Attacker_Biased", []): map_bias_level = 1.0
+            elif map_name in maps.get("Heavily_Defender_Biased", []): map_bias_level = 2.5
+            elif map_name in maps.get("Lightly_Defender_Biased", []): map_bias_level = 2.0
+            bias_multiplier = bias_percent_map.get(map_bias_level, 1.00)
+
+            is_usa_attack = any(base_map in map_name for base_map in usa_attack_maps) if map_name else False
+            usa_side = "B" if week_data.get(f"round{r}_flipped", False) else "A"
+            attacker_side = usa_side if is_usa_attack else ("B" if usa_side == "A" else "A")
+
+            expected_A = 1 / (1 + 10 ** ((avg_elo_B - avg_elo_A) / 400))
+            if attacker_side == "A":
+                expected_A *= bias_multiplier
+            else:
+                expected_A /= bias_multiplier
+            expected_A = max(0.01, min(0.99, expected_A))
+
+            score_A = 1 if winner == "A" else 0
+            predictions.append((expected_A, score_A, week_idx, r))
+            base_change = score_A - expected_A
+
+            def apply_elo_changes(team_units, lead_unit, sign, sweep_bonus):
+                weights = {u: (math.log(1 + count[u]) ** settings["size_influence"]) * (settings["lead_multiplier"] if u == lead_unit else 1)
+                           for u in team_units}
+                total_weight = sum(weights.values())
+                if total_weight == 0:
+                    return
+                team_avg_elo = sum(current[u] for u in team_units) / len(team_units)
+                for u, weight in weights.items():
+                    k = settings["k_factor_provisional"] if rounds_played[u] < settings["provisional_rounds"] else settings["k_factor_standard"]
+                    round_multiplier = settings["playoff_multiplier"] if is_playoffs else 1.0
+                    relative_factor = max(0.8, min(1.2, (team_avg_elo / current[u]) ** 0.5)) if current[u] > 0 else 1.0
+                    current[u] += k * base_change * (weight / total_weight) * sign * round_multiplier * sweep_bonus * relative_factor
+
+            apply_elo_changes(team_A_units, lead_A, 1, sweep_bonus_A)
+            apply_elo_changes(team_B_units, lead_B, -1, sweep_bonus_B)
+            for unit in set(team_A_units) | set(team_B_units):
+                rounds_played[unit] += 1
+
+        history.append(current)
+
+    history = np.array([[ratings[u] for u in units] for ratings in history]).reshape(len(season_data) + 1, len(units))
+    return units, history, predictions
+
+
+@pytest.fixture(scope="module", params=SEASON_FILES)
+def season(request):
+    return load_season(request.param)
+
+
+@pytest.mark.parametrize("settings", SETTINGS_VARIANTS)
+def test_single_settings_match_reference(season, settings):
+    season_data, global_unit_counts = season
+    units, expected_history, expected_predictions = reference_elo(season_data, settings, global_unit_counts)
+
+    final_elos, predictions, history = tuner.calculate_elo_for_season(season_data, settings, global_unit_counts)
+
+    assert list(final_elos) == units
+    np.testing.assert_allclose(history, expected_history, rtol=RTOL, atol=ATOL)
+    np.testing.assert_allclose(list(final_elos.values()), expected_history[-1], rtol=RTOL, atol=ATOL)
+    assert len(predictions) == len(expected_predictions)
+    np.testing.assert_allclose(predictions, np.array(expected_predictions, dtype=float).reshape(-1, 4), rtol=RTOL, atol=ATOL)
+
+
+def test_batched_settings_match_reference(season):
+    season_data, global_unit_counts = season
+    units, rounds = tuner.compile_season_rounds(season_data, global_unit_counts)
+    settings_batch = {name: np.array([settings[name] for settings in SETTINGS_VARIANTS], dtype=float) for name in SETTINGS_VARIANTS[0]}
+
+    replay = elo_kernel.replay_elo(rounds, settings_batch, len(units), 0, len(season_data))
+
+    assert replay["ratings"].shape == (len(season_data), len(SETTINGS_VARIANTS), len(units))
+    for i, settings in enumerate(SETTINGS_VARIANTS):
+        reference_units, expected_history, expected_predictions = reference_elo(season_data, settings, global_unit_counts)
+        assert reference_units == units
+        np.testing.assert_allclose(replay["ratings"][:, i], expected_history[1:], rtol=RTOL, atol=ATOL)
+        np.testing.assert_allclose(replay["expected"][:, i], [prediction[0] for prediction in expected_predictions], rtol=RTOL, atol=ATOL)
+
+
+def test_resumed_replay_matches_full_replay(season):
+    """The tracker resumes from weekly checkpoints: replaying a suffix from saved ratings must match one full pass."""
+    season_data, global_unit_counts = season
+    units, rounds = tuner.compile_season_rounds(season_data, global_unit_counts)
+    settings = SETTINGS_VARIANTS[0]
+    full = elo_kernel.replay_elo(rounds, settings, len(units), 0, len(season_data))
+
+    split = len(season_data) // 2
+    head = elo_kernel.replay_elo(rounds, settings, len(units), 0, split)
+    tail = elo_kernel.replay_elo(rounds, settings, len(units), split, len(season_data),
+                                 start_ratings=head["ratings"][-1], start_rounds_played=head["rounds_played"][-1])
+
+    np.testing.assert_allclose(np.concatenate([head["ratings"], tail["ratings"]]), full["ratings"], rtol=RTOL, atol=ATOL)
+    np.testing.assert_allclose(np.concatenate([head["expected"], tail["expected"]]), full["expected"], rtol=RTOL, atol=ATOL)
+
+
+# --- Tracker ---
+
+@pytest.fixture(scope="module")
+def tcl_root():
+    """A bare Tcl interpreter as the default root: the tracker's Tk variables need one, but no display."""
+    previous = tk._default_root
+    tk._default_root = tk.Tcl()
+    yield tk._default_root
+    tk._default_root = previous
+
+
+def load_tracker(file_name):
+    """A SeasonTrackerGUI with only the data state of __init__ (no widgets), filled by load_from_file."""
+    gui = object.__new__(tracker.SeasonTrackerGUI)
+    gui.units, gui.non_token_units, gui.season, gui.current_week = set(), set(), [], None
+    gui.team_names = {"A": tk.StringVar(value="USA"), "B": tk.StringVar(value="CSA")}
+    gui.unit_player_counts = defaultdict(lambda: {"min": "0", "max": "100"})
+    gui.manual_point_adjustments = defaultdict(int)
+    gui.divisions = []
+    gui.weekly_casualties = defaultdict(dict)
+    gui._elo_checkpoints, gui._season_table = [], None
+    gui._round_fact_weeks, gui._round_facts = [], None
+    gui._round_fact_units, gui._round_fact_unit_index, gui._round_fact_maps, gui._round_fact_map_index = [], {}, [], {}
+    gui._season_snapshots = None
+    gui.point_system_values = {key: tk.StringVar() for key in (
+        "win_lead", "win_assist", "loss_lead", "loss_assist", "bonus_2_0_lead", "bonus_2_0_assist")}
+    gui.elo_system_values = {key: tk.StringVar() for key in (
+        "initial_elo", "k_factor_standard", "k_factor_provisional", "provisional_rounds",
+        "sweep_bonus_multiplier", "lead_multiplier", "size_influence", "playoff_multiplier")}
+    gui.elo_bias_percentages = {key: tk.StringVar() for key in (
+        "light_attacker", "heavy_attacker", "light_defender", "heavy_defender")}
+    gui.map_biases = {}
+    gui.load_from_file(HERE / file_name)
+    return gui
+
+
+def reference_tracker_elo(gui, max_week_index=None):
+    """
+    The tracker's Elo calculation as it was before elo_kernel, reading the season straight from `gui`.
+    Returns (final ratings with "rounds_played", changes from the last week, per-week history).
+    """
+    elo = {key: var.get() for key, var in gui.elo_system_values.items()}
+    initial_rating = int(elo["initial_elo"])
+    k_factor_standard, k_factor_provisional = int(elo["k_factor_standard"]), int(elo["k_factor_provisional"])
+    provisional_rounds = int(elo["provisional_rounds"])
+    sweep_bonus_multiplier, lead_multiplier = float(elo["sweep_bonus_multiplier"]), float(elo["lead_multiplier"])
+    size_influence, playoff_multiplier = float(elo["size_influence"]), float(elo["playoff_multiplier"])
+    bias = {key: int(var.get()) for key, var in gui.elo_bias_percentages.items()}
+    bias_percent_map = {
+        0: 1.00,
+        1: 1.0 + bias["light_attacker"] / 100.0,
+        1.5: 1.0 + bias["heavy_attacker"] / 100.0,
+        2: 1.0 - bias["light_defender"] / 100.0,
+        2.5: 1.0 - bias["heavy_defender"] / 100.0,
+    }
+    usa_attack_maps = {
+        "East Woods Skirmish", "Nicodemus Hill", "Hooker's Push", "Bloody Lane",
+        "Pry Ford", "Smith Field", "Alexander Farm", "Crossroads",
+        "Wagon Road", "Hagertown Turnpike", "Pry Grist Mill", "Otto & Sherrick Farm",
+        "Piper Farm", "West Woods", "Dunker Church", "Burnside Bridge",
+        "Garland's Stand", "Cox's Push", "Hatch's Attack", "Colquitt's Defense",
+        "Flemming's Meadow", "Crossley Creek", "Confederate Encampment"
+    }
+
+    def player_count(unit, week_data):
+        counts = week_data.get("unit_player_counts", {}).get(unit)
+        if counts is not None:
+            try:
+                if int(counts.get("max", 0)) > 0:
+                    return (int(counts.get("min", 0)) + int(counts.get("max", 0))) / 2
+            except (ValueError, TypeError):
+                pass
+        counts = gui.unit_player_counts.get(unit, {"min": "0", "max": "100"})
+        try:
+            return (int(counts.get("min", 0)) + int(counts.get("max", 100))) / 2
+        except (ValueError, TypeError):
+            return 0.0
+
+    def map_bias_level(map_name):
+        try:
+            return float(gui.map_biases[map_name].get()) if map_name in gui.map_biases else 0.0
+        except (ValueError, TypeError):
+            return 0.0
+
+    elo_ratings = defaultdict(lambda: initial_rating)
+    rounds_played = defaultdict(int)
+    for unit in gui.units:
+        _ = elo_ratings[unit]
+    history = [elo_ratings.copy()]
+    weeks_to_process = gui.season[:max_week_index + 1] if max_week_index is not None else gui.season
+
+    for week_data in weeks_to_process:
+        current = history[-1].copy()
+        team_A_units = week_data.get("A", set())
+        team_B_units = week_data.get("B", set())
+        if not team_A_units or not team_B_units:
+            history.append(current)
+            continue
+
+        is_playoffs = week_data.get("playoffs", False)
+        round1_winner = week_data.get("round1_winner")
+        round2_winner = week_data.get("round2_winner")
+        sweep_bonus_A = sweep_bonus_multiplier if (round1_winner == "A" and round2_winner == "A") else 1.0
+        sweep_bonus_B = sweep_bonus_multiplier if (round1_winner == "B" and round2_winner == "B") else 1.0
+
+        for r in [1, 2]:
+            winner = week_data.get(f"round{r}_winner")
+            if not winner:
+                continue
+
+            total_players_A = sum(player_count(u, week_data) for u in team_A_units)
+            total_players_B = sum(player_count(u, week_data) for u in team_B_units)
+            avg_elo_A = sum(current[u] * player_count(u, week_data) for u in team_A_units) / total_players_A if total_players_A > 0 else initial_rating
+            avg_elo_B = sum(current[u] * player_count(u, week_data) for u in team_B_units) / total_players_B if total_players_B > 0 else initial_rating
+
+            if is_playoffs:
+                lead_A, lead_B = week_data.get(f"lead_A_r{r}"), week_data.get(f"lead_B_r{r}")
+            else:
+                lead_A, lead_B = week_data.get("lead_A"), week_data.get("lead_B")
+
+            map_name = week_data.get(f"round{r}_map")
+            expected_A = 1 / (1 + 10 ** ((avg_elo_B - avg_elo_A) / 400))
+            if map_name:
+                bias_multiplier = bias_percent_map.get(map_bias_level(map_name), 1.00)
+                is_usa_attack = any(base_map in map_name for base_map in usa_attack_maps)
+                usa_side = "B" if week_data.get(f"round{r}_flipped", False) else "A"
+                attacker_side = usa_side if is_usa_attack else ("B" if usa_side == "A" else "A")
+                if attacker_side == "A":
+                    expected_A *= bias_multiplier
+                else:
+                    expected_A /= bias_multiplier
+                expected_A = max(0.05, min(0.95, expected_A))
+
+            base_change = (1 if winner == "A" else 0) - expected_A
+
+            def apply_elo_changes(team_units, total_players, lead_unit, sign, sweep_bonus):
+                if total_players <= 0:
+                    return
+                weights = {u: (math.log(1 + player_count(u, week_data)) ** size_influence) * (lead_multiplier if u == lead_unit else 1)
+                           for u in team_units}
+                total_weight = sum(weights.values())
+                team_avg_elo = sum(current[u] for u in team_units) / len(team_units)
+                for u, weight in weights.items():
+                    k = k_factor_provisional if rounds_played[u] < provisional_rounds else k_factor_standard
+                    round_multiplier = playoff_multiplier if is_playoffs else 1.0
+                    relative_factor = max(0.8, min(1.2, (team_avg_elo / current[u]) ** 0.5))
+                    current[u] += k * base_change * (weight / total_weight) * sign * round_multiplier * sweep_bonus * relative_factor
+
+            apply_elo_changes(team_A_units, total_players_A, lead_A, 1, sweep_bonus_A)
+            apply_elo_changes(team_B_units, total_players_B, lead_B, -1, sweep_bonus_B)
+            for unit in itertools.chain(team_A_units, team_B_units):
+                rounds_played[unit] += 1
+
+        history.append(current)
+
+    final_elos = history[-1].copy()
+    final_elos["rounds_played"] = rounds_played
+    prev_elos = history[-2] if len(history) > 1 else {}
+    elo_changes = {unit: final_elos[unit] - prev_elos.get(unit, initial_rating) for unit in gui.units}
+    return final_elos, elo_changes, history
+
+
+def assert_tracker_elo_matches(result, expected):
+    """Compares calculate_elo_ratings output with reference_tracker_elo output."""
+    final_elos, elo_changes, history = result
+    expected_final, expected_changes, expected_history = expected
+
+    assert dict(final_elos["rounds_played"]) == dict(expected_final["rounds_played"])
+    units = sorted(expected_final.keys() - {"rounds_played"})
+    assert sorted(final_elos.keys() - {"rounds_played"}) == units
+    np.testing.assert_allclose([final_elos[u] for u in units], [expected_final[u] for u in units], rtol=RTOL, atol=ATOL)
+    assert elo_changes.keys() == expected_changes.keys()
+    np.testing.assert_allclose([elo_changes[u] for u in units if u in elo_changes],
+                               [expected_changes[u] for u in units if u in expected_changes], rtol=RTOL, atol=ATOL)
+    assert len(history) == len(expected_history)
+    for week_elos, expected_week_elos in zip(history, expected_history):
+        week_units = sorted(expected_week_elos)
+        assert sorted(week_elos.keys() - {"rounds_played"}) == week_units
+        np.testing.assert_allclose([week_elos[u] for u in week_units], [expected_week_elos[u] for u in week_units], rtol=RTOL, atol=ATOL)
+
+
+@pytest.fixture(params=TRACKER_SEASON_FILES)
+def tracker_gui(request, tcl_root):
+    return load_tracker(request.param)
+
+
+def test_tracker_elo_matches_reference(tracker_gui):
+    assert_tracker_elo_matches(tracker_gui.calculate_elo_ratings(), reference_tracker_elo(tracker_gui))
+    assert len(tracker_gui._elo_checkpoints) == len(tracker_gui.season)
+
+    # Every earlier week is now served from checkpoints
+    for week_idx in range(len(tracker_gui.season)):
+        assert_tracker_elo_matches(tracker_gui.calculate_elo_ratings(max_week_index=week_idx),
+                                   reference_tracker_elo(tracker_gui, week_idx))
+
+
+def test_tracker_elo_resumes_from_checkpoints(tracker_gui):
+    split = len(tracker_gui.season) // 2
+    assert_tracker_elo_matches(tracker_gui.calculate_elo_ratings(max_week_index=split - 1),
+                               reference_tracker_elo(tracker_gui, split - 1))
+    assert len(tracker_gui._elo_checkpoints) == split
+
+    # Only the second half is replayed, starting from the first half's checkpoint
+    assert_tracker_elo_matches(tracker_gui.calculate_elo_ratings(), reference_tracker_elo(tracker_gui))
+
+
+def test_tracker_elo_after_edit_matches_reference(tracker_gui):
+    tracker_gui.calculate_elo_ratings()
+    edit_idx = len(tracker_gui.season) // 2
+    week = tracker_gui.season[edit_idx]
+    week["round1_winner"] = "B" if week.get("round1_winner") == "A" else "A"
+    week["round1_map"] = "Bloody Lane" if week.get("round1_map") != "Bloody Lane" else "Pry Ford"
+
+    # As the GUI does after editing the selected week
+    tracker_gui.current_week = week
+    tracker_gui._invalidate_current_week()
+    assert len(tracker_gui._elo_checkpoints) == edit_idx
+
+    assert_tracker_elo_matches(tracker_gui.calculate_elo_ratings(), reference_tracker_elo(tracker_gui))
+
+
+
+def test_tracker_elo_clamps_only_mapped_rounds(tracker_gui):
+    """Strong map bias and a lopsided last week push expected scores past the 0.05-0.95 clamp only mapped rounds get."""
+    tracker_gui.calculate_elo_ratings()
+    for key, value in {"light_attacker": "60", "heavy_attacker": "90", "light_defender": "60", "heavy_defender": "90"}.items():
+        tracker_gui.elo_bias_percentages[key].set(value)
+    tracker_gui.elo_system_values["k_factor_standard"].set("1200")
+    tracker_gui.elo_system_values["k_factor_provisional"].set("1200")
+
+    # As the GUI does after a settings change
+    tracker_gui.invalidate_season_cache()
+    ratings_before = reference_tracker_elo(tracker_gui)[2][-2]
+    ranked = sorted((u for u in ratings_before if u in tracker_gui.units), key=ratings_before.get)
+    week = tracker_gui.season[-1]
+    week.update({"A": set(ranked[-3:]), "B": set(ranked[:3]), "round1_winner": "B", "round2_winner": "B",
+                 "round1_map": None, "round2_map": "Bloody Lane"})
+    tracker_gui.invalidate_season_cache(len(tracker_gui.season) - 1)
+
+    assert_tracker_elo_matches(tracker_gui.calculate_elo_ratings(), reference_tracker_elo(tracker_gui))
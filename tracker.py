@@ -5,11 +5,15 @@ from tkinter import messagebox, filedialog, font as tkFont
 from collections import Counter, defaultdict
 from pathlib import Path
 import csv
+import heapq
 import itertools
 import math
 import statistics
 import ast
+import numpy as np
 from maps import maps
+import elo_kernel
+import balancer
 
 
 # Helper class for Tooltips
@@ -153,6 +157,15 @@ class SeasonTrackerGUI:
         self.manual_point_adjustments: defaultdict[str, int] = defaultdict(int)
         self.divisions: list[dict] = []
         self.weekly_casualties: defaultdict[int, dict] = defaultdict(dict) # week_idx -> {unit: deaths}
+        self._elo_checkpoints: list[dict] = [] # week_idx -> {"ratings", "rounds_played"} after that week
+        self._season_table: dict | None = None # Compiled per-week arrays, see get_season_table()
+        self._round_fact_weeks: list[dict] = [] # week_idx -> that week's compiled rounds and rows
+        self._round_facts: dict | None = None # Round outcome table, see get_round_facts()
+        self._round_fact_units: list[str] = [] # Unit and map codes of the round facts (append-only)
+        self._round_fact_unit_index: dict[str, int] = {}
+        self._round_fact_maps: list[str] = []
+        self._round_fact_map_index: dict[str, int] = {}
+        self._season_snapshots: dict | None = None # Cumulative per-week totals, see get_season_snapshots()
         
         # Point system settings - dictionary of StringVars
         self.point_system_values = {
@@ -444,6 +457,7 @@ class SeasonTrackerGUI:
             } # New field for per-unit casualties
         }
         self.season.append(new_week_data)
+        self.invalidate_season_cache(len(self.season) - 1)
         self.refresh_week_list()
         self.week_list.selection_clear(0, tk.END)
         self.week_list.selection_set(tk.END)
@@ -455,6 +469,7 @@ class SeasonTrackerGUI:
             return
         idx = sel[0]
         del self.season[idx]
+        self.invalidate_season_cache(idx)
         self.refresh_week_list()
         self.current_week = None
         self.refresh_team_lists()
@@ -564,6 +579,7 @@ class SeasonTrackerGUI:
             messagebox.showinfo("Duplicate", f"'{name}' already in units list.")
             return
         self.units.add(name)
+        self.invalidate_season_cache()
         self.unit_entry.delete(0, tk.END)
         self.refresh_units_list()
 
@@ -577,6 +593,7 @@ class SeasonTrackerGUI:
             for wk in self.season:
                 wk["A"].discard(unit)
                 wk["B"].discard(unit)
+            self.invalidate_season_cache()
             self.refresh_units_list()
             self.refresh_team_lists()
 
@@ -628,6 +645,7 @@ class SeasonTrackerGUI:
         elif sel_b:
             unit = self.list_b.get(sel_b[0])
             self.current_week["B"].discard(unit)
+        self._invalidate_current_week()
         self.refresh_team_lists()
         self.refresh_units_list()  # Refresh units list to re-add unassigned unit
 
@@ -659,6 +677,7 @@ class SeasonTrackerGUI:
         other = "B" if team == "A" else "A"
         self.current_week[team].add(unit)
         self.current_week[other].discard(unit)
+        self._invalidate_current_week()
         self.refresh_team_lists()
         self.refresh_units_list()
         self.calculate_and_display_roster_strength()
@@ -679,7 +698,7 @@ class SeasonTrackerGUI:
             tii_stats = {}
         else:
             try:
-                elo_ratings, _ = self.calculate_elo_ratings(max_week_index=previous_week_idx)
+                elo_ratings, _, _ = self.calculate_elo_ratings(max_week_index=previous_week_idx)
                 tii_stats, _ = self.calculate_teammate_impact(max_week_index=previous_week_idx)
             except Exception:
                 elo_ratings = defaultdict(lambda: initial_rating)
@@ -701,7 +720,7 @@ class SeasonTrackerGUI:
             insert_unit_with_stats(self.list_b, u)
             
         self.update_lead_menus()
-        self.calculate_and_display_roster_strength()
+        self.calculate_and_display_roster_strength(elo_ratings)
 
     def update_lead_menus(self):
         """Updates the lead unit OptionMenus based on current_week team rosters."""
@@ -756,6 +775,7 @@ class SeasonTrackerGUI:
             self.current_week["round1_winner"] = actual_winner
         elif round_num == 2:
             self.current_week["round2_winner"] = actual_winner
+        self._invalidate_current_week()
         # print(f"Set Round {round_num} winner to {actual_winner} for week {self.week_list.curselection()}")
         
     def set_round_map(self, round_num: int, map_name: str):
@@ -765,6 +785,7 @@ class SeasonTrackerGUI:
             self.current_week["round1_map"] = actual_map
         elif round_num == 2:
             self.current_week["round2_map"] = actual_map
+        self._invalidate_current_week()
     
     def set_round_flipped(self, round_num: int, flipped: bool):
         if not self.current_week: return
@@ -772,6 +793,7 @@ class SeasonTrackerGUI:
             self.current_week["round1_flipped"] = flipped
         elif round_num == 2:
             self.current_week["round2_flipped"] = flipped
+        self._invalidate_current_week()
     
     def set_lead_unit(self, team_id_key: str, unit_name: str):
         if not self.current_week: return
@@ -797,12 +819,14 @@ class SeasonTrackerGUI:
         # Map the team_id_key to the correct dictionary key in self.current_week
         lead_storage_key = f"lead_{team_id_key}"
         self.current_week[lead_storage_key] = actual_unit
+        self._invalidate_current_week()
         # print(f"Set lead for key {lead_storage_key} to {actual_unit} for week {self.week_list.curselection()}")
 
     def toggle_playoffs_mode(self, update_data=True):
         """Shows/hides lead selection frames based on playoffs checkbox."""
         if self.current_week and update_data:
             self.current_week["playoffs"] = self.playoffs_var.get()
+            self._invalidate_current_week()
 
         if self.playoffs_var.get():
             # Hide regular lead frames, show playoff lead frames
@@ -828,48 +852,62 @@ class SeasonTrackerGUI:
         if not self.current_week: return
         try:
             # Try to convert to int, default to 0 if empty or invalid
-            self.current_week[key] = int(value) if value else 0
+            casualties = int(value) if value else 0
+            # on_week_select refills these vars on every click; only a real edit drops the round facts
+            if casualties == self.current_week.get(key, 0):
+                return
+            self.current_week[key] = casualties
+            if self.current_week in self.season:
+                self._invalidate_round_facts(self.season.index(self.current_week))
         except ValueError:
             # If text is not a valid integer, you might want to reset it
             # or show an error. For now, we'll just ignore non-integer input
             # and keep the old value.
             pass # Or reset the variable: self.r1_casualties_A_var.set(self.current_week.get(key, 0))
 
-    def compute_stats(self, max_week_index: int | None = None):
-        teammate = defaultdict(Counter)
-        opponent = defaultdict(Counter)
-        
-        weeks_to_process = self.season
-        if max_week_index is not None and 0 <= max_week_index < len(self.season):
-            weeks_to_process = self.season[:max_week_index + 1]
+    def compute_stats(self, max_week_index: int | None = None, units: list | None = None) -> dict:
+        """
+        Counts how often each pair of units shared a week roster ("teammates") or faced each other ("opponents")
+        up to max_week_index, as dense (units x units) integer matrices over "units": the given units in order
+        (zero rows for units that never played), else every unit on a roster in those weeks, sorted.
+        A unit is never its own teammate; a unit listed on both teams counts as its own opponent.
+        """
+        # Week rosters' pair counts, from the season snapshots
+        totals = self.get_week_range_totals(0, self._weeks_included(max_week_index) - 1)
+        if units is None:
+            units = sorted(totals["units"][code] for code in np.flatnonzero(totals["roster_weeks"]))
+        codes = np.array([totals["unit_index"].get(unit, -1) for unit in units], dtype=int)
+        known = np.flatnonzero(codes >= 0)
+
+        stats = {"units": list(units)}
+        for key in ("teammates", "opponents"):
+            counts = np.zeros((len(units), len(units)), dtype=int)
+            counts[np.ix_(known, known)] = totals[key][np.ix_(codes[known], codes[known])]
+            stats[key] = counts
+        return stats
 
-        for wk in weeks_to_process:
-            a, b = wk["A"], wk["B"]
-            for u in a:
-                teammate[u].update(v for v in a if v != u)
-                opponent[u].update(b)
-            for u in b:
-                teammate[u].update(v for v in b if v != u)
-                opponent[u].update(a)
-        return teammate, opponent
+    def unique_pair_counts(self, counts: np.ndarray) -> np.ndarray:
+        """The counts of each unordered pair of units that met at least once, from a symmetric count matrix's upper triangle."""
+        pair_counts = counts[np.triu_indices(len(counts), k=1)]
+        return pair_counts[pair_counts > 0]
     
     def calculate_min_max(self, data):
-        """Calculates the minimum and maximum values from a list of numbers."""
-        if not data:
+        """Calculates the minimum and maximum values from an array of numbers."""
+        if len(data) == 0:
             return 0, 0
-        return min(data), max(data)
+        return np.min(data), np.max(data)
 
     def calculate_average(self, data):
-        """Calculates the average of a list of numbers."""
-        if not data:
+        """Calculates the average of an array of numbers."""
+        if len(data) == 0:
             return 0
-        return statistics.mean(data)
+        return np.mean(data)
 
     def calculate_std_dev(self, data):
-        """Calculates the standard deviation of a list of numbers."""
+        """Calculates the sample standard deviation of an array of numbers."""
         if len(data) < 2:
             return 0
-        return statistics.stdev(data)
+        return np.std(data, ddof=1)
 
     def get_detailed_interactions(self):
         """
@@ -937,88 +975,79 @@ class SeasonTrackerGUI:
         pts_bonus_2_0_lead = get_point_value("bonus_2_0_lead", 0)
         pts_bonus_2_0_assist = get_point_value("bonus_2_0_assist", 1)
 
-        weeks_to_process = self.season
-        if max_week_index is not None and 0 <= max_week_index < len(self.season):
-            weeks_to_process = self.season[:max_week_index + 1]
+        totals = self.get_week_range_totals(0, self._weeks_included(max_week_index) - 1)
+        # Playoff rounds count toward W/L but earn no points; 2-0 bonuses use the R1 lead for consistency
+        points = (pts_win_lead * totals["regular_lead_wins"] + pts_win_assist * totals["regular_assist_wins"]
+                  + pts_loss_lead * totals["regular_lead_losses"] + pts_loss_assist * totals["regular_assist_losses"]
+                  + pts_bonus_2_0_lead * totals["bonus_lead"] + pts_bonus_2_0_assist * totals["bonus_assist"])
 
-        for week_data in weeks_to_process:
-            is_playoffs = week_data.get("playoffs", False)
-            team_A_units = week_data.get("A", set())
-            team_B_units = week_data.get("B", set())
-            r1_winner = week_data.get("round1_winner")
-            r2_winner = week_data.get("round2_winner")
-
-            # Determine leads for each round
-            leads = {
-                1: {"A": week_data.get("lead_A_r1") if is_playoffs else week_data.get("lead_A"),
-                    "B": week_data.get("lead_B_r1") if is_playoffs else week_data.get("lead_B")},
-                2: {"A": week_data.get("lead_A_r2") if is_playoffs else week_data.get("lead_A"),
-                    "B": week_data.get("lead_B_r2") if is_playoffs else week_data.get("lead_B")}
-            }
-
-            for round_num, winner in [(1, r1_winner), (2, r2_winner)]:
-                if not winner:
-                    continue
-
-                lead_A = leads[round_num]["A"]
-                lead_B = leads[round_num]["B"]
-                
-                winning_team_units, losing_team_units = (team_A_units, team_B_units) if winner == "A" else (team_B_units, team_A_units)
-                winning_lead, losing_lead = (lead_A, lead_B) if winner == "A" else (lead_B, lead_A)
-
-                # Handle winning team
-                if winning_lead and winning_lead in winning_team_units:
-                    if not is_playoffs: stats[winning_lead]["points"] += pts_win_lead
-                    stats[winning_lead]["lw"] += 1
-                for unit in winning_team_units:
-                    if unit != winning_lead:
-                        if not is_playoffs: stats[unit]["points"] += pts_win_assist
-                        stats[unit]["aw"] += 1
-                
-                # Handle losing team
-                if losing_lead and losing_lead in losing_team_units:
-                    if not is_playoffs: stats[losing_lead]["points"] += pts_loss_lead
-                    stats[losing_lead]["ll"] += 1
-                for unit in losing_team_units:
-                    if unit != losing_lead:
-                        if not is_playoffs: stats[unit]["points"] += pts_loss_assist
-                        stats[unit]["al"] += 1
-
-            # --- Bonus for 2-0 week (only for non-playoff weeks) ---
-            if not is_playoffs and r1_winner and r1_winner == r2_winner:
-                winning_team_units = team_A_units if r1_winner == "A" else team_B_units
-                winning_team_lead = leads[1]["A"] if r1_winner == "A" else leads[1]["B"] # Use R1 lead for consistency
-                
-                for unit in winning_team_units:
-                    if unit == winning_team_lead and winning_team_lead in winning_team_units:
-                        stats[unit]["points"] += pts_bonus_2_0_lead
-                    elif unit != winning_team_lead:
-                        stats[unit]["points"] += pts_bonus_2_0_assist
+        for code in np.flatnonzero(totals["rounds"]):
+            stats[totals["units"][code]] = {"points": int(points[code]),
+                                            "lw": int(totals["lead_wins"][code]), "ll": int(totals["lead_losses"][code]),
+                                            "aw": int(totals["assist_wins"][code]), "al": int(totals["assist_losses"][code])}
         
         return stats
 
-    def get_unit_player_count_for_week(self, unit_name: str, week_index: int) -> float:
+    def get_season_table(self) -> dict:
         """
-        Gets the player count for a specific unit in a specific week.
-        Returns the average of min/max for that week, or falls back to global defaults.
+        Returns the compiled season table, rebuilding it if the season was edited since it was last built.
+        "unit_index" maps each unit to its column; the (weeks x units) arrays are "player_counts" (the count a
+        unit is credited with that week: week-specific average, else global), "reported_counts" (valid
+        week-specific averages only, NaN otherwise) and "participation" (unit was on a roster that week).
+        "average_sums" and "average_weeks" ((weeks + 1) x units) are running totals over weeks 0..k-1 (row k) of
+        the reported counts in weeks a unit played and of the number of such weeks, for O(1) averages.
         """
-        if week_index < 0 or week_index >= len(self.season):
-            return 0.0
-        
-        week_data = self.season[week_index]
-        week_player_counts = week_data.get("unit_player_counts", {})
-        
-        if unit_name in week_player_counts:
-            player_counts = week_player_counts[unit_name]
-            try:
-                min_players = int(player_counts.get("min", 0))
-                max_players = int(player_counts.get("max", 0))
+        if self._season_table is None:
+            self._season_table = self._compile_season_table()
+        return self._season_table
+
+    def _compile_season_table(self) -> dict:
+        """Parses every week's player counts once into the arrays described in get_season_table."""
+        all_units = set(self.units) | set(self.unit_player_counts)
+        for week in self.season:
+            all_units.update(week.get("A", set()), week.get("B", set()), week.get("unit_player_counts", {}))
+        units = sorted(all_units)
+        unit_index = {unit: i for i, unit in enumerate(units)}
+
+        num_weeks = len(self.season)
+        global_counts = np.array([self._get_global_player_count(u) for u in units], dtype=float)
+        player_counts = np.tile(global_counts, (num_weeks, 1))
+        reported_counts = np.full((num_weeks, len(units)), np.nan)
+        participation = np.zeros((num_weeks, len(units)), dtype=bool)
+
+        for week_idx, week in enumerate(self.season):
+            for unit_name, counts in week.get("unit_player_counts", {}).items():
+                try:
+                    min_players = int(counts.get("min", 0))
+                    max_players = int(counts.get("max", 0))
+                except (ValueError, TypeError):
+                    continue # Malformed week data falls back to the global count
                 if max_players > 0:
-                    return (min_players + max_players) / 2
-            except (ValueError, TypeError):
-                pass
-        
-        # Fallback to global player counts
+                    col = unit_index[unit_name]
+                    player_counts[week_idx, col] = reported_counts[week_idx, col] = (min_players + max_players) / 2
+
+            for unit_name in itertools.chain(week.get("A", set()), week.get("B", set())):
+                participation[week_idx, unit_index[unit_name]] = True
+
+        # Running totals, so the average up to any week is a single lookup
+        counted = participation & ~np.isnan(reported_counts)
+        average_sums = np.zeros((num_weeks + 1, len(units)))
+        average_sums[1:] = np.cumsum(np.where(counted, reported_counts, 0.0), axis=0)
+        average_weeks = np.zeros((num_weeks + 1, len(units)), dtype=int)
+        average_weeks[1:] = np.cumsum(counted, axis=0)
+
+        return {
+            "units": units,
+            "unit_index": unit_index,
+            "player_counts": player_counts,
+            "reported_counts": reported_counts,
+            "participation": participation,
+            "average_sums": average_sums,
+            "average_weeks": average_weeks,
+        }
+
+    def _get_global_player_count(self, unit_name: str) -> float:
+        """Average of the unit's global min/max player counts, or 0 if they are malformed."""
         global_counts = self.unit_player_counts.get(unit_name, {"min": "0", "max": "100"})
         try:
             min_players = int(global_counts.get("min", 0))
@@ -1027,133 +1056,361 @@ class SeasonTrackerGUI:
         except (ValueError, TypeError):
             return 0.0
 
+    def get_unit_player_count_for_week(self, unit_name: str, week_index: int) -> float:
+        """
+        Gets the player count for a specific unit in a specific week.
+        Returns the average of min/max for that week, or falls back to global defaults.
+        """
+        if week_index < 0 or week_index >= len(self.season):
+            return 0.0
+
+        table = self.get_season_table()
+        col = table["unit_index"].get(unit_name)
+        if col is None:
+            return self._get_global_player_count(unit_name)
+        return float(table["player_counts"][week_index, col])
+
     def get_unit_average_player_count(self, unit_name: str, max_week_index: int | None = None) -> float:
         """
         Calculates the average number of players a unit brings across all weeks they participated in,
         up to a given max_week_index, using week-specific data if available.
         If a week's data is missing, it's skipped. Defaults to 0 if no data exists.
         """
-        weeks_to_process = self.season
-        if max_week_index is not None:
-            weeks_to_process = self.season[:max_week_index + 1]
+        table = self.get_season_table()
+        col = table["unit_index"].get(unit_name)
+        if col is None:
+            return 0.0
 
-        weekly_averages = []
-        for week in weeks_to_process:
-            # Check if the unit participated in this week
-            if unit_name in week.get("A", set()) or unit_name in week.get("B", set()):
-                # Use week-specific player counts if they exist
-                week_player_counts = week.get("unit_player_counts", {})
-                
-                if unit_name in week_player_counts:
-                    player_counts = week_player_counts[unit_name]
-                    try:
-                        min_players = int(player_counts.get("min", 0))
-                        max_players = int(player_counts.get("max", 0))
-                        
-                        # Only calculate an average if we have a valid max number
-                        if max_players > 0:
-                            weekly_averages.append((min_players + max_players) / 2)
-                            
-                    except (ValueError, TypeError):
-                        # Skip this week's data for this unit if it's malformed
-                        continue
-        
-        if not weekly_averages:
+        row = self._average_row(max_week_index)
+        num_weeks = table["average_weeks"][row, col]
+        if not num_weeks:
             # If no valid weekly data was found across all participated weeks, return 0.
             return 0.0
 
         # Return the average of all the collected weekly averages.
-        return statistics.mean(weekly_averages)
-        
-    def calculate_teammate_impact(self, max_week_index: int | None = None):
+        return float(table["average_sums"][row, col] / num_weeks)
+
+    def get_unit_average_player_counts(self, max_week_index: int | None = None) -> np.ndarray:
+        """get_unit_average_player_count for every column of the season table at once (0 where there is no data)."""
+        table = self.get_season_table()
+        row = self._average_row(max_week_index)
+        num_weeks = table["average_weeks"][row]
+        return np.divide(table["average_sums"][row], num_weeks, out=np.zeros(len(num_weeks)), where=num_weeks > 0)
+
+    def _average_row(self, max_week_index: int | None) -> int:
+        """Row of the season table's running totals covering weeks up to max_week_index (slice semantics, as season[:max_week_index + 1])."""
+        end = max_week_index + 1 if max_week_index is not None else None
+        return len(range(len(self.season))[:end])
+
+    def get_round_facts(self) -> dict:
         """
-        Calculates multiple Teammate Impact metrics:
-        1. Original TII based on average loss rate of teammates.
-        2. Impact as a Lead unit (unit's win rate when leading).
-        3. Impact as an Assist unit (unit's win rate when not leading).
+        Returns the round facts table, the single source for season aggregations over round results.
+        "units" / "unit_index" and "maps" / "map_index" name the integer codes used below.
+        "rounds" holds two entries per week (round r of week w is entry w * 2 + r - 1): "winner" (0 = A, 1 = B,
+        -1 = undecided), "map" (code, -1 without a map), "map_label" (the stored map, "N/A" if unset), "flipped",
+        "attacker_side" (0 / 1, -1 without a map), "casualties" (rounds x 2, A then B), "playoffs" and "sweep"
+        (decided and won by the same side as the week's other round).
+        "rows" holds one entry per unit per side per round, ordered by round, then side, then roster order:
+        "week", "round_index" (entry in "rounds"), "round_num", "team" (round_index * 2 + side), "unit", "side",
+        "decided", "win", "lead", "attacker", "playoffs", "players" (the week's count, see get_season_table)
+        and "both_sides" (a team B row whose unit is also on team A that round).
+        "team_starts" slices the rows of each team, "week_starts" those of weeks 0..k-1 (entry k), and
+        "outcome_order" lists the row indices with each round's winners before its losers.
+        "team_masks" encodes each team's roster as an int with bit c set for unit code c.
+        Weeks are compiled once and kept until invalidated, so editing a week only recompiles it and later weeks.
         """
-        weeks_to_process = self.season
-        if max_week_index is not None and 0 <= max_week_index < len(self.season):
-            weeks_to_process = self.season[:max_week_index + 1]
+        if self._round_facts is None:
+            del self._round_fact_weeks[len(self.season):]
+            for week_idx in range(len(self._round_fact_weeks), len(self.season)):
+                self._round_fact_weeks.append(self._compile_round_fact_week(self.season[week_idx]))
+            self._round_facts = self._assemble_round_facts()
+        return self._round_facts
+
+    def _compile_round_fact_week(self, week: dict) -> dict:
+        """Encodes one week's two rounds and its roster rows, registering new units and maps as they appear."""
+        usa_attack_maps = {
+            "East Woods Skirmish", "Nicodemus Hill", "Hooker's Push", "Bloody Lane",
+            "Pry Ford", "Smith Field", "Alexander Farm", "Crossroads",
+            "Wagon Road", "Hagertown Turnpike", "Pry Grist Mill", "Otto & Sherrick Farm",
+            "Piper Farm", "West Woods", "Dunker Church", "Burnside Bridge",
+            "Garland's Stand", "Cox's Push", "Hatch's Attack", "Colquitt's Defense",
+            "Flemming's Meadow", "Crossley Creek", "Confederate Encampment"
+        }
+        is_playoffs = bool(week.get("playoffs", False))
+        teams = (week.get("A", set()), week.get("B", set()))
+        winners = [{"A": 0, "B": 1}.get(week.get(f"round{r}_winner"), -1) for r in (1, 2)]
+
+        rounds = {"winner": winners, "map": [], "map_label": [], "flipped": [], "attacker_side": [], "casualties": [], "sweep": []}
+        rows = {"round_num": [], "unit": [], "side": [], "lead": [], "both_sides": []}
+        team_masks = [] # Roster bitmasks over the unit codes, one per round per side
+        for r in (1, 2):
+            map_name = week.get(f"round{r}_map")
+            flipped = bool(week.get(f"round{r}_flipped", False))
+            if map_name:
+                usa_side = 1 if flipped else 0
+                attacker_side = usa_side if map_name in usa_attack_maps else 1 - usa_side
+                map_code = self._round_fact_map_index.setdefault(map_name, len(self._round_fact_maps))
+                if map_code == len(self._round_fact_maps):
+                    self._round_fact_maps.append(map_name)
+            else:
+                attacker_side, map_code = -1, -1
+            rounds["map"].append(map_code)
+            rounds["map_label"].append(week.get(f"round{r}_map", "N/A"))
+            rounds["flipped"].append(flipped)
+            rounds["attacker_side"].append(attacker_side)
+            rounds["casualties"].append((week.get(f"r{r}_casualties_A", 0), week.get(f"r{r}_casualties_B", 0)))
+            rounds["sweep"].append(winners[r - 1] >= 0 and winners[0] == winners[1])
+
+            for side, team_id in enumerate(("A", "B")):
+                lead = week.get(f"lead_{team_id}_r{r}") if is_playoffs else week.get(f"lead_{team_id}")
+                team_masks.append(0)
+                for unit in teams[side]:
+                    code = self._round_fact_unit_index.setdefault(unit, len(self._round_fact_units))
+                    if code == len(self._round_fact_units):
+                        self._round_fact_units.append(unit)
+                    team_masks[-1] |= 1 << code
+                    rows["round_num"].append(r)
+                    rows["unit"].append(code)
+                    rows["side"].append(side)
+                    rows["lead"].append(unit == lead)
+                    rows["both_sides"].append(side == 1 and unit in teams[0])
+
+        return {
+            "playoffs": is_playoffs,
+            "team_masks": team_masks,
+            "rounds": {key: np.array(values, dtype=object if key == "map_label" else None) for key, values in rounds.items()},
+            "rows": {key: np.array(values, dtype=bool if key in ("lead", "both_sides") else int) for key, values in rows.items()},
+        }
 
-        # --- Part 1: Setup for Original TII (Teammate Loss Rate) ---
-        total_losses_records = []
-        
-        # --- Part 2: Setup for Lead/Assist Impact ---
-        unit_performances = defaultdict(list)
+    def _assemble_round_facts(self) -> dict:
+        """Concatenates the compiled weeks into the table described in get_round_facts, deriving per-row outcomes."""
+        blocks = self._round_fact_weeks
+        num_weeks = len(blocks)
+
+        def concat(part, key, dtype, shape=()):
+            arrays = [block[part][key] for block in blocks]
+            return np.concatenate(arrays).astype(dtype, copy=False) if arrays else np.zeros((0,) + shape, dtype=dtype)
+
+        rounds = {
+            "winner": concat("rounds", "winner", int),
+            "map": concat("rounds", "map", int),
+            "map_label": concat("rounds", "map_label", object),
+            "flipped": concat("rounds", "flipped", bool),
+            "attacker_side": concat("rounds", "attacker_side", int),
+            "casualties": concat("rounds", "casualties", int, (2,)),
+            "playoffs": np.repeat(np.array([block["playoffs"] for block in blocks], dtype=bool), 2),
+            "sweep": concat("rounds", "sweep", bool),
+        }
 
-        for week in weeks_to_process:
-            is_playoffs = week.get("playoffs", False)
-            for r_num in [1, 2]:
-                winner = week.get(f"round{r_num}_winner")
-                if not winner:
-                    continue
+        rows_per_week = [len(block["rows"]["unit"]) for block in blocks]
+        week = np.repeat(np.arange(num_weeks), rows_per_week)
+        round_num = concat("rows", "round_num", int)
+        unit = concat("rows", "unit", int)
+        side = concat("rows", "side", int)
+        round_index = week * 2 + round_num - 1
+        winner = rounds["winner"][round_index]
+
+        # Each row's player count for its week, from the season table's columns
+        table = self.get_season_table()
+        season_cols = np.array([table["unit_index"].get(u, 0) for u in self._round_fact_units], dtype=int)
+        players = table["player_counts"][week, season_cols[unit]]
+
+        rows = {
+            "week": week,
+            "round_index": round_index,
+            "round_num": round_num,
+            "team": round_index * 2 + side,
+            "unit": unit,
+            "side": side,
+            "decided": winner >= 0,
+            "win": side == winner,
+            "lead": concat("rows", "lead", bool),
+            "attacker": side == rounds["attacker_side"][round_index],
+            "playoffs": rounds["playoffs"][round_index],
+            "players": players,
+            "both_sides": concat("rows", "both_sides", bool),
+        }
 
-                team_A, team_B = week.get("A", set()), week.get("B", set())
-                winning_team, losing_team = (team_A, team_B) if winner == "A" else (team_B, team_A)
+        return {
+            "units": list(self._round_fact_units),
+            "unit_index": dict(self._round_fact_unit_index),
+            "maps": list(self._round_fact_maps),
+            "map_index": dict(self._round_fact_map_index),
+            "rounds": rounds,
+            "rows": rows,
+            "team_starts": np.searchsorted(rows["team"], np.arange(num_weeks * 4 + 1)),
+            "team_masks": list(itertools.chain.from_iterable(block["team_masks"] for block in blocks)),
+            "week_starts": np.searchsorted(week, np.arange(num_weeks + 1)),
+            "outcome_order": np.argsort(round_index * 2 + ~rows["win"], kind="stable"),
+        }
 
-                # Part 1 data collection
-                for unit in winning_team:
-                    total_losses_records.append(0)
-                for unit in losing_team:
-                    total_losses_records.append(1)
+    def _weeks_included(self, max_week_index: int | None, clamp: bool = True) -> int:
+        """
+        Number of leading weeks a statistic covers for max_week_index. With clamp, an index outside the season
+        means the whole season; without, it follows slice semantics (as season[:max_week_index + 1]).
+        """
+        if not clamp:
+            return self._average_row(max_week_index)
+        if max_week_index is not None and 0 <= max_week_index < len(self.season):
+            return max_week_index + 1
+        return len(self.season)
 
-                # Part 2 data collection
-                if is_playoffs:
-                    lead_A, lead_B = week.get(f"lead_A_r{r_num}"), week.get(f"lead_B_r{r_num}")
-                else:
-                    lead_A, lead_B = week.get("lead_A"), week.get("lead_B")
-                
-                winning_lead, losing_lead = (lead_A, lead_B) if winner == "A" else (lead_B, lead_A)
+    def _round_fact_rows(self, facts: dict, num_weeks: int) -> dict:
+        """The round facts' row columns restricted to the first num_weeks weeks."""
+        end = facts["week_starts"][num_weeks]
+        return {key: values[:end] for key, values in facts["rows"].items()}
 
-                for unit in winning_team:
-                    unit_performances[unit].append((0, unit == winning_lead)) # (is_loss=0, is_lead)
-                for unit in losing_team:
-                    unit_performances[unit].append((1, unit == losing_lead)) # (is_loss=1, is_lead)
+    def _unit_tallies(self, facts: dict, units: np.ndarray, weights=None) -> np.ndarray:
+        """Per-unit-code totals of `weights` (or counts) over the given row unit codes, as exact ints."""
+        totals = np.bincount(units, weights=weights, minlength=len(facts["units"]))
+        return totals.astype(int) if weights is not None else totals
+
+    def get_season_snapshots(self) -> dict:
+        """
+        Returns cumulative per-week totals, so any "up to week k" statistic is one row lookup and any
+        "week i through week j" total is the difference of two rows (see get_week_range_totals).
+        Every array has one row per week boundary: row k holds the totals over weeks 0..k-1.
+        Per unit code of the round facts ((weeks + 1) x units): "rounds" (decided rounds played),
+        "lead_wins" / "lead_losses" / "assist_wins" / "assist_losses" (all decided rounds) and their "regular_"
+        counterparts (non-playoff rounds, which earn points), "bonus_lead" / "bonus_assist" (2-0 week bonuses),
+        "teammate_records" / "teammate_losses" (Teammate Impact records), "roster_weeks" (weeks on a roster).
+        Per unit pair ((weeks + 1) x units x units, week rosters): "teammates" and "opponents".
+        Season-wide ((weeks + 1),): "total_records" and "total_losses".
+        Per unit of "casualty_units" ((weeks + 1) x casualty units): "casualties_lost" and "casualty_reports"
+        (reports of zero or more deaths), read under the current team names.
+        Snapshots are rebuilt whenever the round facts or the team names change.
+        """
+        facts = self.get_round_facts()
+        team_names = (self.team_names["A"].get(), self.team_names["B"].get())
+        snapshots = self._season_snapshots
+        if snapshots is None or snapshots["facts"] is not facts or snapshots["team_names"] != team_names:
+            snapshots = self._season_snapshots = self._compile_season_snapshots(facts, team_names)
+        return snapshots
+
+    def _compile_season_snapshots(self, facts: dict, team_names: tuple[str, str]) -> dict:
+        """Builds the per-week totals described in get_season_snapshots and accumulates them over the weeks."""
+        rows = facts["rows"]
+        num_weeks, num_units = len(facts["week_starts"]) - 1, len(facts["units"])
+        decided, win, lead = rows["decided"], rows["win"], rows["lead"]
+        loss, regular = decided & ~win, decided & ~rows["playoffs"]
+        bonus = regular & win & (rows["round_num"] == 1) & facts["rounds"]["sweep"][rows["round_index"]]
+        teammates = np.diff(facts["team_starts"])[rows["team"]] - 1
+        counted = decided & ~rows["both_sides"] # A unit listed on both teams counts with team A
+
+        def weekly(mask, weights=None):
+            cells = rows["week"][mask] * num_units + rows["unit"][mask]
+            totals = np.bincount(cells, weights=None if weights is None else weights[mask], minlength=num_weeks * num_units)
+            return totals.astype(int).reshape(num_weeks, num_units)
+
+        per_week = {
+            "rounds": weekly(decided),
+            "lead_wins": weekly(decided & win & lead), "lead_losses": weekly(loss & lead),
+            "assist_wins": weekly(decided & win & ~lead), "assist_losses": weekly(loss & ~lead),
+            "regular_lead_wins": weekly(regular & win & lead), "regular_lead_losses": weekly(regular & ~win & lead),
+            "regular_assist_wins": weekly(regular & win & ~lead), "regular_assist_losses": weekly(regular & ~win & ~lead),
+            "bonus_lead": weekly(bonus & lead), "bonus_assist": weekly(bonus & ~lead),
+            "teammate_records": weekly(counted, teammates), "teammate_losses": weekly(counted & loss, teammates),
+        }
+        per_week["total_records"] = per_week["rounds"].sum(axis=1)
+        per_week["total_losses"] = (per_week["lead_losses"] + per_week["assist_losses"]).sum(axis=1)
+
+        # Week rosters (the teams of each week's first round) as membership vectors
+        first_round = rows["round_num"] == 1
+        roster_A = weekly(first_round & (rows["side"] == 0)) > 0
+        roster_B = weekly(first_round & (rows["side"] == 1)) > 0
+        teammate_counts = (np.einsum("wi,wj->wij", roster_A, roster_A, dtype=int)
+                           + np.einsum("wi,wj->wij", roster_B, roster_B, dtype=int))
+        teammate_counts[:, np.arange(num_units), np.arange(num_units)] = 0 # A unit is not its own teammate
+        per_week["teammates"] = teammate_counts
+        per_week["opponents"] = (np.einsum("wi,wj->wij", roster_A, roster_B, dtype=int)
+                                 + np.einsum("wi,wj->wij", roster_B, roster_A, dtype=int))
+        per_week["roster_weeks"] = (roster_A | roster_B).astype(int)
+
+        # Reported deaths per unit, from the weekly casualty input
+        casualty_index = {}
+        reports = [] # (week_idx, casualty unit, deaths)
+        for week_idx, week in enumerate(self.season):
+            weekly_cas = week.get("weekly_casualties", {})
+            for team_name in team_names:
+                for round_key in ["r1", "r2"]:
+                    for unit, deaths in weekly_cas.get(team_name, {}).get(round_key, {}).items():
+                        if deaths >= 0:
+                            reports.append((week_idx, casualty_index.setdefault(unit, len(casualty_index)), deaths))
+        report_cells = np.array([(w, u) for w, u, _ in reports], dtype=int).reshape(-1, 2)
+        per_week["casualties_lost"] = np.zeros((num_weeks, len(casualty_index)), dtype=int)
+        per_week["casualty_reports"] = np.zeros((num_weeks, len(casualty_index)), dtype=int)
+        np.add.at(per_week["casualties_lost"], tuple(report_cells.T), np.array([d for _, _, d in reports], dtype=int))
+        np.add.at(per_week["casualty_reports"], tuple(report_cells.T), 1)
+
+        snapshots = {"facts": facts, "team_names": team_names, "units": facts["units"], "unit_index": facts["unit_index"],
+                     "casualty_units": list(casualty_index), "casualty_unit_index": casualty_index}
+        for key, values in per_week.items():
+            cumulative = np.zeros((num_weeks + 1,) + values.shape[1:], dtype=values.dtype)
+            np.cumsum(values, axis=0, out=cumulative[1:])
+            snapshots[key] = cumulative
+        return snapshots
+
+    def get_week_range_totals(self, first_week_index: int = 0, last_week_index: int | None = None) -> dict:
+        """
+        Totals of every get_season_snapshots array over weeks first_week_index..last_week_index (inclusive,
+        clamped to the season; last defaults to the final week), as the difference of two snapshot rows.
+        """
+        snapshots = self.get_season_snapshots()
+        num_weeks = len(snapshots["rounds"]) - 1
+        end = num_weeks if last_week_index is None else min(max(last_week_index + 1, 0), num_weeks)
+        start = min(max(first_week_index, 0), end)
+        totals = {key: snapshots[key] for key in ("units", "unit_index", "casualty_units", "casualty_unit_index")}
+        for key, values in snapshots.items():
+            if isinstance(values, np.ndarray):
+                totals[key] = values[end] - values[start]
+        return totals
+        
+    def calculate_teammate_impact(self, max_week_index: int | None = None):
+        """
+        Calculates multiple Teammate Impact metrics:
+        1. Original TII based on average loss rate of teammates.
+        2. Impact as a Lead unit (unit's win rate when leading).
+        3. Impact as an Assist unit (unit's win rate when not leading).
+        """
+        # --- Per-unit counters over the decided rounds, from the season snapshots ---
+        # Part 1: every unit-round counts toward the global loss rate, and each unit collects one record
+        # per teammate per round (whether that teammate lost). Part 2: rounds as lead / assist, and losses.
+        totals = self.get_week_range_totals(0, self._weeks_included(max_week_index) - 1)
+        total_records, total_losses = int(totals["total_records"]), int(totals["total_losses"])
+        played = [totals["units"][code] for code in np.flatnonzero(totals["rounds"])]
 
         # --- Part 1 Calculation: Global Average Loss Rate ---
-        global_avg_loss_rate = statistics.mean(total_losses_records) if total_losses_records else 0
+        global_avg_loss_rate = self._mean_of_counts(total_losses, total_records) if total_records else 0
+
+        # --- Part 3 Setup: League Average Player Count ---
+        # Only calculate league average based on units that actually played.
+        all_unit_avg_players = [self.get_unit_average_player_count(u, max_week_index) for u in played]
+        league_avg_players = statistics.mean(all_unit_avg_players) if all_unit_avg_players else 0 # Default to 0 if no one played
 
         impact_stats = {}
         all_units = self.units
 
         for unit_u in all_units:
+            code = totals["unit_index"].get(unit_u)
+            # (records, losses) for: teammates of unit_u, unit_u as lead, unit_u as assist
+            counts = [(0, 0)] * 3 if code is None else [
+                (int(totals["teammate_records"][code]), int(totals["teammate_losses"][code])),
+                (int(totals["lead_wins"][code] + totals["lead_losses"][code]), int(totals["lead_losses"][code])),
+                (int(totals["assist_wins"][code] + totals["assist_losses"][code]), int(totals["assist_losses"][code])),
+            ]
+
             # --- Part 1 Calculation: TII for unit_u ---
-            teammate_loss_rates = []
-            for week in weeks_to_process:
-                for r_num in [1, 2]:
-                    winner = week.get(f"round{r_num}_winner")
-                    if not winner: continue
-
-                    team_A, team_B = week.get("A", set()), week.get("B", set())
-                    if unit_u in team_A:
-                        teammates = team_A - {unit_u}
-                        is_loss = (winner == 'B')
-                        if teammates:
-                            teammate_loss_rates.extend([1 if is_loss else 0] * len(teammates))
-                    elif unit_u in team_B:
-                        teammates = team_B - {unit_u}
-                        is_loss = (winner == 'A')
-                        if teammates:
-                            teammate_loss_rates.extend([1 if is_loss else 0] * len(teammates))
-            
-            avg_teammate_loss_rate = statistics.mean(teammate_loss_rates) if teammate_loss_rates else 0
+            num_records, num_losses = counts[0]
+            avg_teammate_loss_rate = self._mean_of_counts(num_losses, num_records) if num_records else 0
             original_tii_score = 1 - avg_teammate_loss_rate
             
             # --- Part 2 Calculation: Lead/Assist Impact for unit_u ---
-            performances = unit_performances.get(unit_u, [])
-            lead_performances = [p[0] for p in performances if p[1]]
-            assist_performances = [p[0] for p in performances if not p[1]]
+            (lead_games, num_lead_losses), (assist_games, num_assist_losses) = counts[1], counts[2]
 
-            lead_impact = 1 - statistics.mean(lead_performances) if lead_performances else 0
-            assist_impact = 1 - statistics.mean(assist_performances) if assist_performances else 0
+            lead_impact = 1 - self._mean_of_counts(num_lead_losses, lead_games) if lead_games else 0
+            assist_impact = 1 - self._mean_of_counts(num_assist_losses, assist_games) if assist_games else 0
 
             # --- Part 3: Player Count Modifier ---
-            # Only calculate league average based on units that actually played.
-            participating_units = [u for u, perfs in unit_performances.items() if perfs]
-            all_unit_avg_players = [self.get_unit_average_player_count(u, max_week_index) for u in participating_units]
-            league_avg_players = statistics.mean(all_unit_avg_players) if all_unit_avg_players else 0 # Default to 0 if no one played
-
             unit_avg_players = self.get_unit_average_player_count(unit_u, max_week_index)
             
             # The player modifier is based on how the unit's average count compares to the league's average count.
@@ -1173,13 +1430,17 @@ class SeasonTrackerGUI:
                 "avg_teammate_loss_rate_with": avg_teammate_loss_rate,
                 "lead_impact": lead_impact,
                 "assist_impact": assist_impact,
-                "lead_games": len(lead_performances),
-                "assist_games": len(assist_performances),
+                "lead_games": lead_games,
+                "assist_games": assist_games,
                 "avg_players": unit_avg_players,
             }
 
         return impact_stats, global_avg_loss_rate
 
+    def _mean_of_counts(self, total: int, count: int):
+        """statistics.mean of `count` 0/1 records summing to `total`: an int when exact, else the nearest float."""
+        return total // count if total % count == 0 else total / count
+
     def show_points_table(self):
         if not self.season:
             messagebox.showinfo("Points Table", "No season data available.")
@@ -1684,64 +1945,54 @@ This tool identifies the strongest and weakest possible team compositions based
         messagebox.showinfo("Lineup Calculation Explained", explanation, parent=self.master)
 
     def calculate_roster_synergy(self, max_week_index: int | None = None):
-        weeks_to_process = self.season
-        if max_week_index is not None and 0 <= max_week_index < len(self.season):
-            weeks_to_process = self.season[:max_week_index + 1]
-
-        pair_stats = defaultdict(lambda: {'wins': 0, 'games': 0})
-        roster_stats = defaultdict(lambda: {'wins': 0, 'games': 0})
-
-        for week in weeks_to_process:
-            for r_num in [1, 2]:
-                winner_team = week.get(f"round{r_num}_winner")
-                if not winner_team:
-                    continue
-
-                team_A = week.get("A", set())
-                team_B = week.get("B", set())
-                
-                winning_roster = team_A if winner_team == "A" else team_B
-                losing_roster = team_B if winner_team == "A" else team_A
-
-                # Full roster stats
-                roster_stats[tuple(sorted(winning_roster))]['wins'] += 1
-                roster_stats[tuple(sorted(winning_roster))]['games'] += 1
-                roster_stats[tuple(sorted(losing_roster))]['games'] += 1
-
+        facts = self.get_round_facts()
+        units, num_weeks = facts["units"], self._weeks_included(max_week_index)
+        winners = facts["rounds"]["winner"][:2 * num_weeks]
+        decided = np.flatnonzero(winners >= 0)
+        winning_teams = (decided * 2 + winners[decided]).tolist()
+        losing_teams = (decided * 2 + 1 - winners[decided]).tolist()
+
+        # Pair stats: rounds x units roster membership, so pair tallies are matrix products
+        rows = self._round_fact_rows(facts, num_weeks)
+        on_winner = np.zeros((len(winners), len(units)), dtype=int)
+        on_loser = np.zeros((len(winners), len(units)), dtype=int)
+        for membership, outcome in ((on_winner, rows["decided"] & rows["win"]), (on_loser, rows["decided"] & ~rows["win"])):
+            membership[rows["round_index"][outcome], rows["unit"][outcome]] = 1
+        pair_wins = on_winner.T @ on_winner
+        pair_games = pair_wins + on_loser.T @ on_loser
+
+        synergy_data = {}
+        for i, j in zip(*np.nonzero(np.triu(pair_games, k=1))):
+            synergy_data[tuple(sorted((units[i], units[j])))] = int(pair_wins[i, j]) / int(pair_games[i, j])
+
+        # Full roster stats, keyed by roster bitmask: [wins, games]
+        roster_stats = {}
+        for winning_team, losing_team in zip(winning_teams, losing_teams):
+            stats = roster_stats.setdefault(facts["team_masks"][winning_team], [0, 0])
+            stats[0] += 1
+            stats[1] += 1
+            roster_stats.setdefault(facts["team_masks"][losing_team], [0, 0])[1] += 1
+
+        # Calculate best/worst lineups: the ends of the rosters ranked by win rate (earlier rosters first on ties)
+        rosters = list(roster_stats.items())
+        win_rates = [wins / games for _, (wins, games) in rosters]
+
+        def ranked(i):
+            return -win_rates[i], i
+
+        best = heapq.nsmallest(5, range(len(rosters)), key=ranked)
+        worst = sorted(heapq.nlargest(5, range(len(rosters)), key=ranked)[::-1], key=lambda i: win_rates[i])
 
-                # Pair stats for winning team
-                for pair in itertools.combinations(winning_roster, 2):
-                    pair_key = tuple(sorted(pair))
-                    pair_stats[pair_key]['wins'] += 1
-                    pair_stats[pair_key]['games'] += 1
-
-                # Pair stats for losing team
-                for pair in itertools.combinations(losing_roster, 2):
-                    pair_key = tuple(sorted(pair))
-                    pair_stats[pair_key]['games'] += 1
-
-        synergy_data = {pair: stats['wins'] / stats['games'] for pair, stats in pair_stats.items() if stats['games'] > 0}
-
-        # Calculate best/worst lineups
-        lineup_win_rates = {
-            roster: (stats['wins'] / stats['games'], stats['games'])
-            for roster, stats in roster_stats.items()
-            if stats['games'] > 0
-        }
-        
-        sorted_lineups = sorted(
-            lineup_win_rates.items(),
-            key=lambda item: item[1][0],
-            reverse=True
-        )
-        
         # Format for display: (roster, win_rate, games)
-        best_lineups = [(r, wr, g) for r, (wr, g) in sorted_lineups[:5]]
-        worst_lineups = sorted([(r, wr, g) for r, (wr, g) in sorted_lineups[-5:]], key=lambda x: x[1])
-
+        best_lineups = [(self._decode_roster(facts, rosters[i][0]), win_rates[i], rosters[i][1][1]) for i in best]
+        worst_lineups = [(self._decode_roster(facts, rosters[i][0]), win_rates[i], rosters[i][1][1]) for i in worst]
 
         return synergy_data, best_lineups, worst_lineups
 
+    def _decode_roster(self, facts: dict, roster_mask: int) -> tuple:
+        """The sorted unit names of a round facts roster bitmask."""
+        return tuple(sorted(facts["units"][code] for code in range(roster_mask.bit_length()) if roster_mask >> code & 1))
+
     def calculate_most_likely_lineups(self, max_week_index, parent_frame):
         """Calculates and displays the most and least likely to win lineups."""
         # Clear only the results frame, not the buttons
@@ -1755,26 +2006,20 @@ This tool identifies the strongest and weakest possible team compositions based
             return
 
         # Get Elo, TII, and Win Rates
-        elos, _ = self.calculate_elo_ratings(max_week_index=max_week_index)
+        elos, _, _ = self.calculate_elo_ratings(max_week_index=max_week_index)
         tii_stats, _ = self.calculate_teammate_impact(max_week_index=max_week_index)
         
-        # Calculate overall win rate for each unit
-        unit_win_loss = defaultdict(lambda: {'wins': 0, 'games': 0})
-        for week in weeks_to_process:
-            for r_num in [1, 2]:
-                winner = week.get(f"round{r_num}_winner")
-                if not winner: continue
-                
-                team_a = week.get("A", set())
-                team_b = week.get("B", set())
-                winning_team = team_a if winner == "A" else team_b
-                losing_team = team_b if winner == "A" else team_a
+        # Calculate overall win rate for each unit, listing units as they first appear (winners of a round first)
+        facts = self.get_round_facts()
+        rows = facts["rows"]
+        order = facts["outcome_order"]
+        order = order[(order < facts["week_starts"][len(weeks_to_process)]) & rows["decided"][order]]
+        wins = self._unit_tallies(facts, rows["unit"][order], rows["win"][order])
+        games = self._unit_tallies(facts, rows["unit"][order])
 
-                for unit in winning_team:
-                    unit_win_loss[unit]['wins'] += 1
-                    unit_win_loss[unit]['games'] += 1
-                for unit in losing_team:
-                    unit_win_loss[unit]['games'] += 1
+        unit_win_loss = defaultdict(lambda: {'wins': 0, 'games': 0})
+        for code in dict.fromkeys(rows["unit"][order].tolist()):
+            unit_win_loss[facts["units"][code]] = {'wins': int(wins[code]), 'games': int(games[code])}
 
         unit_win_rates = {
             unit: (data['wins'] / data['games']) if data['games'] > 0 else 0
@@ -1782,16 +2027,19 @@ This tool identifies the strongest and weakest possible team compositions based
         }
 
         # --- 2. DETERMINE AVERAGE TEAM PLAYER COUNT ---
+        # Average player counts come from the season table's running totals, one row per week
+        unit_index = self.get_season_table()["unit_index"]
         total_players_per_team_per_week = []
         for week_idx, week in enumerate(weeks_to_process):
             team_a_units = week.get("A", set())
             team_b_units = week.get("B", set())
+            week_averages = self.get_unit_average_player_counts(week_idx).tolist()
             
             if team_a_units:
-                size_a = sum(self.get_unit_average_player_count(u, week_idx) for u in team_a_units)
+                size_a = sum(week_averages[unit_index[u]] for u in team_a_units)
                 total_players_per_team_per_week.append(size_a)
             if team_b_units:
-                size_b = sum(self.get_unit_average_player_count(u, week_idx) for u in team_b_units)
+                size_b = sum(week_averages[unit_index[u]] for u in team_b_units)
                 total_players_per_team_per_week.append(size_b)
 
         if not total_players_per_team_per_week:
@@ -1800,10 +2048,11 @@ This tool identifies the strongest and weakest possible team compositions based
             
         avg_player_count_target = statistics.mean(total_players_per_team_per_week)
         
+        average_players = self.get_unit_average_player_counts(max_week_index).tolist()
         participating_units = {
-            unit: self.get_unit_average_player_count(unit, max_week_index)
+            unit: average_players[unit_index[unit]]
             for unit, data in unit_win_loss.items()
-            if data['games'] > 0 and self.get_unit_average_player_count(unit, max_week_index) > 0
+            if data['games'] > 0 and average_players[unit_index[unit]] > 0
         }
 
         # --- 3. GENERATE AND SCORE LINEUPS (KNAPSACK-LIKE APPROACH) ---
@@ -1813,13 +2062,11 @@ This tool identifies the strongest and weakest possible team compositions based
             ttk.Label(parent_frame, text="Could not generate any valid lineups with the given units.").pack(pady=10)
             return
 
-        scored_lineups = []
-        for lineup in all_possible_lineups:
-            power_score = self._calculate_lineup_power(lineup, elos, tii_stats, unit_win_rates)
-            scored_lineups.append((lineup, power_score))
-            
-        # Sort lineups by power score
-        scored_lineups.sort(key=lambda x: x[1], reverse=True)
+        power_scores = self._calculate_lineup_powers(all_possible_lineups, elos, tii_stats, unit_win_rates)
+
+        # Only the 15 strongest and 15 weakest are shown; earlier lineups come first on equal scores
+        strongest = self._select_lineups(power_scores, 15, strongest=True)
+        weakest = self._select_lineups(power_scores, 15, strongest=False)
 
         # --- 4. DISPLAY RESULTS ---
         results_frame = ttk.Frame(parent_frame)
@@ -1839,8 +2086,8 @@ This tool identifies the strongest and weakest possible team compositions based
         win_tree.heading("score", text="Power Score")
         win_tree.column("roster", width=300)
         win_tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        for lineup, score in scored_lineups[:15]:
-            win_tree.insert("", "end", values=(", ".join(lineup), f"{score:.2f}"))
+        for i in strongest:
+            win_tree.insert("", "end", values=(", ".join(all_possible_lineups[i]), f"{power_scores[i]:.2f}"))
 
         # Display bottom 15 losing
         lose_tree = ttk.Treeview(lose_frame, columns=("roster", "score"), show="headings", selectmode="none")
@@ -1848,51 +2095,62 @@ This tool identifies the strongest and weakest possible team compositions based
         lose_tree.heading("score", text="Power Score")
         lose_tree.column("roster", width=300)
         lose_tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        for lineup, score in scored_lineups[-15:][::-1]: # Show worst at top
-            lose_tree.insert("", "end", values=(", ".join(lineup), f"{score:.2f}"))
+        for i in weakest: # Show worst at top
+            lose_tree.insert("", "end", values=(", ".join(all_possible_lineups[i]), f"{power_scores[i]:.2f}"))
 
-    def _find_lineups_for_player_target(self, units_with_players, target, tolerance_percent=5):
+    def _find_lineups_for_player_target(self, units_with_players, target, tolerance_percent=5, limit=5000):
         """
         Finds combinations of units whose total average player count is close to the target.
         This is a variation of the subset sum / knapsack problem.
+        Returns the `limit` lineups closest to the target (earlier found first on ties), kept in a bounded
+        heap while _iter_lineups_for_player_target enumerates them, so memory does not grow with the search.
+        """
+        closest = [] # (-closeness, -found order, lineup); the farthest kept lineup is on top
+        for found, lineup in enumerate(self._iter_lineups_for_player_target(units_with_players, target, tolerance_percent)):
+            entry = (-abs(sum(units_with_players[u] for u in lineup) - target), -found, lineup)
+            if len(closest) < limit:
+                heapq.heappush(closest, entry)
+            elif entry > closest[0]:
+                heapq.heapreplace(closest, entry)
+
+        return [lineup for _, _, lineup in sorted(closest, reverse=True)]
+
+    def _iter_lineups_for_player_target(self, units_with_players, target, tolerance_percent=5):
+        """
+        Yields every combination of units whose rounded player counts sum to within tolerance_percent of
+        the target, each listing its units in units_with_players order. Units are tried largest first, so a
+        branch stops as soon as the next unit overshoots the window or all remaining units cannot reach it.
         """
-        items = list(units_with_players.items())
-        n = len(items)
-        # dp[i][j] will store combinations of first i items that sum to j
-        dp = defaultdict(list)
-        dp[0] = [[]] # Base case: sum of 0 is an empty set
-
-        for i in range(n):
-            unit_name, player_count = items[i]
-            player_count = int(round(player_count))
-            if player_count <= 0: continue
-
-            # Iterate backwards to avoid using the same item multiple times in one combination
-            for current_sum in sorted(dp.keys(), reverse=True):
-                new_sum = current_sum + player_count
-                for combo in dp[current_sum]:
-                    dp[new_sum].append(combo + [unit_name])
-        
-        # Find all combinations within the tolerance of the target
         lower_bound = target * (1 - tolerance_percent / 100)
         upper_bound = target * (1 + tolerance_percent / 100)
-        
-        valid_lineups = []
-        for s, combos in dp.items():
-            if lower_bound <= s <= upper_bound:
-                valid_lineups.extend(combos)
-        
-        # To avoid giant lists, we can limit the number of lineups
-        # and prioritize those closer to the target
-        valid_lineups.sort(key=lambda x: abs(sum(units_with_players[u] for u in x) - target))
 
-        return valid_lineups[:5000] # Limit to a reasonable number of lineups
+        # (rounded count, position) of every unit that brings players, largest first
+        items = [(int(round(player_count)), position) for position, player_count in enumerate(units_with_players.values())]
+        items = sorted((item for item in items if item[0] > 0), key=lambda item: -item[0])
+        names = list(units_with_players)
 
+        # remaining[i]: players of items i.. together, the most a branch starting at item i can still add
+        remaining = list(itertools.accumulate((count for count, _ in reversed(items)), initial=0))[::-1]
 
-    def _calculate_lineup_power(self, lineup, elos, tii_stats, unit_win_rates):
-        """Calculates a power score for a given lineup."""
-        total_power = 0
-        
+        chosen = []
+
+        def extend(start, total):
+            if lower_bound <= total <= upper_bound:
+                yield [names[position] for position in sorted(chosen)]
+            for i in range(start, len(items)):
+                if total + remaining[i] < lower_bound:
+                    break # Later items are smaller still
+                count, position = items[i]
+                if total + count > upper_bound:
+                    continue
+                chosen.append(position)
+                yield from extend(i + 1, total + count)
+                chosen.pop()
+
+        yield from extend(0, 0)
+
+    def _calculate_unit_powers(self, units, elos, tii_stats, unit_win_rates) -> np.ndarray:
+        """Power score of each unit (win rate, normalized Elo and normalized TII), computed once for every lineup."""
         # Normalize Elo scores to a 0-1 scale for combination
         all_elo_values = [v for k, v in elos.items() if isinstance(v, (int, float))]
         min_elo, max_elo = (min(all_elo_values), max(all_elo_values)) if all_elo_values else (1500, 1500)
@@ -1901,73 +2159,76 @@ This tool identifies the strongest and weakest possible team compositions based
         all_tii_values = [v['adjusted_tii_score'] for v in tii_stats.values() if v.get('assist_games',0) + v.get('lead_games',0) > 0]
         min_tii, max_tii = (min(all_tii_values), max(all_tii_values)) if all_tii_values else (0,1)
 
-        for unit in lineup:
-            # Win Rate (Weight: 0.4)
-            win_rate_score = unit_win_rates.get(unit, 0)
-            
-            # Normalized Elo (Weight: 0.3)
-            elo = elos.get(unit, 1500)
-            norm_elo = (elo - min_elo) / (max_elo - min_elo) if max_elo > min_elo else 0.5
+        # Win Rate (Weight: 0.4)
+        win_rate_score = np.array([unit_win_rates.get(unit, 0) for unit in units], dtype=float)
 
-            # Normalized TII (Weight: 0.3)
-            tii = tii_stats.get(unit, {}).get('adjusted_tii_score', 0)
-            norm_tii = (tii - min_tii) / (max_tii - min_tii) if max_tii > min_tii else 0.5
-            
-            # Combine scores
-            unit_power = (win_rate_score * 0.4) + (norm_elo * 0.3) + (norm_tii * 0.3)
-            total_power += unit_power
-            
-        return total_power / len(lineup) if lineup else 0
+        # Normalized Elo (Weight: 0.3)
+        elo = np.array([elos.get(unit, 1500) for unit in units], dtype=float)
+        norm_elo = (elo - min_elo) / (max_elo - min_elo) if max_elo > min_elo else np.full(len(units), 0.5)
+
+        # Normalized TII (Weight: 0.3)
+        tii = np.array([tii_stats.get(unit, {}).get('adjusted_tii_score', 0) for unit in units], dtype=float)
+        norm_tii = (tii - min_tii) / (max_tii - min_tii) if max_tii > min_tii else np.full(len(units), 0.5)
+
+        # Combine scores
+        return (win_rate_score * 0.4) + (norm_elo * 0.3) + (norm_tii * 0.3)
+
+    def _calculate_lineup_powers(self, lineups, elos, tii_stats, unit_win_rates) -> np.ndarray:
+        """
+        Power score of every lineup: the average power of its units (0 for an empty lineup).
+        Lineups are packed as rows of a sparse lineup x unit table (a flat list of unit columns plus row ids),
+        so all of them are scored in one weighted bincount.
+        """
+        units = sorted({unit for lineup in lineups for unit in lineup})
+        column = {unit: i for i, unit in enumerate(units)}
+        unit_powers = self._calculate_unit_powers(units, elos, tii_stats, unit_win_rates)
+
+        sizes = np.array([len(lineup) for lineup in lineups], dtype=int)
+        columns = np.array([column[unit] for lineup in lineups for unit in lineup], dtype=int)
+        rows = np.repeat(np.arange(len(lineups)), sizes)
+        total_power = np.bincount(rows, weights=unit_powers[columns], minlength=len(lineups))
+        return np.divide(total_power, sizes, out=np.zeros(len(lineups)), where=sizes > 0)
+
+    def _select_lineups(self, power_scores, count, strongest=True) -> list:
+        """
+        Indices of the `count` highest (or lowest) power scores, best (or worst) first; on equal scores the
+        earlier lineup comes first among the strongest and the later one among the weakest.
+        argpartition finds the cut-off score, so only lineups at or past it are sorted.
+        """
+        count = min(count, len(power_scores))
+        if count == 0:
+            return []
+        signed = -power_scores if strongest else power_scores
+        cutoff = signed[np.argpartition(signed, count - 1)[count - 1]]
+        candidates = np.flatnonzero(signed <= cutoff)
+        order = candidates if strongest else -candidates
+        return candidates[np.lexsort((order, signed[candidates]))][:count].tolist()
 
 
     def calculate_attack_defense_performance(self, max_week_index: int | None = None):
-        weeks_to_process = self.season
-        if max_week_index is not None:
-            weeks_to_process = self.season[:max_week_index + 1]
+        facts = self.get_round_facts()
+        rows = self._round_fact_rows(facts, self._weeks_included(max_week_index, clamp=False))
 
         unit_performance = defaultdict(lambda: {
             "attack_wins": 0, "attack_losses": 0,
             "defend_wins": 0, "defend_losses": 0
         })
 
-        usa_attack_maps = {
-            "East Woods Skirmish", "Nicodemus Hill", "Hooker's Push", "Bloody Lane",
-            "Pry Ford", "Smith Field", "Alexander Farm", "Crossroads",
-            "Wagon Road", "Hagertown Turnpike", "Pry Grist Mill", "Otto & Sherrick Farm",
-            "Piper Farm", "West Woods", "Dunker Church", "Burnside Bridge",
-            "Garland's Stand", "Cox's Push", "Hatch's Attack", "Colquitt's Defense",
-            "Flemming's Meadow", "Crossley Creek", "Confederate Encampment"
-        }
+        # Decided rounds with a map; the attacking side comes from the map and whether sides were flipped
+        played = rows["decided"] & (facts["rounds"]["map"][rows["round_index"]] >= 0)
+        win, attacker = rows["win"], rows["attacker"]
 
-        for week in weeks_to_process:
-            for r in [1, 2]:
-                map_name = week.get(f"round{r}_map")
-                winner = week.get(f"round{r}_winner")
-                flipped = week.get(f"round{r}_flipped", False)
-                if not map_name or not winner:
-                    continue
+        def tally(mask):
+            return self._unit_tallies(facts, rows["unit"][mask])
 
-                usa_side = "A" if not flipped else "B"
-                csa_side = "B" if not flipped else "A"
-                
-                is_usa_attack = map_name in usa_attack_maps
-                attacker_side = usa_side if is_usa_attack else csa_side
-                defender_side = csa_side if is_usa_attack else usa_side
+        attack_wins, defend_wins = tally(played & win & attacker), tally(played & win & ~attacker)
+        attack_losses, defend_losses = tally(played & ~win & attacker), tally(played & ~win & ~attacker)
 
-                winning_team = week.get(winner, set())
-                losing_team_id = 'B' if winner == 'A' else 'A'
-                losing_team = week.get(losing_team_id, set())
-                
-                if winner == attacker_side:
-                    for unit in winning_team:
-                        unit_performance[unit]["attack_wins"] += 1
-                    for unit in losing_team:
-                        unit_performance[unit]["defend_losses"] += 1
-                else: # defender wins
-                    for unit in winning_team:
-                        unit_performance[unit]["defend_wins"] += 1
-                    for unit in losing_team:
-                        unit_performance[unit]["attack_losses"] += 1
+        for code in np.flatnonzero(tally(played)):
+            unit_performance[facts["units"][code]] = {
+                "attack_wins": int(attack_wins[code]), "attack_losses": int(attack_losses[code]),
+                "defend_wins": int(defend_wins[code]), "defend_losses": int(defend_losses[code])
+            }
 
         return unit_performance
         tree.configure(yscrollcommand=vsb.set)
@@ -1985,18 +2246,10 @@ This tool identifies the strongest and weakest possible team compositions based
         if max_week_index is not None:
             weeks_to_process = self.season[:max_week_index + 1]
 
-        # First, aggregate all deaths for each unit across all relevant weeks
-        for week in weeks_to_process:
-            weekly_cas = week.get("weekly_casualties", {})
-            team_a_name = self.team_names["A"].get()
-            team_b_name = self.team_names["B"].get()
-
-            for team_name in [team_a_name, team_b_name]:
-                for round_key in ["r1", "r2"]:
-                    cas_data = weekly_cas.get(team_name, {}).get(round_key, {})
-                    for unit, deaths in cas_data.items():
-                        if deaths >= 0:
-                            lost[unit] += deaths
+        # First, total the deaths for each unit across all relevant weeks, from the season snapshots
+        totals = self.get_week_range_totals(0, len(weeks_to_process) - 1)
+        for code in np.flatnonzero(totals["casualty_reports"]).tolist():
+            lost[totals["casualty_units"][code]] = int(totals["casualties_lost"][code])
         
         # Now, iterate again to distribute kills based on the final death counts
         for week in weeks_to_process:
@@ -2247,32 +2500,14 @@ This tool identifies the strongest and weakest possible team compositions based
         records = []
         header = ['Week', 'Unit', 'Team', 'Round', 'Map', 'Loss']
         
-        for week_idx, week_data in enumerate(self.season):
-            week_num = week_idx + 1
-            
-            # --- Round 1 ---
-            winner_r1 = week_data.get("round1_winner")
-            map_r1 = week_data.get("round1_map", "N/A")
-            if winner_r1 and winner_r1 != "None":
-                loser_r1 = 'B' if winner_r1 == 'A' else 'A'
-                
-                for unit in week_data.get(winner_r1, set()):
-                    records.append([week_num, unit, self.team_names[winner_r1].get(), 1, map_r1, 0])
-                
-                for unit in week_data.get(loser_r1, set()):
-                    records.append([week_num, unit, self.team_names[loser_r1].get(), 1, map_r1, 1])
-
-            # --- Round 2 ---
-            winner_r2 = week_data.get("round2_winner")
-            map_r2 = week_data.get("round2_map", "N/A")
-            if winner_r2 and winner_r2 != "None":
-                loser_r2 = 'B' if winner_r2 == 'A' else 'A'
-
-                for unit in week_data.get(winner_r2, set()):
-                    records.append([week_num, unit, self.team_names[winner_r2].get(), 2, map_r2, 0])
-
-                for unit in week_data.get(loser_r2, set()):
-                    records.append([week_num, unit, self.team_names[loser_r2].get(), 2, map_r2, 1])
+        # One record per unit per decided round, winners before losers
+        facts = self.get_round_facts()
+        rows = facts["rows"]
+        team_names = [self.team_names["A"].get(), self.team_names["B"].get()]
+        for i in facts["outcome_order"][rows["decided"][facts["outcome_order"]]].tolist():
+            round_index = rows["round_index"][i]
+            records.append([int(rows["week"][i]) + 1, facts["units"][rows["unit"][i]], team_names[rows["side"][i]],
+                            int(rows["round_num"][i]), facts["rounds"]["map_label"][round_index], 0 if rows["win"][i] else 1])
 
         # Now, calculate the total losses per unit from the records
         losses_per_unit = Counter()
@@ -2356,21 +2591,13 @@ This tool identifies the strongest and weakest possible team compositions based
                 except (ValueError, IndexError):
                     max_week_idx = None # Fallback
 
-            teammate_stats, _ = self.compute_stats(max_week_index=max_week_idx)
-
+            teammate_stats = self.compute_stats(max_week_index=max_week_idx, units=all_units_in_heatmap)["teammates"]
 
-            # Find max count for color scaling
             # --- Teammate Interaction Stats ---
-            interaction_counts = []
-            processed_pairs = set()
-            for unit1, teammates in teammate_stats.items():
-                for unit2, count in teammates.items():
-                    pair = tuple(sorted((unit1, unit2)))
-                    if pair not in processed_pairs:
-                        interaction_counts.append(count)
-                        processed_pairs.add(pair)
-
-            if interaction_counts:
+            # Every pair that played together, over all units on a roster (not only those shown)
+            interaction_counts = self.unique_pair_counts(self.compute_stats(max_week_index=max_week_idx)["teammates"])
+
+            if len(interaction_counts):
                 min_val, max_val = self.calculate_min_max(interaction_counts)
                 avg_val = self.calculate_average(interaction_counts)
                 std_dev = self.calculate_std_dev(interaction_counts)
@@ -2384,7 +2611,7 @@ This tool identifies the strongest and weakest possible team compositions based
                 print("-------------------------------------------------")
 
             # Find max count for color scaling
-            max_teammate_count = max(interaction_counts) if interaction_counts else 0
+            max_teammate_count = int(interaction_counts.max()) if len(interaction_counts) else 0
             
             cell_size = 60
             padding = 75
@@ -2415,7 +2642,7 @@ This tool identifies the strongest and weakest possible team compositions based
                         canvas.create_line(x1 + 5, y1 + 5, x2 - 5, y2 - 5, fill="black", width=1, tags=(cell_tag,))
                         canvas.create_line(x1 + 5, y2 - 5, x2 - 5, y1 + 5, fill="black", width=1, tags=(cell_tag,))
                     else:
-                        count = teammate_stats.get(unit_row, {}).get(unit_col, 0)
+                        count = int(teammate_stats[r_idx, c_idx])
                         intensity = count / max_teammate_count if max_teammate_count > 0 else 0.0
                         
                         r, g, b = 255, int(255 * (1 - intensity)), int(224 * (1 - intensity))
@@ -2557,13 +2784,11 @@ This tool identifies the strongest and weakest possible team compositions based
                 except (ValueError, IndexError):
                     max_week_idx = None
 
-            _, opponent_stats = self.compute_stats(max_week_index=max_week_idx)
+            opponent_stats = self.compute_stats(max_week_index=max_week_idx, units=all_units_in_heatmap)["opponents"]
 
-            max_opponent_count = 0
-            for unit_data in opponent_stats.values():
-                for count_val in unit_data.values():
-                    if count_val > max_opponent_count:
-                        max_opponent_count = count_val
+            # Color scale over every unit on a roster, not only those shown
+            all_opponent_counts = self.compute_stats(max_week_index=max_week_idx)["opponents"]
+            max_opponent_count = int(all_opponent_counts.max()) if all_opponent_counts.size else 0
             
             cell_size = 60
             padding = 75
@@ -2592,7 +2817,7 @@ This tool identifies the strongest and weakest possible team compositions based
                         canvas.create_line(x1 + 5, y1 + 5, x2 - 5, y2 - 5, fill="black", width=1, tags=(cell_tag,))
                         canvas.create_line(x1 + 5, y2 - 5, x2 - 5, y1 + 5, fill="black", width=1, tags=(cell_tag,))
                     else:
-                        count = opponent_stats.get(unit_row, {}).get(unit_col, 0)
+                        count = int(opponent_stats[r_idx, c_idx])
                         intensity = count / max_opponent_count if max_opponent_count > 0 else 0.0
                         
                         r, g, b = 255, int(255 * (1 - intensity)), int(224 * (1 - intensity))
@@ -2671,72 +2896,51 @@ This tool identifies the strongest and weakest possible team compositions based
 
         redraw_heatmap("All Weeks")
 
-    def show_map_stats(self):
-        """Displays a window with statistics for each map."""
-        stats_win = tk.Toplevel(self.master)
-        stats_win.title("Map Statistics")
-        stats_win.geometry("960x650") # Widened for new columns
+    def calculate_map_stats(self):
+        """
+        Tallies plays, USA/CSA and attacker/defender wins and casualties per map over the decided rounds.
+        Returns (map_stats, overall_stats): map name -> tallies, and the season's attack/defense wins and plays.
+        """
+        facts = self.get_round_facts()
+        rounds = facts["rounds"]
+        played = np.flatnonzero((rounds["winner"] >= 0) & (rounds["map"] >= 0))
+        winner, maps = rounds["winner"][played], rounds["map"][played]
+        usa_side = rounds["flipped"][played].astype(int) # A is USA unless the sides were flipped
+        attacker_won = winner == rounds["attacker_side"][played]
+        usa_casualties = rounds["casualties"][played, usa_side]
+        csa_casualties = rounds["casualties"][played, 1 - usa_side]
 
-        # List of maps where USA is the attacker
-        usa_attack_maps = {
-            "East Woods Skirmish", "Nicodemus Hill", "Hooker's Push", "Bloody Lane",
-            "Pry Ford", "Smith Field", "Alexander Farm", "Crossroads",
-            "Wagon Road", "Hagertown Turnpike", "Pry Grist Mill", "Otto & Sherrick Farm",
-            "Piper Farm", "West Woods", "Dunker Church", "Burnside Bridge",
-            "Garland's Stand", "Cox's Push", "Hatch's Attack", "Colquitt's Defense",
-            "Flemming's Meadow", "Crossley Creek", "Confederate Encampment"
-        }
+        def tally(weights=None):
+            return np.bincount(maps, weights=weights, minlength=len(facts["maps"])).astype(int).tolist()
+
+        plays, usa_wins, attacker_wins = tally(), tally(winner == usa_side), tally(attacker_won)
+        usa_cas, csa_cas = tally(usa_casualties), tally(csa_casualties)
 
-        # --- Data Calculation ---
         map_stats = defaultdict(lambda: {
             "plays": 0,
             "usa_wins": 0, "csa_wins": 0,
             "attacker_wins": 0, "defender_wins": 0,
             "total_casualties": 0, "usa_casualties": 0, "csa_casualties": 0
         })
-        
-        overall_stats = {"attack_wins": 0, "defense_wins": 0, "total_plays": 0}
-
-        for week in self.season:
-            for r in [1, 2]:
-                map_name = week.get(f"round{r}_map")
-                winner = week.get(f"round{r}_winner")
-                flipped = week.get(f"round{r}_flipped", False)
-                if not map_name or winner is None:
-                    continue
+        for code in dict.fromkeys(maps.tolist()):
+            map_stats[facts["maps"][code]] = {
+                "plays": plays[code],
+                "usa_wins": usa_wins[code], "csa_wins": plays[code] - usa_wins[code],
+                "attacker_wins": attacker_wins[code], "defender_wins": plays[code] - attacker_wins[code],
+                "total_casualties": usa_cas[code] + csa_cas[code], "usa_casualties": usa_cas[code], "csa_casualties": csa_cas[code]
+            }
 
-                stats = map_stats[map_name]
-                stats["plays"] += 1
-                overall_stats["total_plays"] += 1
+        attack_wins = int(attacker_won.sum())
+        overall_stats = {"attack_wins": attack_wins, "defense_wins": len(played) - attack_wins, "total_plays": len(played)}
+        return map_stats, overall_stats
 
-                # Determine who is USA/CSA for this round
-                usa_side = "A" if not flipped else "B"
-                csa_side = "B" if not flipped else "A"
+    def show_map_stats(self):
+        """Displays a window with statistics for each map."""
+        stats_win = tk.Toplevel(self.master)
+        stats_win.title("Map Statistics")
+        stats_win.geometry("960x650") # Widened for new columns
 
-                # Determine who is Attacker/Defender for this map
-                map_usa_is_attacker = map_name in usa_attack_maps
-                attacker_side = usa_side if map_usa_is_attacker else csa_side
-                defender_side = csa_side if map_usa_is_attacker else usa_side
-                
-                # Tally USA/CSA wins
-                if winner == usa_side: stats["usa_wins"] += 1
-                elif winner == csa_side: stats["csa_wins"] += 1
-
-                # Tally Attacker/Defender wins
-                if winner == attacker_side:
-                    stats["attacker_wins"] += 1
-                    overall_stats["attack_wins"] += 1
-                elif winner == defender_side:
-                    stats["defender_wins"] += 1
-                    overall_stats["defense_wins"] += 1
-
-                # Tally casualties
-                cas_a = week.get(f"r{r}_casualties_A", 0)
-                cas_b = week.get(f"r{r}_casualties_B", 0)
-                usa_cas, csa_cas = (cas_a, cas_b) if not flipped else (cas_b, cas_a)
-                stats["usa_casualties"] += usa_cas
-                stats["csa_casualties"] += csa_cas
-                stats["total_casualties"] += usa_cas + csa_cas
+        map_stats, overall_stats = self.calculate_map_stats()
 
         # --- UI Setup ---
         main_frame = tk.Frame(stats_win)
@@ -2848,6 +3052,7 @@ This tool identifies the strongest and weakest possible team compositions based
         path.write_text(json.dumps(data, indent=2))
 
     def load_from_file(self, path: Path):
+        self.invalidate_season_cache()
         try:
             data = json.loads(path.read_text())
             self.units = set(data.get("units", []))
@@ -2977,6 +3182,7 @@ This tool identifies the strongest and weakest possible team compositions based
 
             self.season.clear()
             self.units.clear()
+            self.invalidate_season_cache()
             self.current_week = None
             self.team_names["A"].set("Team A") # Reset to defaults
             self.team_names["B"].set("Team B")
@@ -3227,6 +3433,29 @@ This tool identifies the strongest and weakest possible team compositions based
         max_diff_spinbox.delete(0, "end")
         max_diff_spinbox.insert(0, "1")
 
+        # Search method
+        solver_frame = tk.Frame(right_frame)
+        solver_frame.pack(fill=tk.X, pady=(0, 10))
+        tk.Label(solver_frame, text="Search:").pack(side=tk.LEFT)
+        solver_var = tk.StringVar(value=next(iter(balancer.SOLVERS)))
+        ttk.Combobox(solver_frame, textvariable=solver_var, values=list(balancer.SOLVERS), state="readonly", width=24).pack(side=tk.LEFT, padx=5)
+
+        # How many of the best balances to offer
+        tk.Label(solver_frame, text="Alternatives:").pack(side=tk.LEFT, padx=(10, 0))
+        alternatives_spinbox = tk.Spinbox(solver_frame, from_=1, to=20, width=4)
+        alternatives_spinbox.pack(side=tk.LEFT, padx=5)
+        alternatives_spinbox.delete(0, "end")
+        alternatives_spinbox.insert(0, "5")
+
+        # Time budget for the heuristic search
+        budget_frame = tk.Frame(right_frame)
+        budget_frame.pack(fill=tk.X, pady=(0, 10))
+        tk.Label(budget_frame, text="Heuristic Time Budget (s):").pack(side=tk.LEFT)
+        time_budget_spinbox = tk.Spinbox(budget_frame, from_=1, to=600, width=5)
+        time_budget_spinbox.pack(side=tk.LEFT, padx=5)
+        time_budget_spinbox.delete(0, "end")
+        time_budget_spinbox.insert(0, str(int(balancer.HEURISTIC_TIME_BUDGET)))
+
         # Unit Counts
         unit_counts_frame = tk.LabelFrame(right_frame, text="Unit Player Counts (Double-click to edit)", padx=5, pady=5)
         unit_counts_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
@@ -3293,6 +3522,49 @@ This tool identifies the strongest and weakest possible team compositions based
         tk.Button(opposing_buttons_frame, text="Add Pair...", command=add_opposing_pair).pack(side=tk.LEFT)
         tk.Button(opposing_buttons_frame, text="Remove Selected", command=remove_opposing_pair).pack(side=tk.LEFT, padx=5)
 
+        # Together Units: groups that must end up on the same team
+        together_units_frame = tk.LabelFrame(right_frame, text="Together Units", padx=5, pady=5)
+        together_units_frame.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
+        together_units_tree = ttk.Treeview(together_units_frame, columns=("Units",), show="headings", height=3)
+        together_units_tree.heading("Units", text="Same Team")
+        together_units_tree.column("Units", stretch=tk.YES)
+        together_units_tree.pack(fill=tk.BOTH, expand=True)
+        together_groups = {} # tree item -> list of units
+
+        def add_together_group():
+            dlg = tk.Toplevel(balancer_window)
+            dlg.title("Add Together Group")
+            dlg.transient(balancer_window)
+            dlg.grab_set()
+
+            tk.Label(dlg, text="Units that must be on the same team:").pack(padx=5, pady=2)
+            group_listbox = tk.Listbox(dlg, selectmode=tk.MULTIPLE, exportselection=False, height=12)
+            group_listbox.pack(fill=tk.BOTH, expand=True, padx=5, pady=2)
+            for unit in all_units_for_counts:
+                group_listbox.insert(tk.END, unit)
+
+            def on_ok():
+                group = [group_listbox.get(i) for i in group_listbox.curselection()]
+                if len(group) >= 2:
+                    item = together_units_tree.insert("", "end", values=(", ".join(group),))
+                    together_groups[item] = group
+                    dlg.destroy()
+                else:
+                    messagebox.showwarning("Invalid Group", "Please select at least two units.", parent=dlg)
+
+            tk.Button(dlg, text="OK", command=on_ok).pack(pady=10)
+            dlg.geometry(f"+{balancer_window.winfo_rootx()+50}+{balancer_window.winfo_rooty()+50}")
+
+        def remove_together_group():
+            for item in together_units_tree.selection():
+                together_units_tree.delete(item)
+                together_groups.pop(item, None)
+
+        together_buttons_frame = tk.Frame(together_units_frame)
+        together_buttons_frame.pack(fill=tk.X, pady=(5,0))
+        tk.Button(together_buttons_frame, text="Add Group...", command=add_together_group).pack(side=tk.LEFT)
+        tk.Button(together_buttons_frame, text="Remove Selected", command=remove_together_group).pack(side=tk.LEFT, padx=5)
+
         # --- BOTTOM: Action Buttons ---
         bottom_frame = tk.Frame(balancer_window)
         bottom_frame.pack(fill=tk.X, side=tk.BOTTOM, padx=10, pady=(10, 0))
@@ -3300,19 +3572,36 @@ This tool identifies the strongest and weakest possible team compositions based
         status_label = tk.Label(bottom_frame, text="")
         status_label.pack(side=tk.LEFT)
 
+        # Teammate heat matrix, compiled on the first run and reused while this window is open
+        heat_cache = {}
+
         def collect_and_run_balancer():
             """Helper to gather current constraints and run the main logic."""
             constraints = {
                 "available": ast.literal_eval(available_pool.get()) if available_pool.get() else [],
                 "max_diff": max_diff_spinbox.get(),
                 "unit_counts": {unit_counts_tree.item(i, "values")[0]: {"min": unit_counts_tree.item(i, "values")[1], "max": unit_counts_tree.item(i, "values")[2]} for i in unit_counts_tree.get_children()},
-                "opposing": [opposing_units_tree.item(i, "values") for i in opposing_units_tree.get_children()]
+                "opposing": [opposing_units_tree.item(i, "values") for i in opposing_units_tree.get_children()],
+                "together": [together_groups[i] for i in together_units_tree.get_children()],
+                "solver": solver_var.get(),
+                "alternatives": alternatives_spinbox.get(),
+                "time_budget": time_budget_spinbox.get()
             }
-            self.run_balancer(balancer_window, status_label, constraints, save_unit_counts)
+            self.run_balancer(balancer_window, status_label, constraints, save_unit_counts, heat_cache, balance_job)
+
+        def cancel_balancer():
+            if balance_job.get("search"):
+                balance_job["search"].cancel()
 
         balance_button = tk.Button(bottom_frame, text="Balance!", command=collect_and_run_balancer)
         balance_button.pack(side=tk.RIGHT, padx=(5,0))
 
+        cancel_button = tk.Button(bottom_frame, text="Cancel", command=cancel_balancer, state=tk.DISABLED)
+        cancel_button.pack(side=tk.RIGHT, padx=(5,0))
+
+        # The running search (if any) and the buttons it toggles
+        balance_job = {"search": None, "balance_button": balance_button, "cancel_button": cancel_button}
+
         # --- Save and Close Logic ---
         def save_unit_counts(apply_to_week=False):
             """
@@ -3332,7 +3621,11 @@ This tool identifies the strongest and weakest possible team compositions based
             if not apply_to_week and self.current_week:
                 self.current_week["unit_player_counts"] = current_counts_in_balancer
 
+            # Global counts back every week without its own counts
+            self.invalidate_season_cache()
+
         def on_close_window():
+            cancel_balancer()
             save_unit_counts(apply_to_week=False)
             balancer_window.destroy()
 
@@ -3370,8 +3663,12 @@ This tool identifies the strongest and weakest possible team compositions based
         balancer_window.protocol("WM_DELETE_WINDOW", on_close_window)
 
 
-    def run_balancer(self, window, status_label, constraints, save_counts_func):
-        """Placeholder for the actual balancing logic."""
+    def run_balancer(self, window, status_label, constraints, save_counts_func, heat_cache=None, balance_job=None):
+        """
+        Validates the balancer constraints and starts the partition search on a process pool.
+        The window stays responsive: progress is polled with after(), and the search can be
+        cancelled through balance_job["search"].
+        """
         status_label.config(text="Balancing...")
         window.update_idletasks()
 
@@ -3380,6 +3677,10 @@ This tool identifies the strongest and weakest possible team compositions based
             available = set(constraints["available"])
 
             max_diff = int(constraints["max_diff"])
+            alternatives = max(1, int(constraints.get("alternatives", 1)))
+            time_budget = float(constraints.get("time_budget", balancer.HEURISTIC_TIME_BUDGET))
+            if time_budget <= 0:
+                raise ValueError("The time budget must be greater than 0 seconds.")
             
             unit_counts = {}
             for unit, counts in constraints["unit_counts"].items():
@@ -3389,37 +3690,124 @@ This tool identifies the strongest and weakest possible team compositions based
             for u1, u2 in opposing_pairs:
                 pass
 
+            together_groups = [list(group) for group in constraints.get("together", [])]
+
         except ValueError as e:
             messagebox.showerror("Invalid Constraint", str(e), parent=window)
             status_label.config(text="Error!")
             return
 
         # --- 2. FETCH HISTORY ---
-        teammate_history, _ = self.compute_stats() # Full season history
+        if heat_cache is None:
+            heat_cache = {}
+        if not heat_cache:
+            heat_cache.update(self._compile_balancer_heat())
 
         # --- 3. RUN ALGORITHM ---
-        result = self._balance_teams(
+        problem = self._prepare_balance_problem(
             available=list(available),
             unit_counts=unit_counts,
             opposing_pairs=opposing_pairs,
-            max_player_diff=max_diff,
-            teammate_history=teammate_history
+            heat=heat_cache,
+            together_groups=together_groups
         )
-        
-        # --- 4. DISPLAY RESULTS ---
-        if result:
-            team_A, team_B, score, min_A, max_A, min_B, max_B = result
-            status_label.config(text=f"Best solution found! Avg. Diff: {score:.1f}")
-            self._display_balance_results(window, team_A, team_B, score, min_A, max_A, min_B, max_B, save_counts_func)
-        else:
-            # The _balance_teams function will show its own, more specific message box.
+        if problem is None:
+            # The _prepare_balance_problem function shows its own, more specific message box.
             status_label.config(text="Failed to find a valid balance.")
+            return
+
+        if balance_job is None:
+            balance_job = {}
+        search = balancer.ShardedSearch(constraints.get("solver", "Branch and Bound"), problem["search"], top_k=alternatives, time_budget=time_budget)
+        balance_job["search"] = search
+        if balance_job.get("balance_button"):
+            balance_job["balance_button"].config(state=tk.DISABLED)
+            balance_job["cancel_button"].config(state=tk.NORMAL)
+
+        def finish_search():
+            balance_job["search"] = None
+            if balance_job.get("balance_button"):
+                balance_job["balance_button"].config(state=tk.NORMAL)
+                balance_job["cancel_button"].config(state=tk.DISABLED)
+
+        def poll_search():
+            if not window.winfo_exists():
+                search.cancel()
+                return
+            try:
+                finished = search.poll()
+            except Exception as e:
+                search.cancel()
+                finish_search()
+                messagebox.showerror("Balancing Failed", f"The balancer stopped with an error:\n{e}", parent=window)
+                status_label.config(text="Error!")
+                return
+
+            if not finished:
+                progress = f"Balancing... {search.completed}/{search.total} parts searched"
+                if search.timed and search.results:
+                    gap, min_diff, teammate_score, avg_diff = search.results[0]["score"]
+                    progress += f" | Best so far: Min Diff {min_diff:.0f}, Avg. Diff {avg_diff:.1f}, Teammate Score {teammate_score:.0f}"
+                status_label.config(text=progress)
+                window.after(100, poll_search)
+                return
+
+            finish_search()
+            # A cancelled heuristic search still offers the best balances it found
+            if search.cancelled and not (search.timed and search.results):
+                status_label.config(text="Balancing cancelled.")
+                return
+
+            # --- 4. DISPLAY RESULTS ---
+            balances = self._finish_balance(problem, search.results, max_diff)
+            if balances:
+                score = balances[0][2]
+                found = "Best solution found within the time budget!" if search.timed else "Best solution found!"
+                status_label.config(text=f"{found} Avg. Diff: {score:.1f}")
+                self._display_balance_results(window, balances, save_counts_func)
+            else:
+                # The _finish_balance function will show its own, more specific message box.
+                status_label.config(text="Failed to find a valid balance.")
+
+        poll_search()
 
-    def _balance_teams(self, available, unit_counts, opposing_pairs, max_player_diff, teammate_history):
+    def _compile_balancer_heat(self) -> dict:
+        """
+        Compiles the full season's teammate history into the balancer's heat matrix.
+        Returns {"units": [...], "index": {unit: row}, "matrix": (units x units) pair costs}.
+        """
+        units = sorted(set(self.units) | set(self.compute_stats()["units"])) # Full season history
+        teammate_history = self.compute_stats(units=units)["teammates"]
+        matrix, average_teammate_count, over_teaming_threshold = balancer.compile_heat_matrix(teammate_history)
+        print(f'Average Teammate Count: {average_teammate_count}')
+        print(f'Over Teaming Threshold: {over_teaming_threshold}')
+        return {"units": units, "index": {unit: i for i, unit in enumerate(units)}, "matrix": matrix}
+
+    def _balance_teams(self, available, unit_counts, opposing_pairs, max_player_diff, heat, solver="Branch and Bound", time_budget=None,
+                       together_groups=()):
         """
         Finds the most balanced team composition by partitioning units,
         respecting min/max player counts, max total player difference,
-        and opposing unit constraints.
+        opposing unit constraints and groups of units that must play
+        together. `heat` is a compiled heat matrix from
+        _compile_balancer_heat(). `solver` names one of balancer.SOLVERS;
+        the exact ones return the same optimum, the heuristic the best it
+        finds within `time_budget` seconds.
+        Runs the whole search in this process; run_balancer uses a process pool instead.
+        """
+        problem = self._prepare_balance_problem(available, unit_counts, opposing_pairs, heat, together_groups)
+        if problem is None:
+            return None
+        balances = self._finish_balance(problem, balancer.solve(solver, problem["search"], time_budget=time_budget), max_player_diff)
+        return balances[0] if balances else None
+
+    def _prepare_balance_problem(self, available, unit_counts, opposing_pairs, heat, together_groups=()):
+        """
+        Turns the balancer constraints into solver arguments.
+        Returns {"units": [...], "members": [...], "search": {forced_A, forced_B, free, mins, maxs, pair_costs}},
+        or None (after showing why) if the constraints are invalid. Each group in together_groups is merged
+        into one search unit; the solver refers to search units by index and members[i] lists the units in
+        search unit i.
         """
         try:
             unit_data = {
@@ -3444,25 +3832,6 @@ This tool identifies the strongest and weakest possible team compositions based
             opposing_map[p1].add(p2)
             opposing_map[p2].add(p1)
 
-        best_solution = {"score": (float('inf'), float('inf'), float('inf'), float('inf')), "teams": None, "stats": None}
-
-        # --- Calculate average teammate count for penalty ---
-        all_counts = []
-        counted_pairs = set()
-        for u1, others in teammate_history.items():
-            for u2, count in others.items():
-                pair = tuple(sorted((u1, u2)))
-                if pair not in counted_pairs:
-                    all_counts.append(count)
-                    counted_pairs.add(pair)
-        
-        average_teammate_count = sum(all_counts) / len(all_counts) if all_counts else 0
-        over_teaming_threshold = round(average_teammate_count) #* 1.25
-        # A higher multiplier means a stronger penalty for going over the threshold.
-        over_teaming_penalty_multiplier = 10
-        print(f'Average Teammate Count: {average_teammate_count}')
-        print(f'Over Teaming Threshold: {over_teaming_threshold}')
-
         # --- Handle forced teams from opposing pairs ---
         forced_A = {p[0] for p in opposing_pairs if p[0]}
         forced_B = {p[1] for p in opposing_pairs if p[1]}
@@ -3475,78 +3844,83 @@ This tool identifies the strongest and weakest possible team compositions based
 
         # Players to be assigned are those available, present, and not already forced into a team.
         players_to_assign = sorted(list((set(available) & present_units) - forced_A - forced_B))
-        n_to_assign = len(players_to_assign)
 
-        # --- Iterative Solver using itertools ---
-        # Iterate through all possible sizes for the first team's additional members.
-        for size_A_additional in range(n_to_assign + 1):
-            for team_A_additional_tuple in itertools.combinations(players_to_assign, size_A_additional):
-                
-                team_A = forced_A.union(set(team_A_additional_tuple))
-                team_B = forced_B.union(set(players_to_assign) - set(team_A_additional_tuple))
-
-                # Evaluate this partition
-                min_A = sum(unit_data.get(p, {}).get('min', 0) for p in team_A)
-                max_A = sum(unit_data.get(p, {}).get('max', 0) for p in team_A)
-                min_B = sum(unit_data.get(p, {}).get('min', 0) for p in team_B)
-                max_B = sum(unit_data.get(p, {}).get('max', 0) for p in team_B)
-
-                gap = 0
-                if max_A < min_B:
-                    gap = min_B - max_A
-                elif max_B < min_A:
-                    gap = min_A - max_B
-                
-                min_diff = abs(min_A - min_B)
-                avg_A = (min_A + max_A) / 2 if team_A else 0
-                avg_B = (min_B + max_B) / 2 if team_B else 0
-                avg_diff = abs(avg_A - avg_B)
-
-                # Calculate teammate "heat" score. Lower is better, as it means units have played together less.
-                teammate_score = 0
-                for u1, u2 in itertools.combinations(team_A, 2):
-                    count = teammate_history[u1][u2]
-                    teammate_score += count
-                    # Add penalty for over-teaming
-                    if average_teammate_count > 0 and count > over_teaming_threshold:
-                        teammate_score += (count - over_teaming_threshold) * over_teaming_penalty_multiplier
-                for u1, u2 in itertools.combinations(team_B, 2):
-                    count = teammate_history[u1][u2]
-                    teammate_score += count
-                    # Add penalty for over-teaming
-                    if average_teammate_count > 0 and count > over_teaming_threshold:
-                        teammate_score += (count - over_teaming_threshold) * over_teaming_penalty_multiplier
-
-                current_score = (gap, min_diff, teammate_score, avg_diff)
-
-                if current_score < best_solution["score"]:
-                    best_solution["score"] = current_score
-                    best_solution["teams"] = (list(team_A), list(team_B))
-                    best_solution["stats"] = (min_A, max_A, min_B, max_B)
+        # --- Partition Search ---
+        # Units are indexed once; the solver works on per-unit counts and a table of pair costs.
+        units = sorted(forced_A | forced_B | set(players_to_assign))
+        unit_index = {unit: i for i, unit in enumerate(units)}
+        mins = [unit_data.get(u, {}).get('min', 0) for u in units]
+        maxs = [unit_data.get(u, {}).get('max', 0) for u in units]
+
+        # Teammate "heat" of each pair, cut from the compiled matrix. Units without history cost nothing.
+        rows = np.array([heat["index"].get(u, -1) for u in units], dtype=int)
+        known = rows >= 0
+        pair_costs = np.zeros((len(units), len(units)))
+        pair_costs[np.ix_(known, known)] = heat["matrix"][np.ix_(rows[known], rows[known])]
+
+        # Units that must play together are searched as one; units not taking part are left out of their groups
+        groups = [[unit_index[u] for u in group if u in unit_index] for group in together_groups]
+        try:
+            search, members = balancer.contract_groups(
+                forced_A=[unit_index[u] for u in sorted(forced_A)],
+                forced_B=[unit_index[u] for u in sorted(forced_B)],
+                free=[unit_index[u] for u in players_to_assign],
+                mins=mins,
+                maxs=maxs,
+                pair_costs=pair_costs,
+                groups=[group for group in groups if len(group) > 1],
+            )
+        except ValueError as e:
+            messagebox.showerror("Constraint Error", str(e))
+            return None
 
-        # --- Main Execution ---
-        if best_solution["teams"]:
-            gap, min_diff, teammate_score, avg_diff = best_solution["score"]
+        return {
+            "units": units,
+            "members": [[units[i] for i in group] for group in members],
+            "search": search,
+        }
+
+    def _finish_balance(self, problem, results, max_player_diff):
+        """
+        Checks solver results (best first) against the max player difference. Returns a best-first list of
+        (team_A, team_B, avg_diff, min_A, max_A, min_B, max_B) for the balances within it, or None after
+        telling the user why the best one is not.
+        """
+        members, mins, maxs = problem["members"], problem["search"]["mins"], problem["search"]["maxs"]
+        balances = []
+        for result in results:
+            gap, min_diff, teammate_score, avg_diff = result["score"]
             if gap <= max_player_diff and min_diff <= max_player_diff:
-                team_A, team_B = best_solution["teams"]
-                min_A, max_A, min_B, max_B = best_solution["stats"]
-                return team_A, team_B, avg_diff, min_A, max_A, min_B, max_B
-            else:
-                msg = f"Could not find a balance within the max player difference of {max_player_diff}.\n"
-                if gap > max_player_diff:
-                    msg += f"The best possible balance has a range gap of {gap:.0f} players.\n"
-                if min_diff > max_player_diff:
-                    msg += f"The best possible balance has a minimums difference of {min_diff:.0f} players.\n"
-                messagebox.showinfo("Balancing Failed", msg.strip())
-                return None
-        else:
+                team_A = [unit for i in result["team_A"] for unit in members[i]]
+                team_B = [unit for i in result["team_B"] for unit in members[i]]
+                balances.append((
+                    team_A, team_B, avg_diff,
+                    sum(mins[i] for i in result["team_A"]), sum(maxs[i] for i in result["team_A"]),
+                    sum(mins[i] for i in result["team_B"]), sum(maxs[i] for i in result["team_B"]),
+                ))
+
+        # --- Main Execution ---
+        if not results:
             messagebox.showwarning("Balancing Failed", "No valid team composition could be found with the given constraints.")
             return None
 
-    def _display_balance_results(self, parent_window, team_A, team_B, score, min_A, max_A, min_B, max_B, save_counts_func):
+        gap, min_diff, teammate_score, avg_diff = results[0]["score"]
+        if gap <= max_player_diff and min_diff <= max_player_diff:
+            return balances
+
+        msg = f"Could not find a balance within the max player difference of {max_player_diff}.\n"
+        if gap > max_player_diff:
+            msg += f"The best possible balance has a range gap of {gap:.0f} players.\n"
+        if min_diff > max_player_diff:
+            msg += f"The best possible balance has a minimums difference of {min_diff:.0f} players.\n"
+        messagebox.showinfo("Balancing Failed", msg.strip())
+        return None
+
+    def _display_balance_results(self, parent_window, balances, save_counts_func):
+        """Shows the best balances found (best first); the selected one can be applied to the week."""
         results_window = tk.Toplevel(parent_window)
         results_window.title("Balancer Results")
-        results_window.geometry("600x400")
+        results_window.geometry("600x500" if len(balances) > 1 else "600x400")
         results_window.transient(parent_window)
         results_window.grab_set()
 
@@ -3554,28 +3928,59 @@ This tool identifies the strongest and weakest possible team compositions based
         main_frame.pack(fill=tk.BOTH, expand=True)
         main_frame.grid_columnconfigure(0, weight=1)
         main_frame.grid_columnconfigure(1, weight=1)
-        main_frame.grid_rowconfigure(1, weight=1)
+        main_frame.grid_rowconfigure(2, weight=1)
+
+        title_label = tk.Label(main_frame, font=("Arial", 12, "bold"))
+        title_label.grid(row=0, column=0, columnspan=2, pady=(0,10))
 
-        tk.Label(main_frame, text=f"Best Balance Found! Average Player Difference: {score:.1f}", font=("Arial", 12, "bold")).grid(row=0, column=0, columnspan=2, pady=(0,10))
+        # Alternatives, best first
+        if len(balances) > 1:
+            options_tree = ttk.Treeview(main_frame, columns=("Option", "Players A", "Players B", "Min Diff", "Avg Diff"), show="headings", height=min(len(balances), 6))
+            for col in ("Option", "Players A", "Players B", "Min Diff", "Avg Diff"):
+                options_tree.heading(col, text=col)
+                options_tree.column(col, width=80, anchor="center")
+            options_tree.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(0, 10))
+            for i, (_, _, avg_diff, min_A, max_A, min_B, max_B) in enumerate(balances):
+                options_tree.insert("", "end", iid=str(i), values=(i + 1, f"{min_A}-{max_A}", f"{min_B}-{max_B}", abs(min_A - min_B), f"{avg_diff:.1f}"))
 
         # Team A Display
-        frame_a = tk.LabelFrame(main_frame, text=f"Team A ({len(team_A)} units) | Players: {min_A}-{max_A}")
-        frame_a.grid(row=1, column=0, sticky="nsew", padx=(0,5))
+        frame_a = tk.LabelFrame(main_frame)
+        frame_a.grid(row=2, column=0, sticky="nsew", padx=(0,5))
         list_a = tk.Listbox(frame_a)
         list_a.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        for unit in sorted(team_A):
-            list_a.insert(tk.END, unit)
 
         # Team B Display
-        frame_b = tk.LabelFrame(main_frame, text=f"Team B ({len(team_B)} units) | Players: {min_B}-{max_B}")
-        frame_b.grid(row=1, column=1, sticky="nsew", padx=(5,0))
+        frame_b = tk.LabelFrame(main_frame)
+        frame_b.grid(row=2, column=1, sticky="nsew", padx=(5,0))
         list_b = tk.Listbox(frame_b)
         list_b.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        for unit in sorted(team_B):
-            list_b.insert(tk.END, unit)
+
+        selected = {"index": 0}
+
+        def show_balance(index):
+            team_A, team_B, score, min_A, max_A, min_B, max_B = balances[index]
+            selected["index"] = index
+            if index == 0:
+                title_label.config(text=f"Best Balance Found! Average Player Difference: {score:.1f}")
+            else:
+                title_label.config(text=f"Alternative #{index + 1}: Average Player Difference: {score:.1f}")
+            frame_a.config(text=f"Team A ({len(team_A)} units) | Players: {min_A}-{max_A}")
+            frame_b.config(text=f"Team B ({len(team_B)} units) | Players: {min_B}-{max_B}")
+            list_a.delete(0, tk.END)
+            for unit in sorted(team_A):
+                list_a.insert(tk.END, unit)
+            list_b.delete(0, tk.END)
+            for unit in sorted(team_B):
+                list_b.insert(tk.END, unit)
+
+        show_balance(0)
+        if len(balances) > 1:
+            options_tree.selection_set("0")
+            options_tree.bind("<<TreeviewSelect>>", lambda e: options_tree.selection() and show_balance(int(options_tree.selection()[0])))
 
         def apply_and_close():
             if not self.current_week: return
+            team_A, team_B = balances[selected["index"]][:2]
             
             # First, save the unit counts from the balancer UI to the global setting
             # This ensures the "master" list is up-to-date.
@@ -3586,6 +3991,7 @@ This tool identifies the strongest and weakest possible team compositions based
             # Apply balanced teams to the current week's roster
             self.current_week["A"] = set(team_A)
             self.current_week["B"] = set(team_B)
+            self._invalidate_current_week()
             
             # Refresh main GUI to reflect the new rosters
             self.refresh_team_lists()
@@ -3596,7 +4002,7 @@ This tool identifies the strongest and weakest possible team compositions based
             parent_window.destroy()
 
         button_frame = tk.Frame(main_frame)
-        button_frame.grid(row=2, column=0, columnspan=2, pady=(10,0))
+        button_frame.grid(row=3, column=0, columnspan=2, pady=(10,0))
         tk.Button(button_frame, text="Apply to Week", command=apply_and_close).pack(side=tk.LEFT, padx=5)
         tk.Button(button_frame, text="Close", command=results_window.destroy).pack(side=tk.LEFT, padx=5)
 
@@ -4105,6 +4511,7 @@ This tool identifies the strongest and weakest possible team compositions based
                 self.elo_system_values[key].set(str(value))
             for key, value in bias_values.items():
                self.elo_bias_percentages[key].set(str(value))
+            self.invalidate_season_cache()
 
             dialog.destroy()
 
@@ -4243,6 +4650,7 @@ This tool identifies the strongest and weakest possible team compositions based
                 if map_name not in self.map_biases:
                      default_value = default_biases.get(map_name, "0")
                      self.map_biases[map_name] = tk.StringVar(value=default_value)
+                     self.invalidate_season_cache()
 
                 map_var = self.map_biases[map_name]
 
@@ -4253,7 +4661,7 @@ This tool identifies the strongest and weakest possible team compositions based
                 display_var = tk.StringVar(value=current_bias_text)
 
                 def create_callback(mv, dv):
-                    return lambda chosen_text: (mv.set(bias_options[chosen_text]), dv.set(chosen_text))
+                    return lambda chosen_text: (mv.set(bias_options[chosen_text]), dv.set(chosen_text), self.invalidate_season_cache())
 
                 option_menu = ttk.OptionMenu(
                     collapsible.frame,
@@ -4284,7 +4692,7 @@ This tool identifies the strongest and weakest possible team compositions based
 
         try:
             # Get current and previous week's ratings to calculate change
-            current_elos, elo_changes = self.calculate_elo_ratings(max_week_index=selected_week_idx)
+            current_elos, elo_changes, _ = self.calculate_elo_ratings(max_week_index=selected_week_idx)
             
         except Exception as e:
             messagebox.showerror("Elo Error", f"An error occurred during Elo calculation: {e}", parent=self.master)
@@ -4469,7 +4877,9 @@ This tool identifies the strongest and weakest possible team compositions based
         end_week_combo.set(f"Week {max_week_idx + 1}")
 
         # --- Data Calculation ---
-        elo_history_by_week = [self.calculate_elo_ratings(max_week_index=i)[0] for i in range(len(self.season))]
+        # One replay gives every weekly snapshot; drop the leading pre-season entry.
+        _, _, elo_history = self.calculate_elo_ratings()
+        elo_history_by_week = elo_history[1:]
         
         # Get all participating units
         final_elos = elo_history_by_week[-1] if elo_history_by_week else {}
@@ -4628,10 +5038,31 @@ This tool identifies the strongest and weakest possible team compositions based
                 return 0.0 # Default to balanced on error
         return 0.0 # Default to balanced if map not found
 
+    def invalidate_season_cache(self, from_week_index: int = 0):
+        """
+        Drops cached per-week state from `from_week_index` onward.
+        Call after editing a week (index of that week) or anything season-wide such as settings (default 0).
+        """
+        del self._elo_checkpoints[max(0, from_week_index):]
+        self._season_table = None
+        self._invalidate_round_facts(from_week_index)
+
+    def _invalidate_round_facts(self, from_week_index: int = 0):
+        """Drops the round facts of `from_week_index` onward, for edits that leave Elo and player counts unchanged."""
+        del self._round_fact_weeks[max(0, from_week_index):]
+        self._round_facts = None
+
+    def _invalidate_current_week(self):
+        """Invalidates cached state from the selected week onward."""
+        if self.current_week in self.season:
+            self.invalidate_season_cache(self.season.index(self.current_week))
+
     def calculate_elo_ratings(self, max_week_index: int | None = None):
         """
         Calculates Elo ratings for all units, using a dynamic K-factor and accounting for player counts and lead units.
-        Returns the final ratings, the changes from the last week, and total rounds played for each unit.
+        Returns the final ratings (with total rounds played for each unit under "rounds_played"), the changes
+        from the last week, and the per-week history: entry 0 holds the initial ratings and entry i + 1 the
+        ratings after week i. History entries are shared with the checkpoint cache and must not be modified.
         """
         try:
             initial_rating = int(self.elo_system_values["initial_elo"].get())
@@ -4653,6 +5084,30 @@ This tool identifies the strongest and weakest possible team compositions based
             size_influence = 1.0
             playoff_multiplier = 1.25
 
+        # Instead of Elo offsets, map bias shifts the expected score by these percentages
+        try:
+            light_att = int(self.elo_bias_percentages["light_attacker"].get())
+            heavy_att = int(self.elo_bias_percentages["heavy_attacker"].get())
+            light_def = int(self.elo_bias_percentages["light_defender"].get())
+            heavy_def = int(self.elo_bias_percentages["heavy_defender"].get())
+        except (ValueError, KeyError):
+            light_att, heavy_att, light_def, heavy_def = 15, 30, 15, 30 # Fallback
+
+        settings = {
+            "initial_elo": initial_rating,
+            "k_factor_standard": k_factor_standard,
+            "k_factor_provisional": k_factor_provisional,
+            "provisional_rounds": provisional_rounds,
+            "sweep_bonus_multiplier": sweep_bonus_multiplier,
+            "lead_multiplier": lead_multiplier,
+            "size_influence": size_influence,
+            "playoff_multiplier": playoff_multiplier,
+            "bias_light_att": light_att,
+            "bias_heavy_att": heavy_att,
+            "bias_light_def": light_def,
+            "bias_heavy_def": heavy_def,
+        }
+
         elo_ratings = defaultdict(lambda: initial_rating)
         rounds_played = defaultdict(int)
 
@@ -4663,39 +5118,97 @@ This tool identifies the strongest and weakest possible team compositions based
         elo_history_by_week = [elo_ratings.copy()]
         weeks_to_process = self.season[:max_week_index + 1] if max_week_index is not None else self.season
 
-        for week_idx, week_data in enumerate(weeks_to_process):
+        # Resume from cached checkpoints; only weeks past the last valid one are replayed
+        resume_idx = min(len(self._elo_checkpoints), len(weeks_to_process))
+        for checkpoint in self._elo_checkpoints[:resume_idx]:
+            elo_history_by_week.append(checkpoint["ratings"])
+        if resume_idx > 0:
+            rounds_played = self._elo_checkpoints[resume_idx - 1]["rounds_played"].copy()
+
+        if resume_idx < len(weeks_to_process):
+            season_table = self.get_season_table()
+            units = season_table["units"]
+            unit_index = season_table["unit_index"]
+            end_idx = len(weeks_to_process)
+
+            rounds = elo_kernel.build_round_arrays(self._compile_elo_rounds(resume_idx, end_idx), len(units))
             last_week_elos = elo_history_by_week[-1]
-            current_week_elos = last_week_elos.copy()
+            replay = elo_kernel.replay_elo(
+                rounds, settings, len(units), resume_idx, end_idx,
+                start_ratings=[last_week_elos.get(u, initial_rating) for u in units],
+                start_rounds_played=[rounds_played.get(u, 0) for u in units],
+            )
+
+            # A unit gets a rating entry once it is global or has played a round
+            rated_units = {u for u in last_week_elos if u in unit_index}
+            for i, week_idx in enumerate(range(resume_idx, end_idx)):
+                in_week = rounds["week"] == week_idx
+                played = (rounds["team_a"][in_week] | rounds["team_b"][in_week]).any(axis=0)
+                rated_units.update(units[col] for col in np.flatnonzero(played))
+
+                week_ratings = replay["ratings"][i].tolist()
+                current_week_elos = defaultdict(lambda: initial_rating, {u: week_ratings[unit_index[u]] for u in rated_units})
+                rounds_played = defaultdict(int, {units[col]: n for col, n in enumerate(replay["rounds_played"][i].tolist()) if n > 0})
+
+                elo_history_by_week.append(current_week_elos)
+                self._elo_checkpoints.append({"ratings": current_week_elos, "rounds_played": rounds_played.copy()})
+
+        # Copy so callers can modify the result without touching the cache
+        final_elos = elo_history_by_week[-1].copy()
+        elo_history_by_week[-1] = final_elos
+        
+        # Pass rounds played back with the ratings
+        final_elos["rounds_played"] = rounds_played
+        
+        if len(elo_history_by_week) > 1:
+            prev_elos = elo_history_by_week[-2]
+            elo_changes = {unit: final_elos[unit] - prev_elos.get(unit, initial_rating) for unit in self.units}
+        else:
+            elo_changes = {unit: final_elos[unit] - initial_rating for unit in self.units}
+            
+        return final_elos, elo_changes, elo_history_by_week
+
+
+    def _compile_elo_rounds(self, start_week: int, end_week: int) -> list[dict]:
+        """
+        Builds the Elo kernel's round list for weeks start_week..end_week - 1.
+        Only rounds with a winner are included; weeks missing a team are skipped.
+        """
+        season_table = self.get_season_table()
+        unit_index = season_table["unit_index"]
 
+        usa_attack_maps = {
+            "East Woods Skirmish", "Nicodemus Hill", "Hooker's Push", "Bloody Lane",
+            "Pry Ford", "Smith Field", "Alexander Farm", "Crossroads",
+            "Wagon Road", "Hagertown Turnpike", "Pry Grist Mill", "Otto & Sherrick Farm",
+            "Piper Farm", "West Woods", "Dunker Church", "Burnside Bridge",
+            "Garland's Stand", "Cox's Push", "Hatch's Attack", "Colquitt's Defense",
+            "Flemming's Meadow", "Crossley Creek", "Confederate Encampment"
+        }
+
+        rounds = []
+        for week_idx in range(start_week, end_week):
+            week_data = self.season[week_idx]
             team_A_units = week_data.get("A", set())
             team_B_units = week_data.get("B", set())
-            
             if not team_A_units or not team_B_units:
-                elo_history_by_week.append(current_week_elos)
                 continue
 
-            # --- Calculate player-weighted Elo for each team ---
             is_playoffs = week_data.get("playoffs", False)
 
             # --- Determine sweep bonuses before any rounds ---
             round1_winner = week_data.get("round1_winner")
             round2_winner = week_data.get("round2_winner")
+            sweep_A = round1_winner == "A" and round2_winner == "A"
+            sweep_B = round1_winner == "B" and round2_winner == "B"
 
-            sweep_bonus_A = sweep_bonus_multiplier if (round1_winner == "A" and round2_winner == "A") else 1.0
-            sweep_bonus_B = sweep_bonus_multiplier if (round1_winner == "B" and round2_winner == "B") else 1.0
+            cols_A = [unit_index[u] for u in team_A_units]
+            cols_B = [unit_index[u] for u in team_B_units]
 
-            # --- Process each round ---
             for r in [1, 2]:
                 winner = week_data.get(f"round{r}_winner")
                 if not winner: continue
 
-                # Calculate team Elo averages before each round using WEEK-SPECIFIC player counts
-                total_players_A = sum(self.get_unit_player_count_for_week(u, week_idx) for u in team_A_units)
-                total_players_B = sum(self.get_unit_player_count_for_week(u, week_idx) for u in team_B_units)
-
-                avg_elo_A = sum(current_week_elos[u] * self.get_unit_player_count_for_week(u, week_idx) for u in team_A_units) / total_players_A if total_players_A > 0 else initial_rating
-                avg_elo_B = sum(current_week_elos[u] * self.get_unit_player_count_for_week(u, week_idx) for u in team_B_units) / total_players_B if total_players_B > 0 else initial_rating
-
                 # Determine leads for the round
                 if is_playoffs:
                     lead_A = week_data.get(f"lead_A_r{r}")
@@ -4704,133 +5217,43 @@ This tool identifies the strongest and weakest possible team compositions based
                     lead_A = week_data.get("lead_A")
                     lead_B = week_data.get("lead_B")
 
-                # --- NEW: Apply Map Bias ---
+                # Map bias only applies (and the expected score is only clamped) when a map is set
                 map_name = week_data.get(f"round{r}_map")
-                map_bias_level = self.get_map_bias_level(map_name) if map_name else 0
-                
-                # Instead of Elo offsets, define percentage multipliers
-                try:
-                   light_att = int(self.elo_bias_percentages["light_attacker"].get())
-                   heavy_att = int(self.elo_bias_percentages["heavy_attacker"].get())
-                   light_def = int(self.elo_bias_percentages["light_defender"].get())
-                   heavy_def = int(self.elo_bias_percentages["heavy_defender"].get())
-                   bias_percent_map = {
-                       0: 1.00,
-                       1: 1.0 + (light_att / 100.0),
-                       1.5: 1.0 + (heavy_att / 100.0),
-                       2: 1.0 - (light_def / 100.0),
-                       2.5: 1.0 - (heavy_def / 100.0)
-                   }
-                except (ValueError, KeyError):
-                   bias_percent_map = {0: 1.00, 1: 1.15, 1.5: 1.30, 2: 0.85, 2.5: 0.70} # Fallback
-                bias_multiplier = bias_percent_map.get(map_bias_level, 1.00)
-
-                usa_attack_maps = {
-                    "East Woods Skirmish", "Nicodemus Hill", "Hooker's Push", "Bloody Lane",
-                    "Pry Ford", "Smith Field", "Alexander Farm", "Crossroads",
-                    "Wagon Road", "Hagertown Turnpike", "Pry Grist Mill", "Otto & Sherrick Farm",
-                    "Piper Farm", "West Woods", "Dunker Church", "Burnside Bridge",
-                    "Garland's Stand", "Cox's Push", "Hatch's Attack", "Colquitt's Defense",
-                    "Flemming's Meadow", "Crossley Creek", "Confederate Encampment"
-                }
-
                 if map_name:
                     is_usa_attack = any(base_map in map_name for base_map in usa_attack_maps)
                     flipped = week_data.get(f"round{r}_flipped", False)
                     usa_side = "A" if not flipped else "B"
-                    
                     attacker_side = usa_side if is_usa_attack else ("B" if usa_side == "A" else "A")
-
-                    # Compute expected outcome first
-                    expected_A = 1 / (1 + 10 ** ((avg_elo_B - avg_elo_A) / 400))
-
-                    # Apply percent bias to expected probability
-                    if attacker_side == "A":
-                        expected_A *= bias_multiplier
-                    else:
-                        expected_A /= bias_multiplier
-
-                    expected_A = max(0.05, min(0.95, expected_A)) # Clamp to avoid extremes
+                    bias_code = elo_kernel.bias_level_code(self.get_map_bias_level(map_name))
+                    clamp = (0.05, 0.95) # Clamp to avoid extremes
                 else:
-                    expected_A = 1 / (1 + 10**((avg_elo_B - avg_elo_A) / 400))
-                
-                score_A, score_B = (1, 0) if winner == "A" else (0, 1)
-                base_change = score_A - expected_A
-                
-                # --- Distribute change based on player contribution & lead status ---
-                def apply_elo_changes(team_units, total_players, lead_unit, sign, sweep_bonus):
-                    if total_players <= 0: return
-                    ''' Old Method of Calculating Elo Changes Below - Disbabled for now.
-                    # Calculate weighted changes with lead multiplier
-                    weighted_changes = {
-                        unit: (self.get_unit_average_player_count(unit, week_idx) / total_players) * (lead_multiplier if unit == lead_unit else 1)
-                        for unit in team_units
-                    }
-                    
-                    # Normalize so the sum of weights is 1 again - was disabled
-                    total_weight = sum(weighted_changes.values())
-                    if total_weight > 0:
-                        for u in team_units:
-                            weighted_changes[u] /= total_weight
-                    
-                    for unit in team_units:
-                        # Determine K-factor for this unit based on rounds played BEFORE this round
-                        k = k_factor_provisional if rounds_played[unit] < provisional_rounds else k_factor_standard
-                        
-                        # Apply the normalized, weighted change
-
-                        # Optional Playoff Multiplayer (higher stakes)
-                        round_multiplier = 1.25 if is_playoffs else 1.0
-
-                        delta = k * base_change * weighted_changes[unit] * sign * round_multiplier * sweep_bonus
-                        current_week_elos[unit] += delta
-                        '''
-                    # Log-scaled + normalized weights using WEEK-SPECIFIC player counts
-                    weights = {
-                        u: (math.log(1 + self.get_unit_player_count_for_week(u, week_idx)) ** size_influence)
-                        * (lead_multiplier if u == lead_unit else 1)
-                        for u in team_units
-                    }
-                    total_weight = sum(weights.values())
-                    for u in weights:
-                        weights[u] /= total_weight
-
-                    #Make Elo you gain/lose within a team, more proportional to the Elo of the unit and those around it.
-                    team_avg_elo = sum(current_week_elos[u] for u in team_units) / len(team_units)
-
-                    for u, w in weights.items():
-                        k = k_factor_provisional if rounds_played[u] < provisional_rounds else k_factor_standard
-                        round_multiplier = playoff_multiplier if is_playoffs else 1.0
-                        # Relative factor: how far below or above the team average this unit is
-                        relative_factor = max(0.8, min(1.2, (team_avg_elo / current_week_elos[u]) ** 0.5))
-                        delta = k * base_change * w * sign * round_multiplier * sweep_bonus * relative_factor
-                        current_week_elos[u] += delta
-
-                apply_elo_changes(team_A_units, total_players_A, lead_A, 1, sweep_bonus_A)
-                apply_elo_changes(team_B_units, total_players_B, lead_B, -1, sweep_bonus_B)
-
-                # Increment rounds played AFTER Elo for the round is calculated
-                for unit in team_A_units: rounds_played[unit] += 1
-                for unit in team_B_units: rounds_played[unit] += 1
-
-            elo_history_by_week.append(current_week_elos)
-
-        final_elos = elo_history_by_week[-1]
-        
-        # Pass rounds played back with the ratings
-        final_elos["rounds_played"] = rounds_played
-        
-        if len(elo_history_by_week) > 1:
-            prev_elos = elo_history_by_week[-2]
-            elo_changes = {unit: final_elos[unit] - prev_elos.get(unit, initial_rating) for unit in self.units}
-        else:
-            elo_changes = {unit: final_elos[unit] - initial_rating for unit in self.units}
-            
-        return final_elos, elo_changes
-
+                    attacker_side = "A"
+                    bias_code = 0
+                    clamp = (0.0, 1.0)
+
+                rounds.append({
+                    "week": week_idx,
+                    "round_num": r,
+                    "team_a": cols_A,
+                    "team_b": cols_B,
+                    "players": season_table["player_counts"][week_idx],
+                    "lead_a": unit_index[lead_A] if lead_A in team_A_units else -1,
+                    "lead_b": unit_index[lead_B] if lead_B in team_B_units else -1,
+                    "score_a": 1 if winner == "A" else 0,
+                    "bias_code": bias_code,
+                    "attacker_a": attacker_side == "A",
+                    "clamp": clamp,
+                    "sweep_a": sweep_A,
+                    "sweep_b": sweep_B,
+                    "playoffs": is_playoffs,
+                })
+        return rounds
 
-    def calculate_and_display_roster_strength(self):
-        """Calculates and updates the Roster Strength labels in the UI."""
+    def calculate_and_display_roster_strength(self, elo_ratings=None):
+        """
+        Calculates and updates the Roster Strength labels in the UI.
+        Callers that already replayed Elo up to the previous week can pass those ratings to skip a replay.
+        """
         if not self.current_week:
             self.roster_strength_vars["A"].set("Strength: -")
             self.roster_strength_vars["B"].set("Strength: -")
@@ -4844,15 +5267,16 @@ This tool identifies the strongest and weakest possible team compositions based
         previous_week_idx = current_week_idx - 1
 
         initial_rating = int(self.elo_system_values["initial_elo"].get())
-        if previous_week_idx < 0:
-            # No previous weeks, so all units are at initial rating
-            elo_ratings = defaultdict(lambda: initial_rating)
-        else:
-            try:
-                elo_ratings, _ = self.calculate_elo_ratings(max_week_index=previous_week_idx)
-            except Exception:
-                # If Elo fails for any reason, gracefully fall back
+        if elo_ratings is None:
+            if previous_week_idx < 0:
+                # No previous weeks, so all units are at initial rating
                 elo_ratings = defaultdict(lambda: initial_rating)
+            else:
+                try:
+                    elo_ratings, _, _ = self.calculate_elo_ratings(max_week_index=previous_week_idx)
+                except Exception:
+                    # If Elo fails for any reason, gracefully fall back
+                    elo_ratings = defaultdict(lambda: initial_rating)
 
         team_A_units = self.current_week.get("A", set())
         team_B_units = self.current_week.get("B", set())
@@ -4927,6 +5351,7 @@ This tool identifies the strongest and weakest possible team compositions based
                 if sel:
                     week_idx = sel[0]
                     week_data = self.season[week_idx]
+                    self.invalidate_season_cache(week_idx)
                     
                     # Ensure unit_player_counts exists in week_data
                     if "unit_player_counts" not in week_data:
@@ -5131,6 +5556,7 @@ This tool identifies the strongest and weakest possible team compositions based
                 week_data["r1_casualties_B"] = sum(csa_r1_cas.values())
                 week_data["r2_casualties_A"] = sum(usa_r2_cas.values())
                 week_data["r2_casualties_B"] = sum(csa_r2_cas.values())
+                self._invalidate_round_facts(week_idx)
 
 
                 self.on_week_select() # Refresh main window UI